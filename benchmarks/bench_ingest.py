@@ -0,0 +1,52 @@
+import time
+
+from uteils.func import read_config, create_database, create_tables, save_data_to_database, \
+    save_data_to_database_bulk, refresh_materialized_views
+from tests.hh_stub import HHStubServer
+
+
+def make_results(employers_count: int, vacancies_per_employer: int) -> list:
+    """
+    Синтетический набор данных о Работодателях и Вакансиях.
+    :param employers_count: Количество работодателей.
+    :param vacancies_per_employer: Количество вакансий у каждого работодателя.
+    :return: Список пар (список с данными по Работодателю, список с данными по Вакансиям).
+    """
+    return [([HHStubServer.make_employer(str(employer_id))],
+             [HHStubServer.make_vacancy(str(employer_id), number) for number in range(vacancies_per_employer)])
+            for employer_id in range(1, employers_count + 1)]
+
+
+def main(employers_count: int = 20, vacancies_per_employer: int = 1000, batch_size: int = 1000):
+    database_name = 'bench_vacancies'
+    params = read_config()
+    results = make_results(employers_count, vacancies_per_employer)
+    rows_count = employers_count * vacancies_per_employer
+
+    create_database(database_name, params)
+
+    # представления для отчётов обновляются один раз после записи всех данных в обоих замерах,
+    # чтобы замеры отличались только способом записи.
+    create_tables(database_name, params)
+    start_time = time.perf_counter()
+    for result_list_employer, result_list_vacancy in results:
+        save_data_to_database(result_list_employer, result_list_vacancy, database_name, params,
+                              refresh_views=False)
+    refresh_materialized_views(database_name, params)
+    elapsed_single = time.perf_counter() - start_time
+
+    create_tables(database_name, params)
+    start_time = time.perf_counter()
+    save_data_to_database_bulk(results, database_name, params, batch_size, refresh_views=False)
+    refresh_materialized_views(database_name, params)
+    elapsed_bulk = time.perf_counter() - start_time
+
+    print(f"save_data_to_database:      {rows_count} вакансий за {elapsed_single:.3f} с "
+          f"({rows_count / elapsed_single:.0f} записей/с)")
+    print(f"save_data_to_database_bulk: {rows_count} вакансий за {elapsed_bulk:.3f} с "
+          f"({rows_count / elapsed_bulk:.0f} записей/с)")
+    print(f"Ускорение: {elapsed_single / elapsed_bulk:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import time
+
+import requests
+
+from src.http_client import HTTPClient
+from tests.hh_stub import HHStubServer
+
+
+def bench_requests_get(url: str, count: int) -> float:
+    """
+    Замер времени запросов через requests.get: для каждого запроса открывается новое соединение.
+    :param url: Адрес запроса.
+    :param count: Количество запросов.
+    :return: Время выполнения в секундах.
+    """
+    start_time = time.perf_counter()
+    for _ in range(count):
+        requests.get(url)
+    return time.perf_counter() - start_time
+
+
+def bench_http_client(url: str, count: int) -> float:
+    """
+    Замер времени запросов через HTTPClient: соединения переиспользуются.
+    :param url: Адрес запроса.
+    :param count: Количество запросов.
+    :return: Время выполнения в секундах.
+    """
+    with HTTPClient() as client:
+        start_time = time.perf_counter()
+        for _ in range(count):
+            client.get(url)
+        return time.perf_counter() - start_time
+
+
+def main(count: int = 500):
+    with HHStubServer() as server:
+        url = server.url + '/employers/80'
+
+        elapsed_requests = bench_requests_get(url, count)
+        elapsed_client = bench_http_client(url, count)
+
+    print(f"requests.get: {count} запросов за {elapsed_requests:.3f} с "
+          f"({elapsed_requests / count * 1000:.2f} мс/запрос)")
+    print(f"HTTPClient:   {count} запросов за {elapsed_client:.3f} с "
+          f"({elapsed_client / count * 1000:.2f} мс/запрос)")
+    print(f"Ускорение: {elapsed_requests / elapsed_client:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+
+from src.api import HH_URL_API, HeadHunterVacancyAPI
+from src.archive import ResponseArchive, replay_archive
+from src.db import DBManager
+from src.http_client import HTTPClient
+from src.salary_analytics import SalaryAnalytics, np
+from uteils.func import read_config, create_database, create_tables, save_data_to_database, \
+    save_data_to_database_bulk, refresh_materialized_views
+from tests.hh_stub import HHStubServer
+
+# Размеры наборов данных (количество вакансий) по умолчанию.
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+# Запросы DBManager, время выполнения которых замеряется: (название, функция запроса).
+QUERIES = (
+    ('get_companies_and_vacancies_count', lambda db: db.get_companies_and_vacancies_count()),
+    ('get_companies_and_vacancies_count_live', lambda db: db.get_companies_and_vacancies_count(live=True)),
+    ('get_employers_salary_stats', lambda db: db.get_employers_salary_stats()),
+    ('get_all_vacancies', lambda db: db.get_all_vacancies()),
+    ('iter_all_vacancies', lambda db: sum(1 for _ in db.iter_all_vacancies())),
+    ('get_avg_salary', lambda db: db.get_avg_salary()),
+    ('get_avg_salary_live', lambda db: db.get_avg_salary(live=True)),
+    ('get_vacancies_with_higher_salary', lambda db: db.get_vacancies_with_higher_salary()),
+    ('get_vacancies_with_higher_salary_live', lambda db: db.get_vacancies_with_higher_salary(live=True)),
+    ('get_vacancies_with_higher_salary_employer', lambda db: db.get_vacancies_with_higher_salary(employer_id='1')),
+    ('get_vacancies_with_keyword', lambda db: db.get_vacancies_with_keyword('Вакансия 99')),
+    ('search_vacancies', lambda db: db.search_vacancies(['обязанности', '99'])),
+)
+
+
+def generate_results(vacancies_count: int, vacancies_per_employer: int = 1000):
+    """
+    Генератор синтетического набора данных о Работодателях и Вакансиях.
+    Данные формируются по мере чтения, поэтому в памяти находятся вакансии только одного работодателя.
+    :param vacancies_count: Общее количество вакансий.
+    :param vacancies_per_employer: Количество вакансий у каждого работодателя.
+    :return: Генератор пар (список с данными по Работодателю, список с данными по Вакансиям).
+    """
+    employer_id = 0
+    while vacancies_count > 0:
+        employer_id += 1
+        count = min(vacancies_count, vacancies_per_employer)
+        yield ([HHStubServer.make_employer(str(employer_id))],
+               [HHStubServer.make_vacancy(str(employer_id), number) for number in range(count)])
+        vacancies_count -= count
+
+
+def latency_stats(samples: list) -> dict:
+    """
+    Статистика времени выполнения.
+    :param samples: Список замеров времени в секундах.
+    :return: Словарь с количеством замеров, средним, минимальным, максимальным временем и процентилями в мс.
+    """
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    quantiles = statistics.quantiles(samples_ms, n=100, method='inclusive') if len(samples_ms) > 1 \
+        else samples_ms * 99
+
+    return {'count': len(samples_ms),
+            'mean_ms': statistics.fmean(samples_ms),
+            'min_ms': samples_ms[0],
+            'p50_ms': quantiles[49],
+            'p95_ms': quantiles[94],
+            'p99_ms': quantiles[98],
+            'max_ms': samples_ms[-1]}
+
+
+def bench_fetch(employers_count: int = 20, vacancies_per_employer: int = 1000, number_records: int = 100,
+                latency: float = 0.0) -> dict:
+    """
+    Замер скорости получения вакансий методом get_vacancy от локальной заглушки API.
+    :param employers_count: Количество работодателей.
+    :param vacancies_per_employer: Количество вакансий у каждого работодателя.
+    :param number_records: Количество вакансий на одной странице.
+    :param latency: Задержка ответа заглушки в секундах.
+    :return: Словарь с количеством запросов и вакансий, временем и скоростью получения.
+    """
+    pages_count = -(-vacancies_per_employer // number_records)
+
+    with HHStubServer(vacancies_per_employer=vacancies_per_employer, latency=latency) as server, \
+            HTTPClient() as client:
+        vacancies_count = 0
+        start_time = time.perf_counter()
+        for employer_id in range(1, employers_count + 1):
+            vacancy = HeadHunterVacancyAPI(str(employer_id), number_records, url_base=server.url, client=client)
+            vacancy.get_vacancy(pages_count)
+            vacancies_count += len(vacancy.result_list)
+        elapsed = time.perf_counter() - start_time
+        requests_count = server.request_count
+
+    return {'employers': employers_count,
+            'requests': requests_count,
+            'vacancies': vacancies_count,
+            'elapsed_s': elapsed,
+            'requests_per_s': requests_count / elapsed,
+            'vacancies_per_s': vacancies_count / elapsed}
+
+
+def bench_replay(employers_count: int = 20, vacancies_per_employer: int = 1000, number_records: int = 100) -> dict:
+    """
+    Замер скорости чтения вакансий из архива ответов функцией replay_archive.
+    Архив заполняется синтетическими ответами в том виде, в котором их записывает HTTPClient при загрузке.
+    :param employers_count: Количество работодателей.
+    :param vacancies_per_employer: Количество вакансий у каждого работодателя.
+    :param number_records: Количество вакансий на одной странице ответа.
+    :return: Словарь с объёмом архива, количеством вакансий, временем и скоростью чтения.
+    """
+    pages_count = -(-vacancies_per_employer // number_records)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'responses.ndjson.gz')
+
+        with ResponseArchive(path) as archive:
+            for employer_id in map(str, range(1, employers_count + 1)):
+                archive.record(f'{HH_URL_API}/employers/{employer_id}', None, HHStubServer.make_employer(employer_id))
+                for page in range(pages_count):
+                    items = [HHStubServer.make_vacancy(employer_id, number) for number in
+                             range(page * number_records, min((page + 1) * number_records, vacancies_per_employer))]
+                    archive.record(f'{HH_URL_API}/vacancies', {'employer_id': employer_id, 'page': page},
+                                   {'items': items, 'found': vacancies_per_employer, 'pages': pages_count})
+
+        start_time = time.perf_counter()
+        vacancies_count = sum(len(result_list_vacancy) for _, result_list_vacancy in replay_archive(path))
+        elapsed = time.perf_counter() - start_time
+
+        return {'archive_bytes': os.path.getsize(path),
+                'vacancies': vacancies_count,
+                'elapsed_s': elapsed,
+                'vacancies_per_s': vacancies_count / elapsed}
+
+
+def bench_ingest(database_name: str, params: dict, vacancies_count: int, single: bool = True) -> dict:
+    """
+    Замер скорости записи вакансий в базу данных. После замера в базе данных остаётся набор данных
+    из vacancies_count вакансий, записанный пакетной функцией.
+    :param database_name: Имя базы данных.
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param vacancies_count: Количество вакансий.
+    :param single: Замерить также запись по одному работодателю функцией save_data_to_database.
+    :return: Словарь с временем и скоростью записи каждой функцией.
+    """
+    answer = {}
+
+    if single:
+        create_tables(database_name, params)
+        start_time = time.perf_counter()
+        for result_list_employer, result_list_vacancy in generate_results(vacancies_count):
+            save_data_to_database(result_list_employer, result_list_vacancy, database_name, params,
+                                  refresh_views=False)
+        elapsed = time.perf_counter() - start_time
+        answer['save_data_to_database'] = {'elapsed_s': elapsed, 'rows_per_s': vacancies_count / elapsed}
+
+    create_tables(database_name, params)
+    start_time = time.perf_counter()
+    save_data_to_database_bulk(generate_results(vacancies_count), database_name, params, refresh_views=False)
+    elapsed = time.perf_counter() - start_time
+    answer['save_data_to_database_bulk'] = {'elapsed_s': elapsed, 'rows_per_s': vacancies_count / elapsed}
+
+    start_time = time.perf_counter()
+    refresh_materialized_views(database_name, params)
+    answer['refresh_materialized_views'] = {'elapsed_s': time.perf_counter() - start_time}
+
+    return answer
+
+
+def bench_queries(database_name: str, params: dict, repeat: int = 20, max_seconds: float = 30.0) -> dict:
+    """
+    Замер времени выполнения запросов DBManager (кэш выборок отключён) и расчёта статистики зарплат в памяти.
+    :param database_name: Имя базы данных.
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param repeat: Количество замеров каждого запроса.
+    :param max_seconds: Ограничение времени замеров одного запроса: долгие запросы замеряются меньшее число раз.
+    :return: Словарь со статистикой времени выполнения по каждому запросу.
+    """
+    answer = {}
+
+    with DBManager(database_name, params) as db_manager:
+        for name, query in QUERIES:
+            # первый запрос прогревает пул подключений и подготавливает запрос.
+            query(db_manager)
+
+            samples = []
+            started = time.perf_counter()
+            while len(samples) < repeat and time.perf_counter() - started < max_seconds:
+                start_time = time.perf_counter()
+                query(db_manager)
+                samples.append(time.perf_counter() - start_time)
+
+            answer[name] = latency_stats(samples)
+
+    # статистика зарплат в памяти замеряется при установленной необязательной зависимости numpy.
+    if np is not None:
+        samples = []
+        for _ in range(min(repeat, 5)):
+            start_time = time.perf_counter()
+            salary_analytics = SalaryAnalytics.load(database_name, params)
+            samples.append(time.perf_counter() - start_time)
+        answer['salary_analytics_load'] = latency_stats(samples)
+
+        # первый отчёт упорядочивает зарплаты по работодателям, последующие используют готовый порядок.
+        salary_analytics.employer_report()
+        samples = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            salary_analytics.employer_report()
+            salary_analytics.histograms(20)
+            salary_analytics.above()
+            samples.append(time.perf_counter() - start_time)
+        answer['salary_analytics_report'] = latency_stats(samples)
+
+    return answer
+
+
+def git_commit() -> str | None:
+    """
+    Идентификатор текущей фиксации репозитория, к которой относятся результаты замеров.
+    :return: Строка с хешем фиксации или None, если он недоступен.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 20, single_max: int = 100000, fetch: bool = True,
+        database: bool = True) -> dict:
+    """
+    Выполнить все замеры.
+    :param sizes: Размеры наборов данных (количество вакансий).
+    :param repeat: Количество замеров каждого запроса.
+    :param single_max: Максимальный размер набора данных для замера записи по одному работодателю.
+    :param fetch: Замерить получение вакансий по API.
+    :param database: Замерить запись в базу данных и запросы.
+    :return: Словарь с результатами замеров.
+    """
+    answer = {'meta': {'commit': git_commit(),
+                       'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                       'python': platform.python_version(),
+                       'platform': platform.platform()},
+              'fetch': None,
+              'replay': None,
+              'sizes': {}}
+
+    if fetch:
+        answer['fetch'] = bench_fetch()
+        print(f"get_vacancy: {answer['fetch']['vacancies_per_s']:.0f} вакансий/с, "
+              f"{answer['fetch']['requests_per_s']:.0f} запросов/с")
+
+        answer['replay'] = bench_replay()
+        print(f"replay_archive: {answer['replay']['vacancies_per_s']:.0f} вакансий/с, "
+              f"архив {answer['replay']['archive_bytes']} байт")
+
+    if database:
+        database_name = 'bench_vacancies'
+        params = read_config()
+        create_database(database_name, params)
+
+        for size in sizes:
+            ingest = bench_ingest(database_name, params, size, single=size <= single_max)
+            queries = bench_queries(database_name, params, repeat)
+            answer['sizes'][str(size)] = {'ingest': ingest, 'queries': queries}
+
+            for name, stats in ingest.items():
+                if 'rows_per_s' in stats:
+                    print(f"{size:>8} {name}: {stats['rows_per_s']:.0f} записей/с")
+            for name, stats in queries.items():
+                print(f"{size:>8} {name}: p50 {stats['p50_ms']:.2f} мс, p95 {stats['p95_ms']:.2f} мс")
+
+    return answer
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    Сравнить результаты замеров двух фиксаций.
+    :param baseline: Результаты замеров базовой фиксации.
+    :param current: Результаты замеров проверяемой фиксации.
+    :param threshold: Допустимое относительное ухудшение.
+    :return: Список строк с описанием ухудшений.
+    """
+    regressions = []
+
+    def check(name: str, old: float, new: float, higher_is_better: bool):
+        if not old or not new:
+            return
+        change = (old / new - 1) if higher_is_better else (new / old - 1)
+        if change > threshold:
+            regressions.append(f"{name}: {old:.2f} -> {new:.2f} (хуже на {change:.0%})")
+
+    if baseline.get('fetch') and current.get('fetch'):
+        check('fetch vacancies_per_s', baseline['fetch']['vacancies_per_s'], current['fetch']['vacancies_per_s'],
+              True)
+
+    if baseline.get('replay') and current.get('replay'):
+        check('replay vacancies_per_s', baseline['replay']['vacancies_per_s'], current['replay']['vacancies_per_s'],
+              True)
+
+    for size, results in current['sizes'].items():
+        baseline_results = baseline['sizes'].get(size)
+        if baseline_results is None:
+            continue
+
+        for name, stats in results['ingest'].items():
+            if 'rows_per_s' in stats and name in baseline_results['ingest']:
+                check(f"{size} {name} rows_per_s", baseline_results['ingest'][name]['rows_per_s'],
+                      stats['rows_per_s'], True)
+
+        for name, stats in results['queries'].items():
+            if name in baseline_results['queries']:
+                check(f"{size} {name} p95_ms", baseline_results['queries'][name]['p95_ms'], stats['p95_ms'], False)
+
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description="Замеры скорости получения, записи и выборки вакансий.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="размеры наборов данных (количество вакансий)")
+    parser.add_argument('--repeat', type=int, default=20, help="количество замеров каждого запроса")
+    parser.add_argument('--single-max', type=int, default=100000,
+                        help="максимальный размер набора данных для замера save_data_to_database")
+    parser.add_argument('--no-fetch', action='store_true',
+                        help="не замерять получение вакансий по API и из архива ответов")
+    parser.add_argument('--no-db', action='store_true', help="не замерять запись в базу данных и запросы")
+    parser.add_argument('--output', help="файл для сохранения результатов в формате JSON")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="сравнить два файла результатов вместо выполнения замеров")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as file:
+            baseline = json.load(file)
+        with open(args.compare[1], encoding='utf-8') as file:
+            current = json.load(file)
+
+        regressions = compare(baseline, current)
+        for regression in regressions:
+            print(regression)
+        print(f"Ухудшений: {len(regressions)}")
+        return
+
+    answer = run(args.sizes, args.repeat, args.single_max, fetch=not args.no_fetch, database=not args.no_db)
+
+    output = args.output or f"bench_{answer['meta']['commit'] or 'results'}.json"
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(answer, file, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,34 @@
-from uteils.func import read_config, create_database, create_tables, save_data_to_database
-from src.api import HeadHunterEmployerAPI, HeadHunterVacancyAPI
+from argparse import ArgumentParser
+from functools import partial
+
+from uteils.func import read_config, create_database, create_tables, save_data_to_database_bulk, \
+    sync_data_to_database, drop_old_vacancy_partitions
+from src.archive import ResponseArchive, iter_archive_sessions
+from src.cache import ResponseCache
+from src.http_client import HTTPClient
+from src.metrics import metrics
+from src.pipeline import FetchLoadPipeline
+from src.scheduler import RequestScheduler
+from src.snapshot import export_snapshot
 from src.db import DBManager
 
 
-def main():
+def main(sync: bool = False, metrics_path: str = None, snapshot_path: str = None, keep_months: int = None,
+         archive_path: str = None, replay_path: str = None):
+    """
+    Загрузка данных о работодателях и вакансиях в базу данных и меню работы с ними.
+    :param sync: Инкрементальная синхронизация с существующей базой данных вместо её пересоздания.
+    :param metrics_path: Файл для сохранения показателей работы (*.json - в формате JSON, иначе Prometheus).
+    :param snapshot_path: Каталог для выгрузки снимка базы данных для анализа без обращения к СУБД.
+    :param keep_months: Количество хранимых прошедших месяцев: более старые вакансии удаляются вместе с разделами.
+    :param archive_path: Файл архива, в который дописываются полученные с веб-портала ответы.
+    :param replay_path: Файл архива, из которого загружаются данные вместо запросов к веб-порталу.
+    :return:
+    """
+
+    # Замеры запросов к API, записи в базу данных и выборок выполняются, только если нужно сохранить показатели.
+    if metrics_path:
+        metrics.enable()
 
     # Список с кодами работодателей с сайта HH.ru
     list_favorite_employer = [
@@ -14,30 +39,70 @@ def main():
     # Считываем параметры подключения из файла с настройками *.ini
     params = read_config()
 
-    # Создаём базу данных
-    create_database('vacancies', params)
+    # Создаём базу данных. В режиме синхронизации существующая база данных сохраняется.
+    create_database('vacancies', params, recreate=not sync)
     print("БД 'vacancies' успешно создана")
 
-    # Создаём таблицы для базы данных
-    create_tables('vacancies', params)
+    # Создаём таблицы для базы данных. В режиме синхронизации существующие таблицы и данные сохраняются.
+    create_tables('vacancies', params, recreate=not sync)
     print("Таблицы успешно созданы")
 
-    # Сохранение данных о Работодателе и Вакансиях в базу данных.
-    # Обход списка идентификаторов работодателей, получение информации по API.
-    for employer_id in list_favorite_employer:
-
-        employer = HeadHunterEmployerAPI(employer_id)
-        employer.get_employer()
+    if replay_path:
+        # Данные загружаются из архива ответов без запросов к веб-порталу. Каждая загрузка, записанная в архив,
+        # синхронизируется отдельно, чтобы база данных повторила изменения вакансий между загрузками.
+        for session, results in iter_archive_sessions(replay_path):
+            written = sync_data_to_database(results, 'vacancies', params)
+            print(f"Загрузка {session}: {written}")
+        print(f"Данные загружены из архива {replay_path}")
+
+    else:
+        # Данные по всем работодателям вносятся пакетами в одной транзакции.
+        # В режиме синхронизации вносятся только изменения.
+        if sync:
+            writer = partial(sync_data_to_database, database_name='vacancies', params=params)
+        else:
+            writer = partial(save_data_to_database_bulk, database_name='vacancies', params=params)
+
+        # Сохранение данных о Работодателе и Вакансиях в базу данных.
+        # Ответы веб-портала кэшируются на диске: данные о работодателях обновляются раз в сутки, вакансии раз в час.
+        # Частота запросов ограничивается, при превышении ограничений веб-портала запросы повторяются.
+        # Если указан архив, полученные ответы дописываются в него, и база данных восстанавливается из архива
+        # без запросов. Ответы из кэша в архив не попадают, поэтому при архивировании кэш не используется.
+        archive = ResponseArchive(archive_path) if archive_path else None
+        cache = None if archive is not None else \
+            ResponseCache('.cache/hh', ttl_by_path={'/employers/': 86400, '/vacancies': 3600})
+        client = HTTPClient(pool_size=8, cache=cache, scheduler=RequestScheduler(), archive=archive)
+
+        # Получение информации по API (все страницы вакансий каждого работодателя) и запись в базу данных
+        # выполняются одновременно: полученные данные передаются на запись через очередь.
+        # Вакансии нескольких работодателей запрашиваются общими запросами, что сокращает количество запросов к API.
+        pipeline = FetchLoadPipeline(writer, fetch_workers=4, number_records=100, client=client,
+                                     vacancy_batch_size=5)
+        try:
+            written = pipeline.run(list_favorite_employer)
+        finally:
+            if archive is not None:
+                archive.close()
+
+        if sync:
+            print(f"Синхронизация: {written}")
+        print(pipeline.stats)
+        print(client.cache if archive is None else archive)
 
-        vacancy = HeadHunterVacancyAPI(employer_id)
-        vacancy.get_vacancy()
+    print("Данные успешно записаны в БД")
 
-        save_data_to_database(employer.result_list, vacancy.result_list, 'vacancies', params)
+    # Вакансии хранятся в разделах по месяцам публикации: старые вакансии удаляются целыми разделами.
+    if keep_months is not None:
+        removed = drop_old_vacancy_partitions('vacancies', params, keep_months=keep_months)
+        print(f"Удалены разделы с вакансиями старше {keep_months} мес.: {', '.join(removed) or 'нет'}")
 
-    print("Данные успешно записаны в БД")
+    # Снимок таблиц в столбцовом формате читается классом Snapshot через отображение файлов в память.
+    if snapshot_path and export_snapshot('vacancies', params, snapshot_path):
+        print(f"Снимок базы данных выгружен в {snapshot_path}")
 
     # Инициализация экземпляра класса для работы с базой данных и имеющий несколько методов с различными выборками.
-    db_vacancies = DBManager('vacancies', params)
+    # Повторный выбор пункта меню сводного отчёта выводит выборку из кэша, пока данные в базе данных не изменились.
+    db_vacancies = DBManager('vacancies', params, cache_size=64)
 
     input_data = ""
 
@@ -62,8 +127,8 @@ def main():
 
         elif input_data == '2':
             # Обходим и выводим результаты выборки список всех вакансий с указанием названия компании, названия вакансии
-            # и зарплаты и ссылки на вакансию.
-            for selection_detailed_records in db_vacancies.get_all_vacancies():
+            # и зарплаты и ссылки на вакансию. Записи читаются с сервера порциями по мере вывода.
+            for selection_detailed_records in db_vacancies.iter_all_vacancies():
                 print(selection_detailed_records)
 
         elif input_data == '3':
@@ -89,7 +154,32 @@ def main():
         elif input_data != 'exit':
             print("Введите число от 1 до 5.")
 
+    # Закрываем подключения пула к базе данных.
+    db_vacancies.close()
+
+    if metrics_path:
+        with open(metrics_path, 'w', encoding='utf-8') as file:
+            file.write(metrics.to_json() if metrics_path.endswith('.json') else metrics.to_prometheus())
+        print(f"Показатели работы сохранены в {metrics_path}")
+
 
 if __name__ == "__main__":
-    main()
+    parser = ArgumentParser(description="Загрузка вакансий работодателей с HH.ru в базу данных PostgreSQL.")
+    parser.add_argument('--sync', action='store_true',
+                        help="инкрементальная синхронизация без пересоздания базы данных")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="сохранить показатели работы в файл (*.json - JSON, иначе текстовый формат Prometheus)")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help="выгрузить снимок базы данных в каталог для анализа без обращения к СУБД (требуется numpy)")
+    parser.add_argument('--keep-months', metavar='N', type=int,
+                        help="удалить вакансии, опубликованные раньше N прошедших месяцев")
+    parser.add_argument('--archive', metavar='PATH',
+                        help="дописывать полученные ответы веб-портала в сжатый архив NDJSON (*.ndjson.gz); "
+                             "кэш ответов при этом не используется")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="загрузить данные из архива ответов без запросов к веб-порталу")
+    args = parser.parse_args()
+
+    main(sync=args.sync, metrics_path=args.metrics, snapshot_path=args.snapshot, keep_months=args.keep_months,
+         archive_path=args.archive, replay_path=args.replay)
 
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from os import getenv
 
-import requests
+from src.http_client import HTTPClient, get_default_client
+
+# Базовый адрес API веб-портала HeadHunter.
+HH_URL_API = 'https://api.hh.ru'
 
 
 class API(ABC):
@@ -47,19 +51,21 @@ class JobSearchPortalAPI(API):
     Общие методы и свойства.
     Имеет предопределенный перечень свойств, закрытых для пользовательского использования.
     """
-    __slots__ = ('__url_api', '__result_list', '__headers', '__params')
+    __slots__ = ('__url_api', '__result_list', '__headers', '__params', '__client')
 
-    def __init__(self, url_api: str, headers: dict, params: dict):
+    def __init__(self, url_api: str, headers: dict, params: dict, client: HTTPClient = None):
         """
         Метод инициализации экземпляров класса РаботаПоискаВебПорта из входящих данных.
         :param url_api: Ссылка на API.
         :param headers: Заголовок с передаваемыми на портал параметрами.
         :param params: Параметры запроса.
+        :param client: Клиент с пулом соединений. Если не указан, используется общий клиент.
         """
         self.__url_api = url_api
         self.__headers = headers
         self.__params = params
         self.__result_list = []
+        self.__client = client
 
     @property
     def url_api(self):
@@ -77,6 +83,10 @@ class JobSearchPortalAPI(API):
     def result_list(self):
         return self.__result_list
 
+    @property
+    def client(self):
+        return self.__client if self.__client is not None else get_default_client()
+
     def __str__(self):
         """
         Переопределённое представление строкового значения экземпляра класса.
@@ -91,21 +101,18 @@ class JobSearchPortalAPI(API):
         """
         return f"{self.__class__.__name__}('{self.__url_api}', '{self.__params}', '{self.__result_list}')"
 
-    def get_requests(self):
+    def get_requests(self, params: dict = None):
         """
         Получить ответ на запрос к веб-порталу по API.
+        :param params: Параметры запроса. Если не указаны, используются параметры экземпляра класса.
         :return: Возвращает данные в формате JSON.
         """
 
-        # В запросе используем параметры, которые были получены при инициализации экземпляра класса
-        response = requests.get(self.url_api, headers=self.headers, params=self.params)
-
+        # В запросе используем параметры, которые были получены при инициализации экземпляра класса.
         # Если ошибки отсутствуют возвращаем данные в формате JSON.
         # Иначе возвращаем Исключение с описанием ошибки.
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(f"Ошибка получения данных по API. Код ошибки = {response.status_code}")
+        return self.client.get_json(self.url_api, headers=self.headers,
+                                    params=self.params if params is None else params)
 
     def get_employer(self):
         """
@@ -124,6 +131,83 @@ class JobSearchPortalAPI(API):
         else:
             self.__result_list.append(result_request)
 
+    def get_vacancy_page(self, page_number: int) -> list:
+        """
+        Получить одну страницу списка вакансий с веб-портала по API.
+        Параметры экземпляра класса не изменяются, поэтому метод можно вызывать из нескольких потоков одновременно.
+        :param page_number: Номер запрашиваемой страницы.
+        :return: Список вакансий на странице.
+        """
+        params = dict(self.__params)
+        params['page'] = page_number
+
+        # В запросе используем параметры экземпляра класса с подставленным номером страницы.
+        return self.get_requests(params)['items']
+
+    def get_vacancy_pages(self) -> tuple:
+        """
+        Получить первую страницу списка вакансий вместе с общим количеством страниц.
+        :return: Кортеж из списка вакансий на первой странице и количества страниц.
+        """
+        params = dict(self.__params)
+        params['page'] = 0
+
+        answer = self.get_requests(params)
+        return answer['items'], answer.get('pages', 1)
+
+    def iter_vacancies(self, prefetch: int = 4):
+        """
+        Получить все вакансии с веб-портала по API в виде потока (генератора).
+        Количество страниц определяется по первому ответу, остальные страницы запрашиваются параллельно,
+        но не более prefetch страниц наперёд, поэтому в памяти одновременно находится ограниченное
+        количество страниц вне зависимости от общего количества вакансий.
+        Вакансии выдаются в порядке следования страниц.
+        Если не удалось получить любую страницу, в том числе первую, генератор завершается исключением,
+        чтобы потребитель не принял неполный (или пустой) список вакансий за полный.
+        :param prefetch: Количество страниц, запрашиваемых наперёд.
+        :return: Генератор вакансий.
+        """
+        if prefetch < 1:
+            raise ValueError('Количество страниц, запрашиваемых наперёд, должно быть больше нуля.')
+
+        # Ошибка получения первой страницы передаётся потребителю, как и ошибки последующих страниц.
+        vacancies_page, pages_count = self.get_vacancy_pages()
+
+        yield from vacancies_page
+        yield from self.iter_next_pages(pages_count, prefetch)
+
+    def iter_next_pages(self, pages_count: int, prefetch: int = 4):
+        """
+        Получить вакансии со второй и последующих страниц списка вакансий в виде потока (генератора).
+        Страницы запрашиваются параллельно, но не более prefetch страниц наперёд.
+        Вакансии выдаются в порядке следования страниц.
+        Ошибка получения страницы не пропускается, а передаётся потребителю: без страницы список вакансий неполон.
+        :param pages_count: Общее количество страниц, полученное с первой страницей.
+        :param prefetch: Количество страниц, запрашиваемых наперёд.
+        :return: Генератор вакансий.
+        """
+        if prefetch < 1:
+            raise ValueError('Количество страниц, запрашиваемых наперёд, должно быть больше нуля.')
+
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        try:
+            # Окно запросов: в работе одновременно не более prefetch страниц.
+            pages = iter(range(1, pages_count))
+            window = [executor.submit(self.get_vacancy_page, page_number)
+                      for _, page_number in zip(range(prefetch), pages)]
+
+            while window:
+                future = window.pop(0)
+
+                next_page_number = next(pages, None)
+                if next_page_number is not None:
+                    window.append(executor.submit(self.get_vacancy_page, next_page_number))
+
+                yield from future.result()
+        finally:
+            # Если потребитель прекратил чтение, незапущенные запросы отменяются.
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def get_vacancy(self, pages_count=2):
         """
         Получить список вакансий с веб-портала по API.
@@ -136,12 +220,11 @@ class JobSearchPortalAPI(API):
         # В запросе направляемом по API указываем количество страниц, которое хотим получить в ответ.
         # Затем обходим каждую страницу.
         for page_number in range(pages_count):
-            self.__params['page'] = page_number
 
             # В обработчике исключений производим запрос через API к веб-порталу.
             # Если возникает Исключение обрабатываем.
             try:
-                vacancies_page = self.get_requests()['items']
+                vacancies_page = self.get_vacancy_page(page_number)
             except Exception as error:
                 print(error)
             else:
@@ -152,31 +235,36 @@ class HeadHunterEmployerAPI(JobSearchPortalAPI):
     """
     Класс описывающий работу API веб-порталов HeadHunter, получение информации о Работодателе.
     """
-    def __init__(self, employer_id: str):
+    def __init__(self, employer_id: str, url_base: str = HH_URL_API, client: HTTPClient = None):
         """
         Инициализация конкретными параметрами для работы API с веб-порталом HeadHunter.
         :param employer_id: Идентификатор работодателя по которому будет получена информация.
+        :param url_base: Базовый адрес API веб-портала.
+        :param client: Клиент с пулом соединений. Если не указан, используется общий клиент.
         """
-        url_api = 'https://api.hh.ru/employers/' + employer_id
+        url_api = url_base + '/employers/' + employer_id
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
             'Authorization': f'Bearer {getenv("API_KEY_HH")}'
         }
 
-        super().__init__(url_api, headers, {})
+        super().__init__(url_api, headers, {}, client)
 
 
 class HeadHunterVacancyAPI(JobSearchPortalAPI):
     """
     Класс описывающий работу API веб-порталов HeadHunter, получение информации о Вакансиях.
     """
-    def __init__(self, employer_id: str, number_records: int = 4):
+    def __init__(self, employer_id: str, number_records: int = 4, url_base: str = HH_URL_API,
+                 client: HTTPClient = None):
         """
         Инициализация конкретными параметрами для работы API с веб-порталом HeadHunter.
         :param number_records: Количество записей запрашиваемых с веб-портала.
         :param employer_id: Список идентификаторов работодателей, по которым происходит отбор.
+        :param url_base: Базовый адрес API веб-портала.
+        :param client: Клиент с пулом соединений. Если не указан, используется общий клиент.
         """
-        url_api = 'https://api.hh.ru/vacancies'
+        url_api = url_base + '/vacancies'
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded',
             'Authorization': f'Bearer {getenv("API_KEY_HH")}'
@@ -189,4 +277,133 @@ class HeadHunterVacancyAPI(JobSearchPortalAPI):
             'currency': 'RUR',
             'employer_id': employer_id
         }
-        super().__init__(url_api, headers, params)
+        super().__init__(url_api, headers, params, client)
+
+
+class HeadHunterBatchVacancyAPI:
+    """
+    Класс получения вакансий группы работодателей с веб-портала HeadHunter общими запросами.
+    Работодатели объединяются в группы по batch_size: вакансии группы запрашиваются одним постраничным запросом
+    с несколькими параметрами employer_id и распределяются по работодателям по полю item['employer']['id'].
+    Веб-портал выдаёт не более max_depth вакансий по одному запросу, поэтому группа, у которой найдено больше
+    вакансий, делится пополам и запрашивается по частям: список вакансий каждого работодателя остаётся полным.
+    Если больше max_depth вакансий найдено у одного работодателя, полный список получить нельзя:
+    выбрасывается исключение, и работодатель пропускается, как при ошибке получения страницы.
+    """
+    __slots__ = ('__employer_ids', '__batch_size', '__number_records', '__url_base', '__client', '__max_depth')
+
+    def __init__(self, employer_ids: list, batch_size: int = 20, number_records: int = 100,
+                 url_base: str = HH_URL_API, client: HTTPClient = None, max_depth: int = 2000):
+        """
+        Инициализация получения вакансий группы работодателей.
+        :param employer_ids: Список идентификаторов работодателей.
+        :param batch_size: Количество работодателей в одном запросе.
+        :param number_records: Количество вакансий на одной странице.
+        :param url_base: Базовый адрес API веб-портала.
+        :param client: Клиент с пулом соединений. Если не указан, используется общий клиент.
+        :param max_depth: Максимальное количество вакансий, выдаваемое веб-порталом по одному запросу.
+        """
+        if batch_size < 1 or number_records < 1 or max_depth < 1:
+            raise ValueError('Некорректные параметры группового получения вакансий.')
+
+        self.__employer_ids = list(employer_ids)
+        self.__batch_size = batch_size
+        self.__number_records = number_records
+        self.__url_base = url_base
+        self.__client = client
+        self.__max_depth = max_depth
+
+    @property
+    def employer_ids(self):
+        return self.__employer_ids
+
+    @property
+    def batch_size(self):
+        return self.__batch_size
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({self.__employer_ids}, {self.__batch_size}, {self.__number_records})"
+
+    def iter_batches(self):
+        """
+        Разбить работодателей на группы для общих запросов.
+        :return: Генератор списков идентификаторов работодателей.
+        """
+        for start in range(0, len(self.__employer_ids), self.__batch_size):
+            yield self.__employer_ids[start:start + self.__batch_size]
+
+    def fetch_batch(self, employer_ids: list, prefetch: int = 4) -> dict:
+        """
+        Получить вакансии группы работодателей общим запросом и распределить их по работодателям.
+        Если не удалось получить любую страницу общего запроса или у одного работодателя найдено больше
+        max_depth вакансий, выбрасывается исключение: неполный список вакансий не возвращается.
+        Разделённая группа запрашивается по половинам: половина, которую не удалось получить полностью,
+        пропускается, а вакансии другой половины возвращаются.
+        :param employer_ids: Список идентификаторов работодателей группы.
+        :param prefetch: Количество страниц, запрашиваемых наперёд.
+        :return: Словарь {идентификатор работодателя: список вакансий} по работодателям группы, вакансии
+        которых получены полностью.
+        """
+        vacancy = HeadHunterVacancyAPI(list(employer_ids), self.__number_records, self.__url_base, self.__client)
+
+        params = dict(vacancy.params)
+        params['page'] = 0
+        answer = vacancy.get_requests(params)
+
+        found = answer.get('found', 0)
+        if found > self.__max_depth and len(employer_ids) == 1:
+            raise Exception(f"Работодатель {employer_ids[0]}: найдено вакансий {found}, "
+                            f"по API можно получить не более {self.__max_depth}")
+
+        # по общему запросу получить все найденные вакансии нельзя: запрашиваем половины группы отдельно.
+        if found > self.__max_depth:
+            middle = len(employer_ids) // 2
+            vacancies = {}
+            for half in (employer_ids[:middle], employer_ids[middle:]):
+                # В обработчике исключений производим запрос половины группы.
+                # Если возникает Исключение обрабатываем, половину пропускаем.
+                try:
+                    vacancies.update(self.fetch_batch(half, prefetch))
+                except Exception as error:
+                    print(error)
+            return vacancies
+
+        vacancies = {employer_id: [] for employer_id in employer_ids}
+        for items in (answer['items'], vacancy.iter_next_pages(answer.get('pages', 1), prefetch)):
+            for item in items:
+                vacancies.setdefault(item['employer']['id'], []).append(item)
+        return vacancies
+
+    def iter_vacancies_by_employer(self, prefetch: int = 4):
+        """
+        Получить вакансии всех работодателей, по одной группе запросов за раз.
+        Работодатели группы, любую страницу вакансий которой не удалось получить, пропускаются,
+        чтобы не считать вакансии с недополученных страниц закрытыми. Так же пропускается работодатель,
+        у которого найдено больше max_depth вакансий.
+        :param prefetch: Количество страниц, запрашиваемых наперёд.
+        :return: Генератор пар (идентификатор работодателя, список вакансий) в порядке списка работодателей.
+        """
+        for employer_ids in self.iter_batches():
+            # В обработчике исключений производим запрос всех страниц группы.
+            # Если при получении любой страницы возникает Исключение обрабатываем, группу пропускаем.
+            try:
+                vacancies = self.fetch_batch(employer_ids, prefetch)
+            except Exception as error:
+                print(error)
+                continue
+
+            for employer_id in employer_ids:
+                if employer_id in vacancies:
+                    yield employer_id, vacancies[employer_id]
+
+    def get_vacancies(self, prefetch: int = 4) -> dict:
+        """
+        Получить вакансии всех работодателей.
+        :param prefetch: Количество страниц, запрашиваемых наперёд.
+        :return: Словарь {идентификатор работодателя: список вакансий}.
+        """
+        return dict(self.iter_vacancies_by_employer(prefetch))
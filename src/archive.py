@@ -0,0 +1,202 @@
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from src.models import Employer, Vacancy
+
+
+class ResponseArchive:
+    """
+    Класс архива ответов веб-порталов: сжатый файл NDJSON, в который ответы только дописываются.
+    Каждая строка - запись {"session", "fetched_at", "url", "params", "body"} с полным телом ответа,
+    поэтому база данных может быть заново построена из архива без запросов к веб-порталу (replay_archive).
+    В архив записываются только ответы, полученные с веб-портала по сети, ответы из кэша не записываются.
+    Каждое открытие архива дописывает в файл новый поток gzip: файл остаётся корректным архивом gzip.
+    Записи сбрасываются на диск порциями, при аварийном завершении теряется только недописанная порция.
+    Экземпляр класса можно использовать из нескольких потоков одновременно.
+    """
+    __slots__ = ('__path', '__flush_every', '__session', '__file', '__records', '__pending', '__lock')
+
+    def __init__(self, path: str, flush_every: int = 100):
+        """
+        Инициализация архива.
+        :param path: Путь к файлу архива (*.ndjson.gz).
+        :param flush_every: Количество записей, после которого сжатые данные сбрасываются на диск.
+        """
+        if flush_every < 1:
+            raise ValueError('Количество записей между сбросами на диск должно быть больше нуля.')
+
+        self.__path = path
+        self.__flush_every = flush_every
+        # записи одного открытия архива (одной загрузки) объединяются общим сеансом.
+        self.__session = f"{time.strftime('%Y-%m-%dT%H:%M:%S')}-{uuid4().hex[:8]}"
+        self.__file = None
+        self.__records = 0
+        self.__pending = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def session(self):
+        return self.__session
+
+    @property
+    def records(self):
+        return self.__records
+
+    def __str__(self):
+        """
+        Переопределённое представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f'Архив ответов {self.__path}: записей {self.__records}'
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}('{self.__path}')"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def record(self, url: str, params: dict, body) -> None:
+        """
+        Дописать ответ в архив. Файл архива открывается при первой записи.
+        :param url: Адрес запроса.
+        :param params: Параметры запроса.
+        :param body: Тело ответа в формате JSON.
+        :return:
+        """
+        line = json.dumps({'session': self.__session, 'fetched_at': time.time(), 'url': url,
+                           'params': params or {}, 'body': body}, ensure_ascii=False, default=str)
+
+        with self.__lock:
+            if self.__file is None:
+                directory = os.path.dirname(self.__path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.__file = gzip.open(self.__path, 'ab', compresslevel=6)
+
+            self.__file.write(line.encode('utf-8') + b'\n')
+            self.__records += 1
+            self.__pending += 1
+
+            # сброс с синхронизацией потока сжатия: дописанные строки читаются и без закрытия архива.
+            if self.__pending >= self.__flush_every:
+                self.__file.flush(zlib.Z_SYNC_FLUSH)
+                self.__pending = 0
+
+    def close(self) -> None:
+        """
+        Завершить поток gzip и закрыть файл архива.
+        :return:
+        """
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+                self.__pending = 0
+
+    @staticmethod
+    def iter_records(path: str):
+        """
+        Прочитать записи архива по порядку. Недописанный при аварийном завершении конец архива пропускается.
+        :param path: Путь к файлу архива.
+        :return: Генератор словарей записей.
+        """
+        with gzip.open(path, 'rb') as file:
+            try:
+                for line in file:
+                    # строка без перевода строки - недописанная последняя запись.
+                    if not line.endswith(b'\n'):
+                        return
+                    yield json.loads(line)
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                return
+
+
+def _session_results(records: list) -> list:
+    """
+    Функция собирает данные о работодателях и их вакансиях из записей одного сеанса архива.
+    Берутся последний ответ о каждом работодателе и последний ответ с каждой вакансией.
+    Работодатели, вакансии которых не запрашивались, пропускаются, как и при загрузке конвейером.
+    Вакансии работодателя упорядочиваются по страницам ответов: страницы дописываются в архив по мере получения.
+    :param records: Список записей сеанса.
+    :return: Список пар (список записей Employer, список записей Vacancy) в порядке первого появления работодателей.
+    """
+    employers = {}
+    # работодатели, вакансии которых запрашивались в сеансе.
+    requested_ids = set()
+    # вакансия: (страница, позиция на странице, данные вакансии), при повторе остаётся последний ответ.
+    vacancies = {}
+
+    for record in records:
+        url_path = urlparse(record['url']).path
+        body = record['body']
+
+        if '/employers/' in url_path:
+            employers[body['id']] = body
+
+        elif url_path.endswith('/vacancies'):
+            employer_ids = record['params'].get('employer_id')
+            requested_ids.update(str(employer_id) for employer_id in
+                                 (employer_ids if isinstance(employer_ids, list) else [employer_ids]))
+
+            page = record['params'].get('page', 0)
+            for index, item in enumerate(body.get('items', [])):
+                vacancies[item['id']] = (page, index, item)
+
+    items_by_employer = {}
+    for page, index, item in sorted(vacancies.values(), key=lambda vacancy: vacancy[:2]):
+        items_by_employer.setdefault((item.get('employer') or {}).get('id'), []).append(item)
+
+    return [([Employer.from_json(body)], [Vacancy.from_json(item) for item in items_by_employer.get(employer_id, [])])
+            for employer_id, body in employers.items() if employer_id in requested_ids]
+
+
+def iter_archive_sessions(path: str):
+    """
+    Прочитать архив по сеансам (загрузкам). В памяти одновременно находятся записи только одного сеанса,
+    поэтому память, необходимая для чтения, определяется размером самой большой загрузки, а не всего архива.
+    Записи сеанса идут в архиве подряд: каждая загрузка дописывает архив своим потоком gzip.
+    :param path: Путь к файлу архива.
+    :return: Генератор пар (сеанс, список пар (список записей Employer, список записей Vacancy)) в порядке сеансов.
+    """
+    session, records = None, []
+
+    for record in ResponseArchive.iter_records(path):
+        if record['session'] != session and records:
+            yield session, _session_results(records)
+            records = []
+        session = record['session']
+        records.append(record)
+
+    if records:
+        yield session, _session_results(records)
+
+
+def replay_archive(path: str):
+    """
+    Получить данные о работодателях и их вакансиях из архива ответов без запросов к веб-порталу.
+    Данные выдаются по сеансам в порядке загрузок (см. iter_archive_sessions): работодатель, загружавшийся
+    несколько раз, выдаётся в каждом сеансе. Чтобы база данных повторила изменения вакансий между загрузками
+    (в том числе закрытие вакансий), данные каждого сеанса синхронизируются отдельно.
+    :param path: Путь к файлу архива.
+    :return: Генератор пар (список записей Employer, список записей Vacancy), который можно передать
+    функциям записи в базу данных.
+    """
+    for _, results in iter_archive_sessions(path):
+        yield from results
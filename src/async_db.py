@@ -0,0 +1,339 @@
+import asyncio
+import re
+from datetime import date
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+from src import queries
+from src.pagination import Page, decode_cursor, page_from_rows
+
+
+def _numbered_params(text_request: str) -> str:
+    """
+    Функция заменяет параметры запроса %s (psycopg2) на параметры $1, $2, ... (asyncpg) по порядку.
+    :param text_request: Текст запроса из src.queries.
+    :return: Текст запроса для asyncpg.
+    """
+    numbers = iter(range(1, text_request.count('%s') + 1))
+    return re.sub('%s', lambda match: f'${next(numbers)}', text_request)
+
+
+class AsyncDBManager:
+    """
+    Класс для асинхронной работы с базой данных с теми же выборками (и теми же текстами запросов из src.queries),
+    что и DBManager. Запросы выполняются через пул подключений asyncpg, поэтому множество независимых выборок
+    выполняется одновременно в одном потоке. Запросы подготавливаются и кэшируются драйвером на каждом подключении.
+    Требуется необязательная зависимость asyncpg (poetry install -E async).
+    """
+    __slots__ = ('__database_name', '__params', '__min_connections', '__max_connections', '__pool', '__pool_lock')
+
+    def __init__(self, database_name: str, params: dict, min_connections: int = 1, max_connections: int = 10):
+        """
+        Инициализация экземпляра класса.
+        :param database_name: Имя базы данных в которой будут выполняться запросы.
+        :param params: Набор передаваемых параметров для подключения к СУБД.
+        :param min_connections: Количество подключений, открываемых при создании пула.
+        :param max_connections: Максимальное количество одновременно открытых подключений.
+        """
+        if asyncpg is None:
+            raise ImportError('Для AsyncDBManager необходим пакет asyncpg: poetry install -E async')
+
+        if not 0 <= min_connections <= max_connections or max_connections < 1:
+            raise ValueError('Некорректные границы размера пула подключений.')
+
+        self.__database_name = database_name
+        self.__params = params
+        self.__min_connections = min_connections
+        self.__max_connections = max_connections
+        self.__pool = None
+        # блокировка создаётся в сопрограмме, открывающей пул, то есть в цикле событий, где используется пул.
+        self.__pool_lock = None
+
+    @property
+    def database_name(self):
+        return self.__database_name
+
+    @property
+    def params(self):
+        return self.__params
+
+    @property
+    def max_connections(self):
+        return self.__max_connections
+
+    def __str__(self):
+        """
+        Переопределённое представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f'database_name = {self.__database_name}'
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}('{self.__database_name}')"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Метод закрывает все подключения пула.
+        :return:
+        """
+        if self.__pool_lock is None:
+            return
+
+        async with self.__pool_lock:
+            if self.__pool is not None:
+                await self.__pool.close()
+                self.__pool = None
+
+    async def __get_pool(self):
+        """
+        Пул подключений создаётся при первом запросе к СУБД.
+        :return: Экземпляр asyncpg.Pool.
+        """
+        if self.__pool_lock is None:
+            self.__pool_lock = asyncio.Lock()
+
+        async with self.__pool_lock:
+            if self.__pool is None:
+                self.__pool = await asyncpg.create_pool(database=self.__database_name,
+                                                        min_size=self.__min_connections,
+                                                        max_size=self.__max_connections,
+                                                        **self.__params)
+            return self.__pool
+
+    async def __execute_request(self, text_request: str, *query_params):
+        """
+        Метод выполняет запрос в СУБД для получения данных.
+        :param text_request: Текст запроса с параметрами $1, $2, ...
+        :param query_params: Значения параметров запроса, передаваемые отдельно от его текста.
+        :return: Возвращает выборку детальных записей в виде списка кортежей, как DBManager.
+        """
+        # помещаем работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+        try:
+            pool = await self.__get_pool()
+            # подключение берётся из пула на время запроса, при исчерпании пула запрос ожидает освобождения.
+            async with pool.acquire() as connection:
+                return [tuple(record) for record in await connection.fetch(text_request, *query_params)]
+
+        except (Exception, asyncpg.PostgresError) as error:
+            print(error)
+
+    async def __execute_page(self, text_request: str, query_params: tuple, page_size: int, key_size: int):
+        """
+        Метод выполняет запрос страницы выборки (см. DBManager).
+        :param text_request: Текст запроса, последний параметр которого - ограничение количества записей (LIMIT).
+        :param query_params: Значения параметров запроса без ограничения количества записей.
+        :param page_size: Количество записей на странице.
+        :param key_size: Количество полей ключа сортировки.
+        :return: Экземпляр класса Page или None при ошибке выполнения запроса.
+        """
+        rows = await self.__execute_request(_numbered_params(text_request), *query_params, page_size + 1)
+        if rows is None:
+            return None
+
+        return page_from_rows(rows, page_size, key_size)
+
+    @staticmethod
+    def __check_page_size(page_size: int) -> None:
+        if page_size < 1:
+            raise ValueError('Размер страницы должен быть больше нуля.')
+
+    async def get_companies_and_vacancies_count(self, live: bool = False):
+        """
+        Метод возвращает список всех компаний и количество вакансий у каждой компании.
+        :param live: Выполнить запрос по таблицам, а не по материализованному представлению.
+        :return: Возвращает выборку детальных записей.
+        """
+        if not live:
+            return await self.__execute_request(queries.COMPANIES_AND_VACANCIES_COUNT_REQUEST)
+
+        return await self.__execute_request(queries.COMPANIES_AND_VACANCIES_COUNT_LIVE_REQUEST)
+
+    async def get_all_vacancies(self):
+        """
+        Метод возвращает список всех вакансий с указанием названия компании, названия вакансии и зарплаты
+        и ссылки на вакансию.
+        :return: Возвращает выборку детальных записей.
+        """
+        return await self.__execute_request(queries.ALL_VACANCIES_REQUEST)
+
+    async def get_employers_salary_stats(self):
+        """
+        Метод возвращает по каждой компании количество загруженных вакансий, среднюю, минимальную
+        и максимальную зарплату. Данные читаются из материализованного представления.
+        :return: Возвращает выборку детальных записей.
+        """
+        return await self.__execute_request(queries.EMPLOYERS_SALARY_STATS_REQUEST)
+
+    async def get_avg_salary(self, live: bool = False):
+        """
+        Метод возвращает среднюю зарплату по вакансиям.
+        :param live: Выполнить запрос по таблицам, а не по материализованному представлению.
+        :return: Возвращает выборку детальных записей.
+        """
+        if not live:
+            return await self.__execute_request(queries.AVG_SALARY_REQUEST)
+
+        return await self.__execute_request(queries.AVG_SALARY_LIVE_REQUEST)
+
+    async def get_vacancies_with_higher_salary(self, employer_id: str = None, date_from: date = None,
+                                               date_to: date = None, live: bool = False):
+        """
+        Метод возвращает список всех вакансий, у которых зарплата выше средней по всем вакансиям.
+        При указании отборов средняя зарплата вычисляется по отобранным вакансиям.
+        :param employer_id: Идентификатор работодателя на веб-портале для отбора вакансий.
+        :param date_from: Начальная дата публикации вакансий.
+        :param date_to: Конечная дата публикации вакансий.
+        :param live: Выполнить запрос по таблицам, а не по материализованным представлениям.
+        :return: Возвращает выборку детальных записей.
+        """
+        if not live and employer_id is None and date_from is None and date_to is None:
+            return await self.__execute_request(queries.VACANCIES_WITH_HIGHER_SALARY_REQUEST)
+
+        return await self.__execute_request(queries.VACANCIES_WITH_HIGHER_SALARY_FILTERED_REQUEST,
+                                            employer_id, date_from, date_to)
+
+    async def get_vacancies_with_keyword(self, key_word: str):
+        """
+        Метод возвращает все вакансии, в названии которых содержатся переданные в метод ключевого слова.
+        Поиск выполняется без учёта регистра по триграммному индексу, если на сервере установлено
+        расширение pg_trgm.
+        :param key_word: Ключевое слово по которому будет производиться отбор.
+        :return: Возвращает выборку детальных записей.
+        """
+        return await self.__execute_request(_numbered_params(queries.VACANCIES_WITH_KEYWORD_REQUEST),
+                                            queries.like_pattern(key_word))
+
+    async def search_vacancies(self, key_words: list, match_all: bool = True, limit: int = 20, offset: int = 0):
+        """
+        Метод выполняет полнотекстовый поиск вакансий по названию и описанию с ранжированием результатов.
+        :param key_words: Список ключевых слов (или фраз) для поиска.
+        :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+        :param limit: Максимальное количество возвращаемых вакансий.
+        :param offset: Количество пропускаемых вакансий от начала результатов.
+        :return: Возвращает выборку детальных записей: название вакансии, название компании, ссылка на вакансию
+        и ранг совпадения, в порядке убывания ранга.
+        """
+        key_words = [key_word for key_word in key_words if key_word.strip()]
+        if not key_words:
+            return []
+
+        text_request = _numbered_params(queries.search_vacancies_request(len(key_words), match_all))
+        return await self.__execute_request(text_request, *key_words, limit, offset)
+
+    async def get_companies_and_vacancies_count_page(self, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка всех компаний и количества вакансий у каждой компании.
+        Страницы упорядочены по идентификатору компании.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return await self.__execute_page(queries.companies_and_vacancies_count_page_request(bool(key)),
+                                         key or (), page_size, 1)
+
+    async def get_all_vacancies_page(self, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка всех вакансий с указанием названия компании, названия вакансии и зарплаты
+        и ссылки на вакансию. Страницы упорядочены по идентификатору вакансии (первичный ключ).
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return await self.__execute_page(queries.all_vacancies_page_request(bool(key)), key or (), page_size, 1)
+
+    async def get_avg_salary_page(self, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка средних зарплат по вакансиям. Страницы упорядочены по идентификатору вакансии.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return await self.__execute_page(queries.avg_salary_page_request(bool(key)), key or (), page_size, 1)
+
+    async def get_vacancies_with_higher_salary_page(self, page_size: int = 50, cursor: str = None,
+                                                    employer_id: str = None, date_from: date = None,
+                                                    date_to: date = None):
+        """
+        Метод возвращает страницу списка вакансий, у которых зарплата выше средней по всем вакансиям.
+        Страницы упорядочены по идентификатору вакансии. Без отборов средняя зарплата берётся
+        из материализованного представления, при указании отборов вычисляется по отобранным вакансиям
+        один раз - при запросе первой страницы.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :param employer_id: Идентификатор работодателя на веб-портале для отбора вакансий.
+        :param date_from: Начальная дата публикации вакансий.
+        :param date_to: Конечная дата публикации вакансий.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        text_conditions, filter_params = queries.vacancy_filters(employer_id, date_from, date_to)
+        # при отборах средняя зарплата по отобранным вакансиям вычисляется на первой странице и передаётся в курсоре.
+        key_size = 2 if text_conditions else 1
+        key = decode_cursor(cursor, key_size) if cursor else None
+
+        text_request = queries.vacancies_with_higher_salary_page_request(bool(key), text_conditions)
+        if not text_conditions:
+            query_params = key or ()
+        elif key:
+            query_params = (key[0], *filter_params, key[1])
+        else:
+            query_params = (*filter_params, *filter_params)
+        return await self.__execute_page(text_request, query_params, page_size, key_size)
+
+    async def get_vacancies_with_keyword_page(self, key_word: str, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка вакансий, в названии которых содержится ключевое слово.
+        Страницы упорядочены по идентификатору вакансии.
+        :param key_word: Ключевое слово по которому будет производиться отбор.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return await self.__execute_page(queries.vacancies_with_keyword_page_request(bool(key)),
+                                         (queries.like_pattern(key_word), *(key or ())), page_size, 1)
+
+    async def search_vacancies_page(self, key_words: list, match_all: bool = True, page_size: int = 20,
+                                    cursor: str = None):
+        """
+        Метод возвращает страницу результатов полнотекстового поиска вакансий в порядке убывания ранга совпадения.
+        :param key_words: Список ключевых слов (или фраз) для поиска.
+        :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page: название вакансии, название компании, ссылка на вакансию и ранг совпадения.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 2) if cursor else None
+
+        key_words = [key_word for key_word in key_words if key_word.strip()]
+        if not key_words:
+            return Page([], None)
+
+        key_params = (key[0], key[0], key[1]) if key else ()
+        return await self.__execute_page(queries.search_vacancies_page_request(len(key_words), match_all, bool(key)),
+                                         (*key_words, *key_params), page_size, 2)
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import time
+from hashlib import sha256
+from urllib.parse import urlparse
+
+
+class ResponseCache:
+    """
+    Класс дискового кэша ответов веб-порталов.
+    Каждый ответ хранится в отдельном файле, ключом служит адрес запроса вместе с параметрами.
+    Срок актуальности ответа задаётся для каждого адреса API отдельно. Устаревший ответ не удаляется,
+    а используется для условного запроса (If-None-Match / If-Modified-Since): если данные на веб-портале
+    не изменились, ответ берётся из кэша. При превышении объёма кэша удаляются давно не использованные ответы.
+    Экземпляр класса можно использовать из нескольких потоков одновременно.
+    """
+    __slots__ = ('__directory', '__max_bytes', '__default_ttl', '__ttl_by_path', '__size', '__lock', '__stats')
+
+    def __init__(self, directory: str = '.cache/hh', max_bytes: int = 100 * 1024 * 1024,
+                 default_ttl: float = 3600, ttl_by_path: dict = None):
+        """
+        Инициализация кэша.
+        :param directory: Каталог для хранения ответов.
+        :param max_bytes: Максимальный объём кэша в байтах.
+        :param default_ttl: Срок актуальности ответа в секундах.
+        :param ttl_by_path: Сроки актуальности ответов в секундах по началу пути адреса API,
+        например {'/employers/': 86400, '/vacancies': 600}.
+        """
+        if max_bytes < 1:
+            raise ValueError('Объём кэша должен быть больше нуля.')
+
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        self.__default_ttl = default_ttl
+        self.__ttl_by_path = dict(ttl_by_path or {})
+        self.__lock = threading.Lock()
+        self.__stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self.__size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith('.json'))
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return dict(self.__stats)
+
+    @property
+    def hit_ratio(self):
+        """
+        Доля запросов, ответ на которые получен из кэша (в том числе после условного запроса).
+        :return: Число от 0 до 1.
+        """
+        with self.__lock:
+            total = self.__stats['hits'] + self.__stats['revalidated'] + self.__stats['misses']
+            return (self.__stats['hits'] + self.__stats['revalidated']) / total if total else 0.0
+
+    def __str__(self):
+        """
+        Переопределённое представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        stats = self.stats
+        return (f"Кэш: попаданий {stats['hits']}, подтверждено {stats['revalidated']}, промахов {stats['misses']}, "
+                f"доля попаданий {self.hit_ratio:.0%}")
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}('{self.__directory}', {self.__max_bytes})"
+
+    @staticmethod
+    def make_key(url: str, params: dict = None) -> str:
+        """
+        Ключ кэша: хеш адреса запроса и упорядоченных параметров.
+        :param url: Адрес запроса.
+        :param params: Параметры запроса.
+        :return: Строка ключа.
+        """
+        text_key = json.dumps([url, sorted((params or {}).items())], default=str, ensure_ascii=False)
+        return sha256(text_key.encode('utf-8')).hexdigest()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.__directory, key + '.json')
+
+    def ttl(self, url: str) -> float:
+        """
+        Срок актуальности ответа для адреса: выбирается по самому длинному совпадающему началу пути.
+        :param url: Адрес запроса.
+        :return: Срок актуальности в секундах.
+        """
+        path = urlparse(url).path
+        prefixes = [prefix for prefix in self.__ttl_by_path if path.startswith(prefix)]
+        return self.__ttl_by_path[max(prefixes, key=len)] if prefixes else self.__default_ttl
+
+    def get(self, url: str, params: dict = None):
+        """
+        Получить сохранённый ответ. Использование ответа продлевает его нахождение в кэше.
+        :param url: Адрес запроса.
+        :param params: Параметры запроса.
+        :return: Словарь с телом ответа, заголовками ETag / Last-Modified и временем сохранения или None.
+        """
+        path = self.__path(self.make_key(url, params))
+        try:
+            with open(path, encoding='utf-8') as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, url: str, entry: dict) -> bool:
+        """
+        Проверка, что срок актуальности сохранённого ответа не истёк.
+        :param url: Адрес запроса.
+        :param entry: Сохранённый ответ.
+        :return: True, если ответ можно использовать без запроса к веб-порталу.
+        """
+        return time.time() - entry['stored_at'] < self.ttl(url)
+
+    def record(self, outcome: str) -> None:
+        """
+        Учесть результат обращения к кэшу в статистике.
+        :param outcome: 'hits', 'revalidated' или 'misses'.
+        :return:
+        """
+        with self.__lock:
+            self.__stats[outcome] += 1
+
+    def put(self, url: str, params: dict, body, etag: str = None, last_modified: str = None) -> dict:
+        """
+        Сохранить ответ в кэш. Запись выполняется через временный файл, чтобы другие потоки не прочитали
+        частично записанный ответ.
+        :param url: Адрес запроса.
+        :param params: Параметры запроса.
+        :param body: Тело ответа в формате JSON.
+        :param etag: Значение заголовка ETag ответа.
+        :param last_modified: Значение заголовка Last-Modified ответа.
+        :return: Сохранённый ответ.
+        """
+        entry = {'url': url, 'stored_at': time.time(), 'etag': etag, 'last_modified': last_modified, 'body': body}
+        payload = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+        path = self.__path(self.make_key(url, params))
+        path_tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(path_tmp, 'wb') as file:
+            file.write(payload)
+
+        with self.__lock:
+            try:
+                self.__size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(path_tmp, path)
+            self.__size += len(payload)
+            self.__stats['stores'] += 1
+
+            if self.__size > self.__max_bytes:
+                self.__evict()
+
+        return entry
+
+    def refresh(self, url: str, params: dict, entry: dict) -> None:
+        """
+        Продлить срок актуальности ответа, подтверждённого веб-порталом (ответ 304 Not Modified).
+        :param url: Адрес запроса.
+        :param params: Параметры запроса.
+        :param entry: Сохранённый ответ.
+        :return:
+        """
+        self.put(url, params, entry['body'], entry.get('etag'), entry.get('last_modified'))
+
+    def __evict(self) -> None:
+        """
+        Удалить давно не использованные ответы, пока объём кэша превышает допустимый.
+        Вызывается под блокировкой.
+        :return:
+        """
+        entries = sorted((entry for entry in os.scandir(self.__directory) if entry.name.endswith('.json')),
+                         key=lambda entry: entry.stat().st_mtime)
+
+        for entry in entries:
+            if self.__size <= self.__max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self.__size -= size
+            self.__stats['evictions'] += 1
+
+    def clear(self) -> None:
+        """
+        Удалить все сохранённые ответы.
+        :return:
+        """
+        with self.__lock:
+            for entry in os.scandir(self.__directory):
+                if entry.name.endswith('.json'):
+                    os.remove(entry.path)
+            self.__size = 0
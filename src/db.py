@@ -1,15 +1,77 @@
+import threading
+import time
+from datetime import date
+from functools import wraps
+from inspect import signature
+from uuid import uuid4
+
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from src.metrics import metrics
+from src import queries
+from src.pagination import Page, decode_cursor, page_from_rows
+from src.query_cache import QueryCache, get_data_version
+
+
+class InstrumentedConnectionPool(ThreadedConnectionPool):
+    """
+    Пул подключений, учитывающий открытые подключения к СУБД в показателях работы.
+    """
+
+    def _connect(self, key=None):
+        metrics.inc('db_connections_opened_total', source='pool')
+        return super()._connect(key)
 
 
 class DBManager:
     """
     Класс для работы с базой данных и имеющий несколько методов с различными выборками.
+    Подключения к СУБД берутся из пула и возвращаются в него после выполнения запроса,
+    экземпляр класса можно использовать из нескольких потоков одновременно.
+    Отчёты по умолчанию читаются из материализованных представлений, обновляемых после записи данных
+    (см. uteils.func.refresh_materialized_views); с параметром live=True они вычисляются по таблицам.
+    Результаты небольших сводных отчётов (по компаниям и ограниченного поиска) могут сохраняться в кэше экземпляра
+    класса: кэш сбрасывается после записи данных в текущем процессе и при изменении счётчика версии данных
+    в базе данных (запись из других процессов). Списки вакансий, размер которых растёт с количеством вакансий,
+    не кэшируются: их удобнее получать постранично или через iter_all_vacancies.
     """
-    __slots__ = ('__database_name', '__params')
+    __slots__ = ('__database_name', '__params', '__min_connections', '__max_connections',
+                 '__pool', '__pool_lock', '__pool_slots', '__stats',
+                 '__query_cache', '__version_check_interval', '__db_version', '__version_checked_at')
+
+    def __init__(self, database_name: str, params: dict, min_connections: int = 1, max_connections: int = 5,
+                 cache_size: int = 0, cache_ttl: float = None, version_check_interval: float | None = 5.0):
+        """
+        Инициализация экземпляра класса.
+        :param database_name: Имя базы данных в которой будут выполняться запросы.
+        :param params: Набор передаваемых параметров для подключения к СУБД.
+        :param min_connections: Количество подключений, открываемых при создании пула.
+        :param max_connections: Максимальное количество одновременно открытых подключений.
+        :param cache_size: Максимальное количество выборок в кэше, 0 - выборки не кэшируются.
+        :param cache_ttl: Срок актуальности выборки в кэше в секундах. Если не указан, выборка актуальна
+        до изменения данных.
+        :param version_check_interval: Как часто (в секундах) сверять счётчик версии данных в базе данных.
+        None - изменения данных другими процессами не отслеживаются.
+        """
+        if not 0 <= min_connections <= max_connections or max_connections < 1:
+            raise ValueError('Некорректные границы размера пула подключений.')
 
-    def __init__(self, database_name: str, params: dict):
         self.__database_name = database_name
         self.__params = params
+        self.__min_connections = min_connections
+        self.__max_connections = max_connections
+        self.__pool = None
+        self.__pool_lock = threading.Lock()
+        # Семафор ограничивает количество потоков, одновременно получивших подключение:
+        # при исчерпании пула поток ожидает освобождения подключения, а не получает ошибку.
+        self.__pool_slots = threading.BoundedSemaphore(max_connections)
+        self.__stats = {'checkouts': 0, 'waits': 0, 'in_use': 0, 'peak_in_use': 0}
+
+        self.__query_cache = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.__version_check_interval = version_check_interval
+        self.__db_version = None
+        self.__version_checked_at = None
 
     @property
     def database_name(self):
@@ -19,6 +81,14 @@ class DBManager:
     def params(self):
         return self.__params
 
+    @property
+    def max_connections(self):
+        return self.__max_connections
+
+    @property
+    def query_cache(self):
+        return self.__query_cache
+
     def __str__(self):
         """
         Переопределённое представление строкового значения экземпляра класса.
@@ -33,124 +103,488 @@ class DBManager:
         """
         return f"{self.__class__.__name__}('{self.__database_name}')"
 
-    def __execute_request(self, text_request):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Метод закрывает все подключения пула.
+        :return:
+        """
+        with self.__pool_lock:
+            if self.__pool is not None:
+                self.__pool.closeall()
+                self.__pool = None
+
+    def pool_stats(self) -> dict:
+        """
+        Метод возвращает статистику использования пула подключений.
+        :return: Словарь с размером пула, количеством занятых подключений, максимальным количеством
+        одновременно занятых подключений, количеством выдач подключений и количеством ожиданий свободного подключения.
+        """
+        with self.__pool_lock:
+            return {'min_connections': self.__min_connections,
+                    'max_connections': self.__max_connections,
+                    **self.__stats}
+
+    def __get_pool(self):
+        """
+        Пул подключений создаётся при первом запросе к СУБД.
+        :return: Экземпляр ThreadedConnectionPool.
+        """
+        with self.__pool_lock:
+            if self.__pool is None:
+                self.__pool = InstrumentedConnectionPool(self.__min_connections, self.__max_connections,
+                                                     dbname=self.__database_name, **self.__params)
+            return self.__pool
+
+    def __get_connection(self):
+        """
+        Метод получает подключение из пула, при необходимости ожидая освобождения подключения.
+        :return: Кортеж из пула и подключения к СУБД.
+        """
+        if not self.__pool_slots.acquire(blocking=False):
+            with self.__pool_lock:
+                self.__stats['waits'] += 1
+            self.__pool_slots.acquire()
+
+        try:
+            pool = self.__get_pool()
+            connection = pool.getconn()
+        except Exception:
+            self.__pool_slots.release()
+            raise
+
+        with self.__pool_lock:
+            self.__stats['checkouts'] += 1
+            self.__stats['in_use'] += 1
+            self.__stats['peak_in_use'] = max(self.__stats['peak_in_use'], self.__stats['in_use'])
+
+        return pool, connection
+
+    def __put_connection(self, pool, connection):
+        """
+        Метод возвращает подключение в пул. Незавершённая транзакция откатывается,
+        закрытое (сломанное) подключение удаляется из пула.
+        :param pool: Пул, из которого было получено подключение.
+        :param connection: Подключение к СУБД.
+        :return:
+        """
+        broken = bool(connection.closed)
+        if not broken:
+            try:
+                connection.rollback()
+            except (Exception, psycopg2.DatabaseError):
+                broken = True
+
+        try:
+            pool.putconn(connection, close=broken)
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(error)
+        finally:
+            with self.__pool_lock:
+                self.__stats['in_use'] -= 1
+            self.__pool_slots.release()
+
+    def __execute_request(self, text_request, query_params: tuple = None):
         """
         Метод выполняет запрос в СУБД для получения данных.
         :param request_text: Текс запроса.
+        :param query_params: Значения параметров запроса, передаваемые отдельно от его текста.
         :return: Возвращает выборку детальных записей.
         """
 
-        # первоначальное подключение к системе управления базами данных.
-        connection = psycopg2.connect(dbname=self.__database_name, **self.__params)
+        # получаем подключение к системе управления базами данных из пула.
+        pool, connection = self.__get_connection()
 
-        # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+        # помещаем работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
         try:
             # инициализация курсора для написания запросов в СУБД.
             with connection.cursor() as cursor:
-                cursor.execute(text_request)
+                cursor.execute(text_request, query_params)
 
                 return cursor.fetchall()
 
         except(Exception, psycopg2.DatabaseError) as error:
             print(error)
+            metrics.inc('db_query_errors_total')
 
         finally:
-            if connection is not None:
-                connection.close()
+            # возвращаем подключение в пул.
+            self.__put_connection(pool, connection)
 
-    def get_companies_and_vacancies_count(self):
+    def __execute_prepared(self, statement_name: str, text_request: str, query_params: tuple):
         """
-        Метод возвращает список всех компаний и количество вакансий у каждой компании.
+        Метод выполняет подготовленный (PREPARE) запрос в СУБД для получения данных.
+        Запрос подготавливается один раз на каждом подключении пула, повторные вызовы не тратят время на разбор
+        и планирование запроса. Параметры передаются в запрос отдельно от его текста.
+        :param statement_name: Имя подготовленного запроса.
+        :param text_request: Текст запроса с параметрами $1, $2, ... и их типами в заголовке PREPARE.
+        :param query_params: Значения параметров запроса.
+        :return: Возвращает выборку детальных записей.
+        """
+        text_execute = f"EXECUTE {statement_name} ({', '.join(['%s'] * len(query_params))})"
+
+        # получаем подключение к системе управления базами данных из пула.
+        pool, connection = self.__get_connection()
+
+        # помещаем работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+        try:
+            # инициализация курсора для написания запросов в СУБД.
+            with connection.cursor() as cursor:
+                try:
+                    cursor.execute(text_execute, query_params)
+                except psycopg2.errors.InvalidSqlStatementName:
+                    # на этом подключении запрос ещё не подготовлен: подготавливаем и повторяем.
+                    connection.rollback()
+                    cursor.execute(f"PREPARE {statement_name} {text_request}")
+                    cursor.execute(text_execute, query_params)
+
+                return cursor.fetchall()
+
+        except(Exception, psycopg2.DatabaseError) as error:
+            print(error)
+            metrics.inc('db_query_errors_total')
+
+        finally:
+            # возвращаем подключение в пул.
+            self.__put_connection(pool, connection)
+
+    def __iter_request(self, text_request, itersize: int):
+        """
+        Метод выполняет запрос в СУБД и выдаёт записи выборки по одной через именованный (серверный) курсор.
+        Записи передаются с сервера пакетами по itersize штук, поэтому вся выборка не загружается в память.
+        Подключение возвращается в пул после чтения всей выборки или закрытия генератора.
+        :param text_request: Текст запроса.
+        :param itersize: Количество записей, передаваемых с сервера за одно обращение.
+        :return: Генератор записей выборки.
+        """
+        if itersize < 1:
+            raise ValueError('Размер пакета записей должен быть больше нуля.')
+
+        # получаем подключение к системе управления базами данных из пула.
+        pool, connection = self.__get_connection()
+
+        # помещаем работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+        try:
+            # именованный курсор создаётся на стороне сервера и существует до конца транзакции.
+            with connection.cursor(name=f'dbmanager_{uuid4().hex}') as cursor:
+                cursor.itersize = itersize
+                cursor.execute(text_request)
+
+                yield from cursor
+
+        except(Exception, psycopg2.DatabaseError) as error:
+            print(error)
+            metrics.inc('db_query_errors_total')
+
+        finally:
+            # возвращаем подключение в пул, незавершённая транзакция с курсором откатывается.
+            self.__put_connection(pool, connection)
+
+    def __execute_page(self, text_request: str, query_params: tuple, page_size: int, key_size: int):
+        """
+        Метод выполняет запрос страницы выборки. Первые key_size полей выборки - ключ сортировки,
+        они не входят в записи страницы, а по последней записи формируется курсор следующей страницы.
+        Запрашивается на одну запись больше размера страницы, чтобы определить наличие следующей страницы.
+        :param text_request: Текст запроса, последний параметр которого - ограничение количества записей (LIMIT).
+        :param query_params: Значения параметров запроса без ограничения количества записей.
+        :param page_size: Количество записей на странице.
+        :param key_size: Количество полей ключа сортировки.
+        :return: Экземпляр класса Page или None при ошибке выполнения запроса.
+        """
+        rows = self.__execute_request(text_request, (*query_params, page_size + 1))
+        if rows is None:
+            return None
+
+        return page_from_rows(rows, page_size, key_size)
+
+    @staticmethod
+    def __check_page_size(page_size: int) -> None:
+        if page_size < 1:
+            raise ValueError('Размер страницы должен быть больше нуля.')
+
+    def __validate_query_cache(self) -> tuple:
+        """
+        Метод сверяет версию данных, к которой относятся выборки в кэше: номер изменения данных в текущем процессе
+        и (не чаще version_check_interval секунд) счётчик версии данных в базе данных.
+        :return: Текущая версия данных.
+        """
+        now = time.monotonic()
+        if self.__version_check_interval is not None and (
+                self.__version_checked_at is None or now - self.__version_checked_at >= self.__version_check_interval):
+            answer = self.__execute_request("SELECT data_version.version FROM data_version WHERE data_version.id = 1")
+            self.__db_version = answer[0][0] if answer else None
+            self.__version_checked_at = now
+
+        version = (get_data_version(self.__database_name), self.__db_version)
+        self.__query_cache.validate(version)
+        return version
+
+    def __execute_cached(self, key: tuple, request):
+        """
+        Метод возвращает выборку из кэша, а при её отсутствии выполняет запрос и сохраняет выборку в кэш.
+        Длительность выполнения запроса заносится в показатели работы по имени метода.
+        :param key: Ключ выборки: имя метода и значения его параметров.
+        :param request: Функция без аргументов, выполняющая запрос.
         :return: Возвращает выборку детальных записей.
         """
+        if self.__query_cache is None:
+            with metrics.timer('db_query_seconds', method=key[0]):
+                return request()
+
+        version = self.__validate_query_cache()
+
+        found, rows = self.__query_cache.get(key)
+        metrics.inc('db_query_cache_total', method=key[0], outcome='hits' if found else 'misses')
+        if found:
+            return list(rows)
+
+        with metrics.timer('db_query_seconds', method=key[0]):
+            rows = request()
+        # выборку с ошибкой выполнения запроса не сохраняем, как и выборку, во время получения которой
+        # данные изменились: она могла быть получена до изменения и сохранилась бы под новой версией.
+        if rows is not None and get_data_version(self.__database_name) == version[0]:
+            self.__query_cache.put(key, list(rows), version)
+        return rows
 
-        text_request = """
-            SELECT
-                employers.name AS name, 
-                employers.open_vacancies AS open_vacancies 
-            FROM
-                employers
+    def __cached_query(method):
         """
-        return self.__execute_request(text_request)
+        Декоратор метода выборки: результат сохраняется в кэше по имени метода и значениям его параметров.
+        :param method: Метод выборки.
+        :return: Метод, использующий кэш выборок.
+        """
+        method_signature = signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            arguments = method_signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            key = (method.__name__, *((name, tuple(value) if isinstance(value, list) else value)
+                                      for name, value in list(arguments.arguments.items())[1:]))
+            return self.__execute_cached(key, lambda: method(self, *args, **kwargs))
+
+        return wrapper
+
+    def __timed_query(method):
+        """
+        Декоратор метода выборки без кэширования: длительность выполнения запроса заносится в показатели работы.
+        :param method: Метод выборки.
+        :return: Метод, учитывающий длительность выполнения запроса.
+        """
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with metrics.timer('db_query_seconds', method=method.__name__):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    @__cached_query
+    def get_companies_and_vacancies_count(self, live: bool = False):
+        """
+        Метод возвращает список всех компаний и количество вакансий у каждой компании.
+        :param live: Выполнить запрос по таблицам, а не по материализованному представлению.
+        :return: Возвращает выборку детальных записей.
+        """
+        if not live:
+            return self.__execute_request(queries.COMPANIES_AND_VACANCIES_COUNT_REQUEST)
 
+        return self.__execute_request(queries.COMPANIES_AND_VACANCIES_COUNT_LIVE_REQUEST)
+
+    @__timed_query
     def get_all_vacancies(self):
         """
         Метод возвращает список всех вакансий с указанием названия компании, названия вакансии и зарплаты
         и ссылки на вакансию.
         :return: Возвращает выборку детальных записей.
         """
+        return self.__execute_request(queries.ALL_VACANCIES_REQUEST)
 
-        text_request = """
-            SELECT
-                employers.name AS employers_name, 
-                vacancies.name AS vacancies_name,
-                vacancies.salary_from AS salary_from,
-                vacancies.salary_to AS salary_to,
-                vacancies.alternate_url AS alternate_url
-            FROM
-                vacancies
-                    LEFT JOIN employers
-                        ON vacancies.employer_id = employers.id
+    def iter_all_vacancies(self, itersize: int = 2000):
+        """
+        Метод выдаёт все вакансии с указанием названия компании, названия вакансии и зарплаты и ссылки на вакансию
+        по одной записи, не загружая всю выборку в память.
+        :param itersize: Количество записей, передаваемых с сервера за одно обращение.
+        :return: Генератор детальных записей.
         """
-        return self.__execute_request(text_request)
+        return self.__iter_request(queries.ALL_VACANCIES_REQUEST, itersize)
 
-    def get_avg_salary(self):
+    @__cached_query
+    def get_employers_salary_stats(self):
         """
-        Метод возвращает среднюю зарплату по вакансиям.
+        Метод возвращает по каждой компании количество загруженных вакансий, среднюю, минимальную
+        и максимальную зарплату. Данные читаются из материализованного представления.
         :return: Возвращает выборку детальных записей.
         """
+        return self.__execute_request(queries.EMPLOYERS_SALARY_STATS_REQUEST)
 
-        text_request = """
-            SELECT
-                employers.name AS employers_name, 
-                vacancies.name AS vacancies_name,
-                (vacancies.salary_to + vacancies.salary_from)/2 AS avg_salary
-            FROM
-                vacancies
-                    LEFT JOIN employers
-                        ON vacancies.employer_id = employers.id
+    @__timed_query
+    def get_avg_salary(self, live: bool = False):
+        """
+        Метод возвращает среднюю зарплату по вакансиям.
+        :param live: Выполнить запрос по таблицам, а не по материализованному представлению.
+        :return: Возвращает выборку детальных записей.
         """
-        return self.__execute_request(text_request)
+        if not live:
+            return self.__execute_request(queries.AVG_SALARY_REQUEST)
+
+        return self.__execute_request(queries.AVG_SALARY_LIVE_REQUEST)
 
-    def get_vacancies_with_higher_salary(self):
+    @__timed_query
+    def get_vacancies_with_higher_salary(self, employer_id: str = None, date_from: date = None,
+                                         date_to: date = None, live: bool = False):
         """
         Метод возвращает список всех вакансий, у которых зарплата выше средней по всем вакансиям.
+        Средняя зарплата и отбор вакансий вычисляются одним запросом. При указании отборов средняя зарплата
+        вычисляется по отобранным вакансиям.
+        Без отборов средняя зарплата берётся из материализованного представления, вакансии отбираются по индексу.
+        :param employer_id: Идентификатор работодателя на веб-портале для отбора вакансий.
+        :param date_from: Начальная дата публикации вакансий.
+        :param date_to: Конечная дата публикации вакансий.
+        :param live: Выполнить запрос по таблицам, а не по материализованным представлениям.
         :return: Возвращает выборку детальных записей.
         """
+        if not live and employer_id is None and date_from is None and date_to is None:
+            return self.__execute_request(queries.VACANCIES_WITH_HIGHER_SALARY_REQUEST)
 
-        text_request = """
-            SELECT
-                (AVG(vacancies.salary_to) + AVG(vacancies.salary_from))/2 AS avg_salary_all_vacancy
-            FROM
-                vacancies
+        text_request = f"(varchar, date, date) AS {queries.VACANCIES_WITH_HIGHER_SALARY_FILTERED_REQUEST}"
+        return self.__execute_prepared('vacancies_with_higher_salary', text_request,
+                                       (employer_id, date_from, date_to))
+
+    @__timed_query
+    def get_vacancies_with_keyword(self, key_word: str):
+        """
+        Метод возвращает все вакансии, в названии которых содержатся переданные в метод ключевого слова.
+        Поиск выполняется без учёта регистра по триграммному индексу, если на сервере установлено
+        расширение pg_trgm.
+        :param key_word: Ключевое слово по которому будет производиться отбор.
+        :return: Возвращает выборку детальных записей.
         """
-        avg_salary_all_vacancy = self.__execute_request(text_request)[0][0]
+        return self.__execute_request(queries.VACANCIES_WITH_KEYWORD_REQUEST, (queries.like_pattern(key_word),))
 
-        text_request = f"""
-            SELECT
-                vacancies.name AS vacancies_name,
-                (vacancies.salary_to + vacancies.salary_from)/2 AS avg_salary
-            FROM
-                vacancies
-            WHERE
-                (vacancies.salary_to + vacancies.salary_from)/2 >= {avg_salary_all_vacancy}
+    @__cached_query
+    def search_vacancies(self, key_words: list, match_all: bool = True, limit: int = 20, offset: int = 0):
         """
+        Метод выполняет полнотекстовый поиск вакансий по названию и описанию с ранжированием результатов.
+        :param key_words: Список ключевых слов (или фраз) для поиска.
+        :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+        :param limit: Максимальное количество возвращаемых вакансий.
+        :param offset: Количество пропускаемых вакансий от начала результатов.
+        :return: Возвращает выборку детальных записей: название вакансии, название компании, ссылка на вакансию
+        и ранг совпадения, в порядке убывания ранга.
+        """
+        key_words = [key_word for key_word in key_words if key_word.strip()]
+        if not key_words:
+            return []
 
-        return self.__execute_request(text_request)
+        return self.__execute_request(queries.search_vacancies_request(len(key_words), match_all),
+                                      (*key_words, limit, offset))
 
-    def get_vacancies_with_keyword(self, key_word: str):
+    def get_companies_and_vacancies_count_page(self, page_size: int = 50, cursor: str = None):
         """
-        Метод возвращает все вакансии, в названии которых содержатся переданные в метод ключевого слова.
+        Метод возвращает страницу списка всех компаний и количества вакансий у каждой компании.
+        Страницы упорядочены по идентификатору компании, следующая страница начинается после последней
+        записи предыдущей (по индексу), поэтому время получения любой страницы одинаково.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return self.__execute_page(queries.companies_and_vacancies_count_page_request(bool(key)),
+                                   key or (), page_size, 1)
+
+    def get_all_vacancies_page(self, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка всех вакансий с указанием названия компании, названия вакансии и зарплаты
+        и ссылки на вакансию. Страницы упорядочены по идентификатору вакансии (первичный ключ).
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return self.__execute_page(queries.all_vacancies_page_request(bool(key)), key or (), page_size, 1)
+
+    def get_avg_salary_page(self, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка средних зарплат по вакансиям. Страницы упорядочены по идентификатору вакансии.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
+
+        return self.__execute_page(queries.avg_salary_page_request(bool(key)), key or (), page_size, 1)
+
+    def get_vacancies_with_higher_salary_page(self, page_size: int = 50, cursor: str = None, employer_id: str = None,
+                                              date_from: date = None, date_to: date = None):
+        """
+        Метод возвращает страницу списка вакансий, у которых зарплата выше средней по всем вакансиям.
+        Страницы упорядочены по идентификатору вакансии. Без отборов средняя зарплата берётся
+        из материализованного представления, при указании отборов вычисляется по отобранным вакансиям
+        один раз - при запросе первой страницы.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :param employer_id: Идентификатор работодателя на веб-портале для отбора вакансий.
+        :param date_from: Начальная дата публикации вакансий.
+        :param date_to: Конечная дата публикации вакансий.
+        :return: Экземпляр класса Page.
+        """
+        self.__check_page_size(page_size)
+        text_conditions, filter_params = queries.vacancy_filters(employer_id, date_from, date_to)
+        # при отборах средняя зарплата по отобранным вакансиям вычисляется на первой странице и передаётся в курсоре.
+        key_size = 2 if text_conditions else 1
+        key = decode_cursor(cursor, key_size) if cursor else None
+
+        text_request = queries.vacancies_with_higher_salary_page_request(bool(key), text_conditions)
+        if not text_conditions:
+            query_params = key or ()
+        elif key:
+            query_params = (key[0], *filter_params, key[1])
+        else:
+            query_params = (*filter_params, *filter_params)
+        return self.__execute_page(text_request, query_params, page_size, key_size)
+
+    def get_vacancies_with_keyword_page(self, key_word: str, page_size: int = 50, cursor: str = None):
+        """
+        Метод возвращает страницу списка вакансий, в названии которых содержится ключевое слово.
+        Страницы упорядочены по идентификатору вакансии.
         :param key_word: Ключевое слово по которому будет производиться отбор.
-        :return: Возвращает выборку детальных записей.
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page.
         """
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 1) if cursor else None
 
-        text_request = f"""
-            SELECT
-                vacancies.name AS vacancies_name
-            FROM
-                vacancies
-            WHERE
-                vacancies.name LIKE '%{key_word}%'
+        return self.__execute_page(queries.vacancies_with_keyword_page_request(bool(key)),
+                                   (queries.like_pattern(key_word), *(key or ())), page_size, 1)
+
+    def search_vacancies_page(self, key_words: list, match_all: bool = True, page_size: int = 20,
+                              cursor: str = None):
+        """
+        Метод возвращает страницу результатов полнотекстового поиска вакансий в порядке убывания ранга совпадения.
+        Следующая страница начинается после ранга и идентификатора последней вакансии предыдущей страницы.
+        :param key_words: Список ключевых слов (или фраз) для поиска.
+        :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+        :param page_size: Количество записей на странице.
+        :param cursor: Курсор страницы из предыдущей страницы (next_cursor), None для первой страницы.
+        :return: Экземпляр класса Page: название вакансии, название компании, ссылка на вакансию и ранг совпадения.
         """
-        return self.__execute_request(text_request)
\ No newline at end of file
+        self.__check_page_size(page_size)
+        key = decode_cursor(cursor, 2) if cursor else None
+
+        key_words = [key_word for key_word in key_words if key_word.strip()]
+        if not key_words:
+            return Page([], None)
+
+        key_params = (key[0], key[0], key[1]) if key else ()
+        return self.__execute_page(queries.search_vacancies_page_request(len(key_words), match_all, bool(key)),
+                                   (*key_words, *key_params), page_size, 2)
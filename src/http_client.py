@@ -0,0 +1,218 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.archive import ResponseArchive
+from src.cache import ResponseCache
+from src.metrics import endpoint_name, metrics
+from src.scheduler import RequestScheduler
+
+
+class HTTPClient:
+    """
+    Класс для выполнения HTTP-запросов к веб-порталам через общий пул соединений.
+    Соединения удерживаются открытыми (keep-alive) и переиспользуются между запросами,
+    поэтому повторные запросы к тому же хосту не тратят время на установку TCP/TLS соединения.
+    Экземпляр класса можно использовать из нескольких потоков одновременно.
+    """
+    __slots__ = ('__pool_size', '__cache', '__scheduler', '__archive', '__session', '__lock')
+
+    def __init__(self, pool_size: int = 10, cache: ResponseCache = None, scheduler: RequestScheduler = None,
+                 archive: ResponseArchive = None):
+        """
+        Инициализация клиента.
+        :param pool_size: Максимальное количество открытых соединений с одним хостом.
+        :param cache: Кэш ответов. Если не указан, ответы не кэшируются.
+        :param scheduler: Планировщик запросов с ограничением частоты и повторами.
+        Если не указан, запросы выполняются сразу и без повторов.
+        :param archive: Архив, в который дописываются полученные с веб-портала ответы в формате JSON
+        (ответы из кэша не дописываются). Если не указан, ответы не архивируются.
+        """
+        if pool_size < 1:
+            raise ValueError('Размер пула соединений должен быть больше нуля.')
+
+        self.__pool_size = pool_size
+        self.__cache = cache
+        self.__scheduler = scheduler
+        self.__archive = archive
+        self.__session = None
+        self.__lock = threading.Lock()
+
+    @property
+    def pool_size(self):
+        return self.__pool_size
+
+    @property
+    def cache(self):
+        return self.__cache
+
+    @property
+    def scheduler(self):
+        return self.__scheduler
+
+    @property
+    def archive(self):
+        return self.__archive
+
+    @property
+    def session(self):
+        """
+        Сессия создаётся при первом обращении, под блокировкой, чтобы потоки не создали несколько сессий.
+        :return: Экземпляр requests.Session с подключенным пулом соединений.
+        """
+        if self.__session is None:
+            with self.__lock:
+                if self.__session is None:
+                    self.__session = self.__create_session()
+        return self.__session
+
+    def __str__(self):
+        """
+        Переопределённое представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f'pool_size = {self.__pool_size}'
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({self.__pool_size})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __create_session(self):
+        """
+        Создание сессии с пулом соединений заданного размера.
+        Если все соединения заняты, поток ожидает освобождения соединения, а не открывает новое.
+        :return: Экземпляр requests.Session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.__pool_size, pool_maxsize=self.__pool_size, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        return session
+
+    def get(self, url: str, headers: dict = None, params: dict = None):
+        """
+        Выполнить GET-запрос через пул соединений.
+        :param url: Адрес запроса.
+        :param headers: Заголовки запроса.
+        :param params: Параметры запроса.
+        :return: Экземпляр requests.Response.
+        """
+        if self.__scheduler is not None:
+            return self.__scheduler.send(url, lambda: self.__send(url, headers, params))
+
+        return self.__send(url, headers, params)
+
+    def __send(self, url: str, headers: dict, params: dict):
+        """
+        Выполнить одну попытку GET-запроса с замером длительности, кода ответа и объёма ответа.
+        :return: Экземпляр requests.Response.
+        """
+        if not metrics.enabled:
+            return self.session.get(url, headers=headers, params=params)
+
+        endpoint = endpoint_name(url)
+        try:
+            with metrics.timer('http_request_seconds', endpoint=endpoint):
+                response = self.session.get(url, headers=headers, params=params)
+        except requests.RequestException as error:
+            metrics.inc('http_errors_total', endpoint=endpoint, status=error.__class__.__name__)
+            raise
+
+        metrics.inc('http_requests_total', endpoint=endpoint, status=str(response.status_code))
+        # объём ответа учитываем по переданному веб-порталом (возможно, сжатому) телу ответа.
+        metrics.inc('http_response_bytes_total', int(response.headers.get('Content-Length') or len(response.content)),
+                    endpoint=endpoint)
+        return response
+
+    def get_json(self, url: str, headers: dict = None, params: dict = None):
+        """
+        Выполнить GET-запрос и получить ответ в формате JSON.
+        Если подключен кэш, актуальный ответ берётся из кэша без запроса, а устаревший проверяется
+        условным запросом: при ответе 304 Not Modified используется сохранённый ответ.
+        :param url: Адрес запроса.
+        :param headers: Заголовки запроса.
+        :param params: Параметры запроса.
+        :return: Данные ответа в формате JSON.
+        """
+        entry = None
+        request_headers = dict(headers or {})
+
+        if self.__cache is not None:
+            entry = self.__cache.get(url, params)
+
+            if entry is not None and self.__cache.is_fresh(url, entry):
+                self.__cache.record('hits')
+                metrics.inc('http_cache_total', outcome='hits')
+                return entry['body']
+
+            if entry is not None:
+                if entry.get('etag'):
+                    request_headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.get(url, headers=request_headers, params=params)
+
+        # Если данные не изменились, продлеваем срок актуальности сохранённого ответа.
+        if response.status_code == 304 and entry is not None:
+            self.__cache.record('revalidated')
+            metrics.inc('http_cache_total', outcome='revalidated')
+            self.__cache.refresh(url, params, entry)
+            return entry['body']
+
+        # Если ошибки отсутствуют возвращаем данные в формате JSON.
+        # Иначе возвращаем Исключение с описанием ошибки.
+        if response.status_code == 200:
+            body = response.json()
+            if self.__archive is not None:
+                self.__archive.record(url, params, body)
+            if self.__cache is not None:
+                self.__cache.record('misses')
+                metrics.inc('http_cache_total', outcome='misses')
+                self.__cache.put(url, params, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return body
+        else:
+            metrics.inc('http_errors_total', endpoint=endpoint_name(url), status=str(response.status_code))
+            raise Exception(f"Ошибка получения данных по API. Код ошибки = {response.status_code}")
+
+    def close(self):
+        """
+        Закрыть все соединения пула.
+        :return:
+        """
+        with self.__lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+
+
+# Общий клиент, которым по умолчанию пользуются все экземпляры классов API.
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HTTPClient:
+    """
+    Получить общий клиент для запросов к веб-порталам, создав его при первом обращении.
+    :return: Экземпляр HTTPClient.
+    """
+    global _default_client
+
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
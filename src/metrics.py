@@ -0,0 +1,274 @@
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+from urllib.parse import urlparse
+
+# Границы интервалов гистограмм длительности в секундах.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Описания показателей, выводимые в формате Prometheus.
+METRICS_HELP = {
+    'http_request_seconds': 'Длительность HTTP-запросов к веб-порталу по адресам API.',
+    'http_requests_total': 'Количество HTTP-запросов к веб-порталу по адресам API и кодам ответа.',
+    'http_response_bytes_total': 'Объём полученных от веб-портала ответов в байтах.',
+    'http_errors_total': 'Количество неуспешных HTTP-запросов к веб-порталу.',
+    'http_cache_total': 'Количество обращений к кэшу ответов по результату.',
+    'ingest_seconds': 'Длительность записи данных в базу данных по функциям.',
+    'ingest_rows_total': 'Количество внесённых в базу данных записей по таблицам.',
+    'db_query_seconds': 'Длительность запросов DBManager по методам.',
+    'db_query_errors_total': 'Количество ошибок выполнения запросов DBManager.',
+    'db_query_cache_total': 'Количество обращений к кэшу выборок DBManager по результату.',
+    'db_connections_opened_total': 'Количество открытых подключений к СУБД.',
+}
+
+# Части пути адреса API, содержащие идентификаторы, заменяются, чтобы показатели группировались по адресам API.
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Название адреса API для группировки показателей: путь адреса без идентификаторов.
+    :param url: Адрес запроса.
+    :return: Строка вида '/employers/:id'.
+    """
+    return _ID_SEGMENT.sub('/:id', urlparse(url).path) or '/'
+
+
+def _escape_label(value) -> str:
+    """
+    Значение метки в текстовом формате Prometheus: обратная косая черта, кавычки и перевод строки экранируются.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Timer:
+    """
+    Класс замера длительности блока кода, результат заносится в гистограмму.
+    """
+    __slots__ = ('__registry', '__name', '__labels', '__start')
+
+    def __init__(self, registry, name: str, labels: dict):
+        self.__registry = registry
+        self.__name = name
+        self.__labels = labels
+        self.__start = None
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.__registry.observe(self.__name, time.perf_counter() - self.__start, **self.__labels)
+
+
+class MetricsRegistry:
+    """
+    Класс набора показателей работы: счётчики и гистограммы с метками.
+    Выключенный набор не сохраняет значения: вызовы сводятся к проверке признака включения,
+    поэтому замеры можно оставлять в коде без заметных затрат.
+    Экземпляр класса можно использовать из нескольких потоков одновременно.
+    """
+    __slots__ = ('__enabled', '__buckets', '__counters', '__histograms', '__lock')
+
+    def __init__(self, enabled: bool = False, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Инициализация набора показателей.
+        :param enabled: Сохранять значения показателей.
+        :param buckets: Границы интервалов гистограмм.
+        """
+        self.__enabled = enabled
+        self.__buckets = tuple(sorted(buckets))
+        self.__counters = {}
+        self.__histograms = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def buckets(self):
+        return self.__buckets
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({self.__enabled})"
+
+    def enable(self) -> None:
+        self.__enabled = True
+
+    def disable(self) -> None:
+        self.__enabled = False
+
+    def reset(self) -> None:
+        """
+        Удалить сохранённые значения всех показателей.
+        :return:
+        """
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Увеличить счётчик.
+        :param name: Название показателя.
+        :param value: Величина увеличения.
+        :param labels: Метки показателя.
+        :return:
+        """
+        if not self.__enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Занести значение в гистограмму.
+        :param name: Название показателя.
+        :param value: Значение (для длительности - в секундах).
+        :param labels: Метки показателя.
+        :return:
+        """
+        if not self.__enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock:
+            histogram = self.__histograms.get(key)
+            if histogram is None:
+                # количество значений по интервалам (последний - больше всех границ), сумма и количество значений.
+                histogram = self.__histograms[key] = [[0] * (len(self.__buckets) + 1), 0.0, 0]
+            histogram[0][bisect_left(self.__buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def timer(self, name: str, **labels):
+        """
+        Замер длительности блока кода: with metrics.timer('db_query_seconds', method='get_avg_salary'): ...
+        :param name: Название показателя-гистограммы.
+        :param labels: Метки показателя.
+        :return: Контекстный менеджер.
+        """
+        if not self.__enabled:
+            return nullcontext()
+        return _Timer(self, name, labels)
+
+    def timed(self, name: str):
+        """
+        Декоратор замера длительности выполнения функции. Название функции заносится в метку function.
+        :param name: Название показателя-гистограммы.
+        :return: Декоратор.
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.__enabled:
+                    return function(*args, **kwargs)
+                with _Timer(self, name, {'function': function.__name__}):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get_counter(self, name: str, **labels) -> float:
+        """
+        Значение счётчика.
+        :param name: Название показателя.
+        :param labels: Метки показателя.
+        :return: Значение счётчика, 0 если значения не сохранялись.
+        """
+        with self.__lock:
+            return self.__counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def get_histogram(self, name: str, **labels) -> dict | None:
+        """
+        Значения гистограммы.
+        :param name: Название показателя.
+        :param labels: Метки показателя.
+        :return: Словарь с количеством значений по интервалам, суммой и количеством значений или None.
+        """
+        with self.__lock:
+            histogram = self.__histograms.get((name, tuple(sorted(labels.items()))))
+            if histogram is None:
+                return None
+            return {'buckets': dict(zip([*map(str, self.__buckets), '+Inf'], histogram[0])),
+                    'sum': histogram[1],
+                    'count': histogram[2]}
+
+    def to_dict(self) -> dict:
+        """
+        Значения всех показателей.
+        :return: Словарь {'counters': [...], 'histograms': [...]}, каждый показатель с названием и метками.
+        """
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            histograms = sorted(self.__histograms.items())
+
+        return {'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in counters],
+                'histograms': [{'name': name, 'labels': dict(labels),
+                                **self.get_histogram(name, **dict(labels))}
+                               for (name, labels), _ in histograms]}
+
+    def to_json(self) -> str:
+        """
+        Значения всех показателей в формате JSON.
+        :return: Строка JSON.
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def __format_labels(labels, extra: tuple = ()) -> str:
+        items = [*labels, *extra]
+        if not items:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in items) + '}'
+
+    def to_prometheus(self) -> str:
+        """
+        Значения всех показателей в текстовом формате Prometheus.
+        :return: Строка с показателями.
+        """
+        with self.__lock:
+            counters = sorted(self.__counters.items())
+            histograms = sorted((key, (list(buckets), total, count))
+                                for key, (buckets, total, count) in self.__histograms.items())
+
+        lines = []
+        described = set()
+
+        def describe(name: str, metric_type: str):
+            if name not in described:
+                described.add(name)
+                if name in METRICS_HELP:
+                    lines.append(f'# HELP {name} {METRICS_HELP[name]}')
+                lines.append(f'# TYPE {name} {metric_type}')
+
+        for (name, labels), value in counters:
+            describe(name, 'counter')
+            lines.append(f'{name}{self.__format_labels(labels)} {value}')
+
+        for (name, labels), (buckets, total, count) in histograms:
+            describe(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip([*map(str, self.__buckets), '+Inf'], buckets):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{self.__format_labels(labels, (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{self.__format_labels(labels)} {total}')
+            lines.append(f'{name}_count{self.__format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+# Общий набор показателей, в который заносят замеры клиент API, функции записи и DBManager.
+# По умолчанию выключен, включается вызовом metrics.enable().
+metrics = MetricsRegistry()
@@ -0,0 +1,135 @@
+class Employer:
+    """
+    Класс записи о Работодателе. Хранит только поля, сохраняемые в базу данных.
+    """
+    __slots__ = ('id_employer', 'name', 'open_vacancies', 'site_url', 'trusted', 'accredited_it_employer')
+
+    def __init__(self, id_employer: str, name: str, open_vacancies: int, site_url: str, trusted: bool,
+                 accredited_it_employer: bool):
+        self.id_employer = id_employer
+        self.name = name
+        self.open_vacancies = open_vacancies
+        self.site_url = site_url
+        self.trusted = trusted
+        self.accredited_it_employer = accredited_it_employer
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}('{self.id_employer}', '{self.name}')"
+
+    def __eq__(self, other):
+        if not isinstance(other, Employer):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def as_tuple(self) -> tuple:
+        """
+        Значения полей записи в порядке их перечисления в таблице "Работодатель".
+        :return: Кортеж значений полей.
+        """
+        return (self.id_employer, self.name, self.open_vacancies, self.site_url, self.trusted,
+                self.accredited_it_employer)
+
+    @classmethod
+    def from_json(cls, item: dict):
+        """
+        Создать запись из данных о Работодателе, полученных по API.
+        :param item: Словарь с данными по Работодателю.
+        :return: Экземпляр класса Employer.
+        """
+        return cls(item['id'], item['name'], item['open_vacancies'], item['site_url'], item['trusted'],
+                   item['accredited_it_employer'])
+
+    @classmethod
+    def coerce(cls, item):
+        """
+        Привести данные о Работодателе к записи: словарь в формате API преобразуется, запись возвращается как есть.
+        :param item: Словарь с данными по Работодателю или экземпляр класса Employer.
+        :return: Экземпляр класса Employer.
+        """
+        return item if isinstance(item, cls) else cls.from_json(item)
+
+
+class Vacancy:
+    """
+    Класс записи о Вакансии. Хранит только поля, сохраняемые в базу данных, и идентификатор работодателя.
+    Отсутствующие значения зарплаты заменяются нулём.
+    """
+    __slots__ = ('id_vacancy', 'id_employer', 'name', 'description', 'published_at', 'alternate_url',
+                 'salary_from', 'salary_to', 'archived')
+
+    def __init__(self, id_vacancy: str, id_employer: str | None, name: str, description: str | None,
+                 published_at: str, alternate_url: str, salary_from: int, salary_to: int, archived: bool):
+        self.id_vacancy = id_vacancy
+        self.id_employer = id_employer
+        self.name = name
+        self.description = description
+        self.published_at = published_at
+        self.alternate_url = alternate_url
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.archived = archived
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}('{self.id_vacancy}', '{self.name}')"
+
+    def __eq__(self, other):
+        if not isinstance(other, Vacancy):
+            return NotImplemented
+        return (self.id_employer, *self.as_tuple()) == (other.id_employer, *other.as_tuple())
+
+    def as_tuple(self) -> tuple:
+        """
+        Значения полей записи в порядке их перечисления в таблице "Вакансии" (без ссылки на работодателя).
+        :return: Кортеж значений полей.
+        """
+        return (self.id_vacancy, self.name, self.description, self.published_at, self.alternate_url,
+                self.salary_from, self.salary_to, self.archived)
+
+    @staticmethod
+    def normalize_salary(salary: dict | None) -> tuple:
+        """
+        Границы зарплаты вакансии: отсутствующая зарплата или граница заменяются нулём.
+        :param salary: Словарь с данными о зарплате из ответа API.
+        :return: Кортеж (зарплата от, зарплата до).
+        """
+        if salary is None:
+            return 0, 0
+        return (salary['from'] if salary.get('from') is not None else 0,
+                salary['to'] if salary.get('to') is not None else 0)
+
+    @classmethod
+    def from_json(cls, item: dict):
+        """
+        Создать запись из данных о Вакансии, полученных по API.
+        :param item: Словарь с данными по Вакансии.
+        :return: Экземпляр класса Vacancy.
+        """
+        salary_from, salary_to = cls.normalize_salary(item['salary'])
+        employer = item.get('employer')
+
+        return cls(item['id'],
+                   employer.get('id') if employer else None,
+                   item['name'],
+                   item['snippet']['responsibility'],
+                   item['published_at'],
+                   item['alternate_url'],
+                   salary_from,
+                   salary_to,
+                   item['archived'])
+
+    @classmethod
+    def coerce(cls, item):
+        """
+        Привести данные о Вакансии к записи: словарь в формате API преобразуется, запись возвращается как есть.
+        :param item: Словарь с данными по Вакансии или экземпляр класса Vacancy.
+        :return: Экземпляр класса Vacancy.
+        """
+        return item if isinstance(item, cls) else cls.from_json(item)
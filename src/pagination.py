@@ -0,0 +1,86 @@
+import base64
+import json
+from datetime import date
+
+
+def encode_cursor(key: tuple) -> str:
+    """
+    Функция формирует курсор страницы: значения ключа сортировки последней записи страницы.
+    :param key: Значения ключа сортировки.
+    :return: Строка курсора, пригодная для передачи в адресе запроса.
+    """
+    payload = json.dumps([value.isoformat() if isinstance(value, date) else value for value in key],
+                         ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, key_size: int) -> tuple:
+    """
+    Функция получает значения ключа сортировки из курсора страницы.
+    :param cursor: Строка курсора, полученная от encode_cursor.
+    :param key_size: Количество значений ключа сортировки.
+    :return: Кортеж значений ключа сортировки.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('Некорректный курсор страницы.')
+
+    if not isinstance(key, list) or len(key) != key_size:
+        raise ValueError('Некорректный курсор страницы.')
+    return tuple(key)
+
+
+class Page:
+    """
+    Класс страницы выборки: записи страницы и курсор для получения следующей страницы.
+    """
+    __slots__ = ('__rows', '__next_cursor')
+
+    def __init__(self, rows: list, next_cursor: str | None):
+        """
+        Инициализация страницы.
+        :param rows: Записи страницы.
+        :param next_cursor: Курсор следующей страницы, None для последней страницы.
+        """
+        self.__rows = rows
+        self.__next_cursor = next_cursor
+
+    @property
+    def rows(self):
+        return self.__rows
+
+    @property
+    def next_cursor(self):
+        return self.__next_cursor
+
+    @property
+    def has_next(self):
+        return self.__next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.__rows)
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({len(self.__rows)}, {self.__next_cursor!r})"
+
+
+def page_from_rows(rows: list, page_size: int, key_size: int) -> Page:
+    """
+    Функция формирует страницу из выборки запроса страницы. Первые key_size полей выборки - ключ сортировки,
+    они не входят в записи страницы, а по последней записи формируется курсор следующей страницы.
+    Выборка запрашивается на одну запись больше размера страницы, чтобы определить наличие следующей страницы.
+    :param rows: Выборка запроса страницы (не более page_size + 1 записей).
+    :param page_size: Количество записей на странице.
+    :param key_size: Количество полей ключа сортировки.
+    :return: Экземпляр класса Page.
+    """
+    next_cursor = encode_cursor(rows[page_size - 1][:key_size]) if len(rows) > page_size else None
+    return Page([row[key_size:] for row in rows[:page_size]], next_cursor)
@@ -0,0 +1,277 @@
+import threading
+import time
+from itertools import islice
+from queue import Queue, Full
+
+from src.api import HH_URL_API, HeadHunterEmployerAPI, HeadHunterBatchVacancyAPI
+from src.http_client import HTTPClient
+from src.models import Employer, Vacancy
+
+
+class PipelineStats:
+    """
+    Класс описывающий статистику работы конвейера загрузки по стадиям.
+    """
+    __slots__ = ('employers', 'vacancies', 'fetch_time', 'fetch_blocked', 'write_time', 'write_idle', 'elapsed')
+
+    def __init__(self):
+        self.employers = 0
+        self.vacancies = 0
+        # суммарное время получения данных по API всеми потоками стадии получения.
+        self.fetch_time = 0.0
+        # суммарное время ожидания потоками получения свободного места в очереди (противодавление).
+        self.fetch_blocked = 0.0
+        # время работы стадии записи в базу данных и время её простоя в ожидании данных.
+        self.write_time = 0.0
+        self.write_idle = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def employers_per_second(self):
+        return self.employers / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def vacancies_per_second(self):
+        return self.vacancies / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        """
+        Переопределённое представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return (f'Работодателей: {self.employers}, вакансий: {self.vacancies}, время: {self.elapsed:.2f} с, '
+                f'{self.employers_per_second:.1f} работодателей/с, {self.vacancies_per_second:.1f} вакансий/с; '
+                f'получение: {self.fetch_time:.2f} с (ожидание очереди {self.fetch_blocked:.2f} с); '
+                f'запись: {self.write_time:.2f} с (простой {self.write_idle:.2f} с)')
+
+
+class FetchLoadPipeline:
+    """
+    Класс конвейера загрузки данных: получение данных по API и запись в базу данных выполняются одновременно.
+    Потоки стадии получения передают данные о работодателе и его вакансиях через ограниченную очередь
+    стадии записи. Данные передаются на запись в порядке переданных идентификаторов работодателей
+    вне зависимости от того, в каком порядке потоки получения их получили.
+    Если запись не успевает, потоки получения ожидают освобождения места: в памяти одновременно находятся
+    данные не более чем queue_size работодателей и групп работодателей, обрабатываемых потоками получения.
+    """
+    __slots__ = ('__writer', '__fetch_workers', '__queue_size', '__number_records', '__url_base', '__client',
+                 '__vacancy_batch_size', '__stop_event', '__stats', '__lock', '__order', '__taken', '__written')
+
+    # Признак окончания данных в очереди.
+    __END = object()
+
+    def __init__(self, writer, fetch_workers: int = 4, queue_size: int = 16, number_records: int = 100,
+                 url_base: str = HH_URL_API, client: HTTPClient = None, vacancy_batch_size: int = 1):
+        """
+        Инициализация конвейера.
+        :param writer: Функция записи, принимающая итерируемый набор пар (список записей Employer,
+        список записей Vacancy), например save_data_to_database_bulk с заданными параметрами подключения.
+        :param fetch_workers: Количество потоков стадии получения данных.
+        :param queue_size: Максимальное количество работодателей в очереди между стадиями.
+        :param number_records: Количество вакансий на одной странице.
+        :param url_base: Базовый адрес API веб-портала.
+        :param client: Клиент с пулом соединений. Если не указан, создаётся пул по количеству потоков.
+        :param vacancy_batch_size: Количество работодателей, вакансии которых запрашиваются одним общим запросом.
+        """
+        if fetch_workers < 1 or queue_size < 1 or vacancy_batch_size < 1:
+            raise ValueError('Количество потоков, размер очереди и размер группы должны быть больше нуля.')
+
+        self.__writer = writer
+        self.__fetch_workers = fetch_workers
+        self.__queue_size = queue_size
+        self.__number_records = number_records
+        self.__url_base = url_base
+        self.__client = client if client is not None else HTTPClient(pool_size=fetch_workers * 2)
+        self.__vacancy_batch_size = vacancy_batch_size
+        self.__stop_event = threading.Event()
+        self.__stats = PipelineStats()
+        self.__lock = threading.Lock()
+        # порядок записи: количество взятых в обработку работодателей и количество переданных на запись.
+        self.__order = threading.Condition(self.__lock)
+        self.__taken = 0
+        self.__written = 0
+
+    @property
+    def stats(self):
+        return self.__stats
+
+    @property
+    def stopped(self):
+        return self.__stop_event.is_set()
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({self.__fetch_workers}, {self.__queue_size}, {self.__number_records})"
+
+    def stop(self) -> None:
+        """
+        Остановить конвейер: потоки получения не берут новых работодателей, уже полученные данные записываются.
+        :return:
+        """
+        self.__stop_event.set()
+
+    def __put(self, queue: Queue, item) -> bool:
+        """
+        Поместить данные в очередь, ожидая свободного места, пока конвейер не остановлен.
+        :return: True, если данные помещены в очередь.
+        """
+        start_time = time.perf_counter()
+        try:
+            while not self.__stop_event.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+        finally:
+            with self.__lock:
+                self.__stats.fetch_blocked += time.perf_counter() - start_time
+
+    def __fetch(self, employer_ids, queue: Queue) -> None:
+        """
+        Поток стадии получения: берёт очередную группу работодателей, получает их данные по API,
+        вакансии группы общими запросами и помещает данные каждого работодателя в очередь вместе с его номером
+        в списке идентификаторов. Новая группа берётся, только если работодателей, взятых в обработку,
+        но ещё не переданных на запись, меньше queue_size и групп всех потоков получения: так данные,
+        ожидающие в памяти предыдущих по порядку, ограничены так же, как и очередь.
+        :param employer_ids: Общий для потоков итератор пар (номер, идентификатор работодателя).
+        :param queue: Очередь между стадиями.
+        :return:
+        """
+        while not self.__stop_event.is_set():
+            start_time = time.perf_counter()
+            with self.__order:
+                while self.__taken - self.__written >= self.__queue_size + \
+                        self.__fetch_workers * self.__vacancy_batch_size:
+                    if self.__stop_event.is_set():
+                        return
+                    self.__order.wait(0.1)
+                numbered_batch = list(islice(employer_ids, self.__vacancy_batch_size))
+                self.__taken += len(numbered_batch)
+                self.__stats.fetch_blocked += time.perf_counter() - start_time
+            if not numbered_batch:
+                return
+
+            start_time = time.perf_counter()
+
+            batch = [employer_id for _, employer_id in numbered_batch]
+            employers = {}
+            for employer_id in batch:
+                employer = HeadHunterEmployerAPI(employer_id, url_base=self.__url_base, client=self.__client)
+                employer.get_employer()
+                employers[employer_id] = [Employer.from_json(item) for item in employer.result_list]
+
+            # вакансии запрашиваем только по работодателям, данные о которых получены.
+            found_ids = [employer_id for employer_id in batch if employers[employer_id]]
+            vacancy = HeadHunterBatchVacancyAPI(found_ids, max(len(found_ids), 1), self.__number_records,
+                                                url_base=self.__url_base, client=self.__client)
+            vacancies = {employer_id: [Vacancy.from_json(item) for item in items]
+                         for employer_id, items in vacancy.iter_vacancies_by_employer(prefetch=2)}
+
+            with self.__lock:
+                self.__stats.fetch_time += time.perf_counter() - start_time
+
+            for number, employer_id in numbered_batch:
+                # работодателя, вакансии которого получены не полностью (не удалось получить любую страницу
+                # общего запроса группы), не передаём на запись, чтобы при синхронизации вакансии
+                # с недополученных страниц не были помечены архивными. В очередь помещается пустая запись:
+                # по её номеру стадия записи продолжает выдачу данных по порядку.
+                if employer_id not in vacancies:
+                    employers[employer_id] = []
+
+                if not self.__put(queue, (number, employers[employer_id], vacancies.get(employer_id, []))):
+                    return
+
+    def __consume(self, queue: Queue, finished: threading.Event):
+        """
+        Поток данных для стадии записи: выдаёт данные из очереди в порядке номеров работодателей
+        до признака окончания данных. Данные, полученные раньше предыдущих по порядку, ожидают их в памяти.
+        Работодатели без данных (не найденные или с не полностью полученными вакансиями) пропускаются.
+        :param queue: Очередь между стадиями.
+        :param finished: Событие, выставляемое при получении признака окончания данных.
+        :return: Генератор пар (список с данными по Работодателю, список с данными по Вакансиям).
+        """
+        pending = {}
+        next_number = 0
+
+        while True:
+            start_time = time.perf_counter()
+            item = queue.get()
+            self.__stats.write_idle += time.perf_counter() - start_time
+
+            if item is self.__END:
+                finished.set()
+                # после остановки конвейера в данных могут быть пропуски: оставшиеся данные выдаём по порядку.
+                ready = [pending[number] for number in sorted(pending)]
+            else:
+                number, result_list_employer, result_list_vacancy = item
+                pending[number] = (result_list_employer, result_list_vacancy)
+                ready = []
+                while next_number in pending:
+                    ready.append(pending.pop(next_number))
+                    next_number += 1
+
+            with self.__order:
+                self.__written += len(ready)
+                self.__order.notify_all()
+
+            for result_list_employer, result_list_vacancy in ready:
+                if not result_list_employer:
+                    continue
+
+                self.__stats.employers += 1
+                self.__stats.vacancies += len(result_list_vacancy)
+                yield result_list_employer, result_list_vacancy
+
+            if item is self.__END:
+                return
+
+    def run(self, employer_ids: list):
+        """
+        Загрузить данные по работодателям.
+        :param employer_ids: Список идентификаторов работодателей.
+        :return: Результат функции записи.
+        """
+        self.__stop_event.clear()
+        self.__stats = PipelineStats()
+        self.__taken = 0
+        self.__written = 0
+        start_time = time.perf_counter()
+
+        queue = Queue(maxsize=self.__queue_size)
+        finished = threading.Event()
+        ids = enumerate(employer_ids)
+
+        fetchers = [threading.Thread(target=self.__fetch, args=(ids, queue), daemon=True)
+                    for _ in range(self.__fetch_workers)]
+        for fetcher in fetchers:
+            fetcher.start()
+
+        # после завершения всех потоков получения помещаем в очередь признак окончания данных.
+        def close_queue():
+            for fetcher_thread in fetchers:
+                fetcher_thread.join()
+            queue.put(self.__END)
+
+        closer = threading.Thread(target=close_queue, daemon=True)
+        closer.start()
+
+        try:
+            result = self.__writer(self.__consume(queue, finished))
+        finally:
+            # если запись завершилась раньше окончания данных (ошибка записи), останавливаем получение
+            # и освобождаем очередь, чтобы потоки получения не ожидали места бесконечно.
+            if not finished.is_set():
+                self.__stop_event.set()
+                while queue.get() is not self.__END:
+                    pass
+            closer.join()
+
+            self.__stats.elapsed = time.perf_counter() - start_time
+            self.__stats.write_time = self.__stats.elapsed - self.__stats.write_idle
+
+        return result
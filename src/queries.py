@@ -0,0 +1,386 @@
+# Тексты запросов выборок, общие для DBManager и AsyncDBManager.
+# Параметры запросов обозначаются %s (как в psycopg2), AsyncDBManager заменяет их на $1, $2, ... (как в asyncpg).
+# Исключение - VACANCIES_WITH_HIGHER_SALARY_FILTERED_REQUEST: DBManager подготавливает его (PREPARE),
+# поэтому он написан с параметрами $1, $2, $3 и их типами.
+
+ALL_VACANCIES_REQUEST = """
+    SELECT
+        employers.name AS employers_name,
+        vacancies.name AS vacancies_name,
+        vacancies.salary_from AS salary_from,
+        vacancies.salary_to AS salary_to,
+        vacancies.alternate_url AS alternate_url
+    FROM
+        vacancies
+            LEFT JOIN employers
+                ON vacancies.employer_id = employers.id
+"""
+
+COMPANIES_AND_VACANCIES_COUNT_REQUEST = """
+    SELECT
+        mv_employer_vacancies.employers_name AS name,
+        mv_employer_vacancies.open_vacancies AS open_vacancies
+    FROM
+        mv_employer_vacancies
+    ORDER BY
+        mv_employer_vacancies.employer_id
+"""
+
+COMPANIES_AND_VACANCIES_COUNT_LIVE_REQUEST = """
+    SELECT
+        employers.name AS name,
+        employers.open_vacancies AS open_vacancies
+    FROM
+        employers
+"""
+
+EMPLOYERS_SALARY_STATS_REQUEST = """
+    SELECT
+        mv_employer_vacancies.employers_name AS employers_name,
+        mv_employer_vacancies.vacancies_count AS vacancies_count,
+        mv_employer_vacancies.avg_salary AS avg_salary,
+        mv_employer_vacancies.min_salary AS min_salary,
+        mv_employer_vacancies.max_salary AS max_salary
+    FROM
+        mv_employer_vacancies
+    ORDER BY
+        mv_employer_vacancies.employer_id
+"""
+
+AVG_SALARY_REQUEST = """
+    SELECT
+        mv_vacancy_salaries.employers_name AS employers_name,
+        mv_vacancy_salaries.vacancies_name AS vacancies_name,
+        mv_vacancy_salaries.avg_salary AS avg_salary
+    FROM
+        mv_vacancy_salaries
+    ORDER BY
+        mv_vacancy_salaries.vacancy_id
+"""
+
+AVG_SALARY_LIVE_REQUEST = """
+    SELECT
+        employers.name AS employers_name,
+        vacancies.name AS vacancies_name,
+        (vacancies.salary_to + vacancies.salary_from)/2 AS avg_salary
+    FROM
+        vacancies
+            LEFT JOIN employers
+                ON vacancies.employer_id = employers.id
+"""
+
+VACANCIES_WITH_HIGHER_SALARY_REQUEST = """
+    SELECT
+        mv_vacancy_salaries.vacancies_name AS vacancies_name,
+        mv_vacancy_salaries.avg_salary AS avg_salary
+    FROM
+        mv_vacancy_salaries
+    WHERE
+        -- средняя зарплата приводится к типу поля (с округлением вверх), иначе индекс по полю не используется.
+        mv_vacancy_salaries.avg_salary >= (
+            SELECT CEIL(mv_salary_summary.avg_salary_all_vacancy)::integer FROM mv_salary_summary)
+    ORDER BY
+        mv_vacancy_salaries.vacancy_id
+"""
+
+# параметры: идентификатор работодателя на веб-портале, начальная и конечная даты публикации (NULL - без отбора).
+VACANCIES_WITH_HIGHER_SALARY_FILTERED_REQUEST = """
+    SELECT
+        salaries.vacancies_name AS vacancies_name,
+        salaries.avg_salary AS avg_salary
+    FROM
+        (
+            SELECT
+                vacancies.name AS vacancies_name,
+                (vacancies.salary_to + vacancies.salary_from)/2 AS avg_salary,
+                (AVG(vacancies.salary_to) OVER () + AVG(vacancies.salary_from) OVER ())/2
+                    AS avg_salary_all_vacancy
+            FROM
+                vacancies
+            WHERE
+                -- отбор по работодателю - массив из подзапроса: при известном $1 условие без OR
+                -- выполняется по индексу ix_vacancies_employer_id.
+                ($1::varchar IS NULL OR vacancies.employer_id = ANY(ARRAY(
+                    SELECT employers.id FROM employers WHERE employers.id_employer = $1::varchar)))
+                -- границы дат сравниваются без OR: так отсекаются разделы таблицы вне периода.
+                AND vacancies.published_at >= COALESCE($2::date, '-infinity'::date)
+                AND vacancies.published_at <= COALESCE($3::date, 'infinity'::date)
+        ) AS salaries
+    WHERE
+        salaries.avg_salary >= salaries.avg_salary_all_vacancy
+"""
+
+VACANCIES_WITH_KEYWORD_REQUEST = """
+    SELECT
+        vacancies.name AS vacancies_name
+    FROM
+        vacancies
+    WHERE
+        vacancies.name ILIKE %s
+    ORDER BY
+        vacancies.id
+"""
+
+
+def like_pattern(key_word: str) -> str:
+    """
+    Шаблон LIKE для поиска ключевого слова в любой части строки.
+    Служебные символы шаблона в ключевом слове экранируются, чтобы искать их как обычные символы.
+    :param key_word: Ключевое слово.
+    :return: Строка шаблона.
+    """
+    pattern = key_word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{pattern}%'
+
+
+def search_query(words_count: int, match_all: bool) -> str:
+    """
+    Функция составляет выражение полнотекстового запроса из постоянных фрагментов,
+    ключевые слова передаются в запрос параметрами.
+    :param words_count: Количество ключевых слов.
+    :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+    :return: Текст выражения tsquery.
+    """
+    operator = ' && ' if match_all else ' || '
+    return operator.join(["plainto_tsquery('russian', %s)"] * words_count)
+
+
+def search_vacancies_request(words_count: int, match_all: bool) -> str:
+    """
+    Текст запроса полнотекстового поиска вакансий. Параметры: ключевые слова, ограничение и смещение.
+    :param words_count: Количество ключевых слов.
+    :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+    :return: Текст запроса.
+    """
+    return f"""
+        SELECT
+            vacancies.name AS vacancies_name,
+            employers.name AS employers_name,
+            vacancies.alternate_url AS alternate_url,
+            ts_rank(vacancies.search_vector, search.query) AS rank
+        FROM
+            vacancies
+                LEFT JOIN employers
+                    ON vacancies.employer_id = employers.id,
+            (SELECT {search_query(words_count, match_all)} AS query) AS search
+        WHERE
+            vacancies.search_vector @@ search.query
+        ORDER BY
+            rank DESC,
+            vacancies.id
+        LIMIT %s
+        OFFSET %s
+    """
+
+
+def vacancy_filters(employer_id: str = None, date_from=None, date_to=None) -> tuple:
+    """
+    Функция составляет условия отбора вакансий только из переданных отборов.
+    :param employer_id: Идентификатор работодателя на веб-портале.
+    :param date_from: Начальная дата публикации вакансий.
+    :param date_to: Конечная дата публикации вакансий.
+    :return: Кортеж из текста условий и списка значений их параметров.
+    """
+    conditions = []
+    filter_params = []
+    if employer_id is not None:
+        conditions.append("vacancies.employer_id IN ("
+                          "SELECT employers.id FROM employers WHERE employers.id_employer = %s)")
+        filter_params.append(employer_id)
+    if date_from is not None:
+        conditions.append("vacancies.published_at >= %s")
+        filter_params.append(date_from)
+    if date_to is not None:
+        conditions.append("vacancies.published_at <= %s")
+        filter_params.append(date_to)
+    return ' AND '.join(conditions), filter_params
+
+
+# Запросы страниц выборок. Первые поля выборки - ключ сортировки, последний параметр - ограничение количества
+# записей (LIMIT); при after_key=True перед ним добавляются параметры ключа последней записи предыдущей страницы.
+
+def companies_and_vacancies_count_page_request(after_key: bool) -> str:
+    """
+    Текст запроса страницы списка компаний и количества вакансий у каждой компании.
+    :param after_key: Страница начинается после ключа последней записи предыдущей страницы.
+    :return: Текст запроса.
+    """
+    return f"""
+        SELECT
+            mv_employer_vacancies.employer_id AS employer_id,
+            mv_employer_vacancies.employers_name AS name,
+            mv_employer_vacancies.open_vacancies AS open_vacancies
+        FROM
+            mv_employer_vacancies
+        {'WHERE mv_employer_vacancies.employer_id > %s' if after_key else ''}
+        ORDER BY
+            mv_employer_vacancies.employer_id
+        LIMIT %s
+    """
+
+
+def all_vacancies_page_request(after_key: bool) -> str:
+    """
+    Текст запроса страницы списка всех вакансий.
+    :param after_key: Страница начинается после ключа последней записи предыдущей страницы.
+    :return: Текст запроса.
+    """
+    return f"""
+        SELECT
+            vacancies.id AS vacancy_id,
+            employers.name AS employers_name,
+            vacancies.name AS vacancies_name,
+            vacancies.salary_from AS salary_from,
+            vacancies.salary_to AS salary_to,
+            vacancies.alternate_url AS alternate_url
+        FROM
+            vacancies
+                LEFT JOIN employers
+                    ON vacancies.employer_id = employers.id
+        {'WHERE vacancies.id > %s' if after_key else ''}
+        ORDER BY
+            vacancies.id
+        LIMIT %s
+    """
+
+
+def avg_salary_page_request(after_key: bool) -> str:
+    """
+    Текст запроса страницы списка средних зарплат по вакансиям.
+    :param after_key: Страница начинается после ключа последней записи предыдущей страницы.
+    :return: Текст запроса.
+    """
+    return f"""
+        SELECT
+            mv_vacancy_salaries.vacancy_id AS vacancy_id,
+            mv_vacancy_salaries.employers_name AS employers_name,
+            mv_vacancy_salaries.vacancies_name AS vacancies_name,
+            mv_vacancy_salaries.avg_salary AS avg_salary
+        FROM
+            mv_vacancy_salaries
+        {'WHERE mv_vacancy_salaries.vacancy_id > %s' if after_key else ''}
+        ORDER BY
+            mv_vacancy_salaries.vacancy_id
+        LIMIT %s
+    """
+
+
+def vacancies_with_higher_salary_page_request(after_key: bool, text_conditions: str = '') -> str:
+    """
+    Текст запроса страницы списка вакансий, у которых зарплата выше средней по всем вакансиям.
+    Без условий отбора средняя зарплата берётся из материализованного представления, ключ сортировки -
+    идентификатор вакансии. С условиями (см. vacancy_filters) средняя зарплата по отобранным вакансиям
+    вычисляется один раз при запросе первой страницы и передаётся в курсоре: ключ сортировки -
+    (средняя зарплата, идентификатор вакансии). Параметры запроса первой страницы - условия отбора дважды,
+    следующих страниц - средняя зарплата, условия отбора и идентификатор вакансии.
+    :param after_key: Страница начинается после ключа последней записи предыдущей страницы.
+    :param text_conditions: Текст условий отбора вакансий.
+    :return: Текст запроса.
+    """
+    if not text_conditions:
+        return f"""
+            SELECT
+                mv_vacancy_salaries.vacancy_id AS vacancy_id,
+                mv_vacancy_salaries.vacancies_name AS vacancies_name,
+                mv_vacancy_salaries.avg_salary AS avg_salary
+            FROM
+                mv_vacancy_salaries
+            WHERE
+                mv_vacancy_salaries.avg_salary >= (
+                    SELECT CEIL(mv_salary_summary.avg_salary_all_vacancy)::integer FROM mv_salary_summary)
+                {'AND mv_vacancy_salaries.vacancy_id > %s' if after_key else ''}
+            ORDER BY
+                mv_vacancy_salaries.vacancy_id
+            LIMIT %s
+        """
+
+    if after_key:
+        text_threshold = "SELECT %s::integer AS avg_salary"
+    else:
+        text_threshold = f"""
+            SELECT
+                CEIL((AVG(vacancies.salary_to) + AVG(vacancies.salary_from))/2)::integer AS avg_salary
+            FROM
+                vacancies
+            WHERE
+                {text_conditions}"""
+
+    return f"""
+        WITH threshold AS ({text_threshold})
+        SELECT
+            (SELECT threshold.avg_salary FROM threshold) AS threshold,
+            vacancies.id AS vacancy_id,
+            vacancies.name AS vacancies_name,
+            (vacancies.salary_to + vacancies.salary_from)/2 AS avg_salary
+        FROM
+            vacancies
+        WHERE
+            {text_conditions}
+            AND (vacancies.salary_to + vacancies.salary_from)/2 >= (SELECT threshold.avg_salary FROM threshold)
+            {'AND vacancies.id > %s' if after_key else ''}
+        ORDER BY
+            vacancies.id
+        LIMIT %s
+    """
+
+
+def vacancies_with_keyword_page_request(after_key: bool) -> str:
+    """
+    Текст запроса страницы списка вакансий, в названии которых содержится ключевое слово (первый параметр).
+    :param after_key: Страница начинается после ключа последней записи предыдущей страницы.
+    :return: Текст запроса.
+    """
+    return f"""
+        SELECT
+            vacancies.id AS vacancy_id,
+            vacancies.name AS vacancies_name
+        FROM
+            vacancies
+        WHERE
+            vacancies.name ILIKE %s
+            {'AND vacancies.id > %s' if after_key else ''}
+        ORDER BY
+            vacancies.id
+        LIMIT %s
+    """
+
+
+def search_vacancies_page_request(words_count: int, match_all: bool, after_key: bool) -> str:
+    """
+    Текст запроса страницы результатов полнотекстового поиска вакансий. Ключ сортировки - ранг совпадения
+    и идентификатор вакансии: параметры ключа - ранг дважды и идентификатор.
+    :param words_count: Количество ключевых слов.
+    :param match_all: Вакансия должна содержать все ключевые слова (И), иначе хотя бы одно (ИЛИ).
+    :param after_key: Страница начинается после ключа последней записи предыдущей страницы.
+    :return: Текст запроса.
+    """
+    return f"""
+        SELECT
+            ranked.rank AS rank_key,
+            ranked.vacancy_id AS vacancy_id,
+            ranked.vacancies_name AS vacancies_name,
+            ranked.employers_name AS employers_name,
+            ranked.alternate_url AS alternate_url,
+            ranked.rank AS rank
+        FROM
+            (
+                SELECT
+                    vacancies.id AS vacancy_id,
+                    vacancies.name AS vacancies_name,
+                    employers.name AS employers_name,
+                    vacancies.alternate_url AS alternate_url,
+                    ts_rank(vacancies.search_vector, search.query) AS rank
+                FROM
+                    vacancies
+                        LEFT JOIN employers
+                            ON vacancies.employer_id = employers.id,
+                    (SELECT {search_query(words_count, match_all)} AS query) AS search
+                WHERE
+                    vacancies.search_vector @@ search.query
+            ) AS ranked
+        {'WHERE ranked.rank < %s::real OR (ranked.rank = %s::real AND ranked.vacancy_id > %s)' if after_key else ''}
+        ORDER BY
+            ranked.rank DESC,
+            ranked.vacancy_id
+        LIMIT %s
+    """
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Номера версий данных баз данных, изменённых в текущем процессе: {имя базы данных: номер версии}.
+# Увеличиваются функциями записи данных, чтобы кэши выборок этого процесса сбрасывались сразу после записи.
+_data_versions = {}
+_data_versions_lock = threading.Lock()
+
+
+def bump_data_version(database_name: str) -> int:
+    """
+    Функция отмечает изменение данных базы данных в текущем процессе.
+    :param database_name: Имя базы данных.
+    :return: Новый номер версии данных.
+    """
+    with _data_versions_lock:
+        _data_versions[database_name] = _data_versions.get(database_name, 0) + 1
+        return _data_versions[database_name]
+
+
+def get_data_version(database_name: str) -> int:
+    """
+    Функция возвращает номер версии данных базы данных в текущем процессе.
+    :param database_name: Имя базы данных.
+    :return: Номер версии данных, 0 если данные в текущем процессе не изменялись.
+    """
+    with _data_versions_lock:
+        return _data_versions.get(database_name, 0)
+
+
+class QueryCache:
+    """
+    Класс кэша результатов выборок с вытеснением давно не использованных записей (LRU)
+    и необязательным сроком актуальности записей.
+    Все записи кэша относятся к одной версии данных: при смене версии кэш очищается.
+    Экземпляр класса можно использовать из нескольких потоков одновременно.
+    """
+    __slots__ = ('__max_entries', '__ttl', '__max_rows', '__entries', '__version', '__lock', '__stats')
+
+    def __init__(self, max_entries: int = 128, ttl: float = None, max_rows: int = 10000):
+        """
+        Инициализация кэша.
+        :param max_entries: Максимальное количество сохранённых выборок.
+        :param ttl: Срок актуальности выборки в секундах. Если не указан, выборка актуальна до смены версии данных.
+        :param max_rows: Максимальное количество записей в сохраняемой выборке, большие выборки не сохраняются.
+        """
+        if max_entries < 1 or max_rows < 0:
+            raise ValueError('Некорректные параметры кэша выборок.')
+
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__max_rows = max_rows
+        self.__entries = OrderedDict()
+        self.__version = None
+        self.__lock = threading.Lock()
+        self.__stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @property
+    def max_entries(self):
+        return self.__max_entries
+
+    @property
+    def ttl(self):
+        return self.__ttl
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return {**self.__stats, 'entries': len(self.__entries)}
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({self.__max_entries}, {self.__ttl}, {self.__max_rows})"
+
+    def validate(self, version) -> bool:
+        """
+        Сверить версию данных, к которой относятся сохранённые выборки. При смене версии кэш очищается.
+        :param version: Текущая версия данных.
+        :return: True, если версия данных не изменилась.
+        """
+        with self.__lock:
+            if version == self.__version:
+                return True
+
+            if self.__entries:
+                self.__stats['invalidations'] += 1
+            self.__entries.clear()
+            self.__version = version
+            return False
+
+    def get(self, key) -> tuple:
+        """
+        Получить сохранённую выборку. Использование выборки продлевает её нахождение в кэше.
+        :param key: Ключ выборки.
+        :return: Кортеж (признак наличия выборки в кэше, выборка).
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.__ttl is not None and time.monotonic() - entry[0] >= self.__ttl:
+                del self.__entries[key]
+                entry = None
+
+            if entry is None:
+                self.__stats['misses'] += 1
+                return False, None
+
+            self.__entries.move_to_end(key)
+            self.__stats['hits'] += 1
+            return True, entry[1]
+
+    def put(self, key, rows: list, version=None) -> bool:
+        """
+        Сохранить выборку. При превышении количества выборок удаляется давно не использованная.
+        :param key: Ключ выборки.
+        :param rows: Список записей выборки.
+        :param version: Версия данных, прочитанная до выполнения запроса. Если указана и кэш уже относится
+        к другой версии, выборка не сохраняется: она могла быть получена до изменения данных.
+        :return: True, если выборка сохранена.
+        """
+        if len(rows) > self.__max_rows:
+            return False
+
+        with self.__lock:
+            if version is not None and version != self.__version:
+                return False
+
+            self.__entries[key] = (time.monotonic(), rows)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+                self.__stats['evictions'] += 1
+
+        return True
+
+    def clear(self) -> None:
+        """
+        Удалить все сохранённые выборки.
+        :return:
+        """
+        with self.__lock:
+            self.__entries.clear()
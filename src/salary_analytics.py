@@ -0,0 +1,344 @@
+import io
+
+import psycopg2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.metrics import metrics
+
+# Виды зарплаты вакансии: середина вилки, нижняя и верхняя граница.
+SALARY_KINDS = ('midpoint', 'from', 'to')
+
+
+class SalaryAnalytics:
+    """
+    Класс для расчёта статистики по зарплатам вакансий в памяти.
+    Столбцы зарплат загружаются из базы данных один раз в массивы NumPy, после чего процентили,
+    гистограммы, усечённые средние и отборы по порогу вычисляются по всем работодателям сразу,
+    без дополнительных запросов к СУБД.
+    Нулевая зарплата (так save_data_to_database сохраняет отсутствующее значение) считается отсутствующей.
+    Середина вилки вычисляется по указанным границам: если указана одна граница, берётся она.
+    Требуется необязательная зависимость numpy (poetry install -E analytics).
+    """
+    __slots__ = ('__vacancy_ids', '__vacancy_employers', '__employer_ids', '__employer_names', '__groups',
+                 '__group_starts', '__values', '__sorted')
+
+    def __init__(self, vacancy_ids, employer_ids, salary_from, salary_to, employer_names: dict = None):
+        """
+        Инициализация экземпляра класса.
+        :param vacancy_ids: Идентификаторы вакансий.
+        :param employer_ids: Идентификаторы работодателей вакансий.
+        :param salary_from: Нижние границы зарплаты вакансий, 0 - значение отсутствует.
+        :param salary_to: Верхние границы зарплаты вакансий, 0 - значение отсутствует.
+        :param employer_names: Словарь {идентификатор работодателя: наименование работодателя}.
+        """
+        if np is None:
+            raise ImportError('Для SalaryAnalytics необходим пакет numpy: poetry install -E analytics')
+
+        self.__vacancy_ids = self.__read_only(np.asarray(vacancy_ids, dtype=np.int64))
+        self.__vacancy_employers = self.__read_only(np.asarray(employer_ids, dtype=np.int64))
+        salary_from = np.asarray(salary_from, dtype=np.float64)
+        salary_to = np.asarray(salary_to, dtype=np.float64)
+
+        if not (len(self.__vacancy_ids) == len(self.__vacancy_employers) == len(salary_from) == len(salary_to)):
+            raise ValueError('Столбцы данных о вакансиях должны быть одной длины.')
+
+        # отсутствующие (нулевые) значения зарплаты заменяем на NaN, чтобы они не участвовали в расчётах.
+        with np.errstate(invalid='ignore'):
+            present_from = np.isfinite(salary_from) & (salary_from > 0)
+            present_to = np.isfinite(salary_to) & (salary_to > 0)
+        salary_from = np.where(present_from, salary_from, np.nan)
+        salary_to = np.where(present_to, salary_to, np.nan)
+
+        present_count = present_from.astype(np.int8) + present_to
+        with np.errstate(invalid='ignore', divide='ignore'):
+            midpoint = np.where(present_count > 0,
+                                (np.nan_to_num(salary_from) + np.nan_to_num(salary_to)) / present_count, np.nan)
+
+        self.__values = {'midpoint': self.__read_only(midpoint),
+                         'from': self.__read_only(salary_from),
+                         'to': self.__read_only(salary_to)}
+
+        # номер работодателя (в порядке возрастания идентификаторов) для каждой вакансии.
+        employer_ids, self.__groups = np.unique(self.__vacancy_employers, return_inverse=True)
+        self.__employer_ids = self.__read_only(employer_ids)
+        self.__groups = self.__groups.reshape(-1)
+        group_sizes = np.bincount(self.__groups, minlength=len(employer_ids))
+        self.__group_starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1])).astype(np.int64)
+
+        self.__employer_names = dict(employer_names or {})
+        # значения зарплат, упорядоченные по работодателю и значению, по видам зарплаты.
+        self.__sorted = {}
+
+    @staticmethod
+    def __read_only(array):
+        array.flags.writeable = False
+        return array
+
+    @property
+    def vacancy_ids(self):
+        return self.__vacancy_ids
+
+    @property
+    def employer_ids(self):
+        return self.__employer_ids
+
+    @property
+    def employer_names(self):
+        return [self.__employer_names.get(int(employer_id)) for employer_id in self.__employer_ids]
+
+    def __len__(self):
+        return len(self.__vacancy_ids)
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({len(self.__vacancy_ids)}, {len(self.__employer_ids)})"
+
+    @classmethod
+    def load(cls, database_name: str, params: dict):
+        """
+        Загрузить столбцы зарплат всех вакансий из базы данных.
+        Данные передаются одной командой COPY и разбираются в массивы без создания записи на каждую вакансию.
+        :param database_name: Имя базы данных из которой загружаются данные.
+        :param params: Набор передаваемых параметров для подключения к СУБД.
+        :return: Экземпляр класса SalaryAnalytics или None при ошибке загрузки.
+        """
+
+        # первоначальное подключение к системе управления базами данных.
+        connection = psycopg2.connect(dbname=database_name, **params)
+        metrics.inc('db_connections_opened_total', source='analytics')
+
+        # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+        try:
+            # инициализация курсора для написания запросов в СУБД.
+            with connection.cursor() as cursor:
+                buffer = io.StringIO()
+                cursor.copy_expert("""
+                    COPY (
+                        SELECT
+                            vacancies.id,
+                            COALESCE(vacancies.employer_id, 0),
+                            COALESCE(vacancies.salary_from, 0),
+                            COALESCE(vacancies.salary_to, 0)
+                        FROM
+                            vacancies
+                    ) TO STDOUT
+                """, buffer)
+
+                cursor.execute("SELECT employers.id, employers.name FROM employers")
+                employer_names = dict(cursor.fetchall())
+
+            # пустой вывод loadtxt разбирает с предупреждением, поэтому отсутствие вакансий обрабатываем отдельно.
+            if buffer.tell() == 0:
+                columns = np.empty((0, 4), dtype=np.int64)
+            else:
+                buffer.seek(0)
+                columns = np.loadtxt(buffer, dtype=np.int64, ndmin=2)
+
+            return cls(columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3], employer_names)
+
+        except(Exception, psycopg2.DatabaseError) as error:
+            print(error)
+
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def __get_values(self, kind: str):
+        if kind not in SALARY_KINDS:
+            raise ValueError(f'Вид зарплаты должен быть одним из {SALARY_KINDS}.')
+        return self.__values[kind]
+
+    def __get_sorted(self, kind: str) -> tuple:
+        """
+        Значения зарплат, упорядоченные по работодателю, а внутри работодателя - по возрастанию.
+        Отсутствующие значения идут в конце группы работодателя. Вычисляется один раз для каждого вида зарплаты.
+        :param kind: Вид зарплаты.
+        :return: Кортеж из упорядоченных значений, количества указанных значений по работодателям
+        и накопленных сумм упорядоченных значений (с нулём в начале).
+        """
+        if kind not in self.__sorted:
+            values = self.__get_values(kind)
+            missing = np.isnan(values)
+
+            # упорядочиваем по значению (отсутствующие - в конец), затем устойчиво по работодателю:
+            # два прохода сортировки быстрее сортировки по паре ключей, а номер работодателя
+            # в наименьшем целом типе сортируется поразрядно.
+            order = np.argsort(np.where(missing, np.inf, values))
+            groups = self.__groups[order].astype(np.min_scalar_type(len(self.__employer_ids)))
+            order = order[np.argsort(groups, kind='stable')]
+
+            sorted_values = values[order]
+            counts = np.bincount(self.__groups[~missing], minlength=len(self.__employer_ids))
+            cumulative = np.concatenate(([0.0], np.cumsum(np.nan_to_num(sorted_values))))
+            self.__sorted[kind] = (self.__read_only(sorted_values), self.__read_only(counts.astype(np.int64)),
+                                   self.__read_only(cumulative))
+        return self.__sorted[kind]
+
+    def values(self, kind: str = 'midpoint'):
+        """
+        Значения зарплат вакансий в порядке загрузки, отсутствующие значения - NaN.
+        :param kind: Вид зарплаты: 'midpoint', 'from' или 'to'.
+        :return: Массив значений.
+        """
+        return self.__get_values(kind)
+
+    def counts(self, kind: str = 'midpoint'):
+        """
+        Количество вакансий с указанной зарплатой по работодателям.
+        :param kind: Вид зарплаты.
+        :return: Массив в порядке employer_ids.
+        """
+        return self.__get_sorted(kind)[1]
+
+    def means(self, kind: str = 'midpoint'):
+        """
+        Средняя зарплата по работодателям.
+        :param kind: Вид зарплаты.
+        :return: Массив в порядке employer_ids, NaN для работодателей без указанной зарплаты.
+        """
+        return self.trimmed_means(0.0, kind)
+
+    def trimmed_means(self, proportion: float = 0.1, kind: str = 'midpoint'):
+        """
+        Усечённая средняя зарплата по работодателям: с каждой стороны отбрасывается доля наименьших
+        и наибольших значений, что снижает влияние выбросов.
+        :param proportion: Отбрасываемая доля значений с каждой стороны, от 0 до 0.5.
+        :param kind: Вид зарплаты.
+        :return: Массив в порядке employer_ids, NaN для работодателей без указанной зарплаты.
+        """
+        if not 0 <= proportion < 0.5:
+            raise ValueError('Отбрасываемая доля значений должна быть от 0 до 0.5.')
+
+        _, counts, cumulative = self.__get_sorted(kind)
+        trimmed = np.floor(counts * proportion).astype(np.int64)
+        kept = counts - 2 * trimmed
+
+        # сумма значений группы - разность накопленных сумм на границах оставленных значений.
+        totals = cumulative[self.__group_starts + counts - trimmed] - cumulative[self.__group_starts + trimmed]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(kept > 0, totals / kept, np.nan)
+
+    def percentiles(self, q, kind: str = 'midpoint'):
+        """
+        Процентили зарплаты по работодателям (линейная интерполяция, как numpy.percentile).
+        :param q: Процентиль или последовательность процентилей от 0 до 100.
+        :param kind: Вид зарплаты.
+        :return: Массив размером (количество работодателей, количество процентилей),
+        NaN для работодателей без указанной зарплаты.
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if np.any((q < 0) | (q > 100)):
+            raise ValueError('Процентиль должен быть от 0 до 100.')
+
+        sorted_values, counts, _ = self.__get_sorted(kind)
+        if len(sorted_values) == 0:
+            return np.full((len(self.__employer_ids), len(q)), np.nan)
+
+        counts = counts[:, None]
+        starts = self.__group_starts[:, None]
+        position = np.maximum(counts - 1, 0) * (q[None, :] / 100)
+        lower = np.floor(position)
+        fraction = position - lower
+
+        lower_index = starts + lower.astype(np.int64)
+        upper_index = np.minimum(lower_index + 1, starts + np.maximum(counts - 1, 0))
+        # у работодателей без указанной зарплаты индексы могут выйти за границы массива, результат для них - NaN.
+        lower_index = np.clip(lower_index, 0, len(sorted_values) - 1)
+        upper_index = np.clip(upper_index, 0, len(sorted_values) - 1)
+
+        lower_values = sorted_values[lower_index]
+        with np.errstate(invalid='ignore'):
+            answer = lower_values + (sorted_values[upper_index] - lower_values) * fraction
+        return np.where(counts > 0, answer, np.nan)
+
+    def medians(self, kind: str = 'midpoint'):
+        """
+        Медианная зарплата по работодателям.
+        :param kind: Вид зарплаты.
+        :return: Массив в порядке employer_ids, NaN для работодателей без указанной зарплаты.
+        """
+        return self.percentiles(50, kind)[:, 0]
+
+    def histogram(self, bins=10, kind: str = 'midpoint', salary_range: tuple = None) -> tuple:
+        """
+        Гистограмма зарплат по всем вакансиям с указанной зарплатой.
+        :param bins: Количество интервалов или границы интервалов.
+        :param kind: Вид зарплаты.
+        :param salary_range: Нижняя и верхняя граница гистограммы, по умолчанию - наименьшее и наибольшее значение.
+        :return: Кортеж из массива количества вакансий по интервалам и массива границ интервалов.
+        """
+        values = self.__get_values(kind)
+        return np.histogram(values[~np.isnan(values)], bins=bins, range=salary_range)
+
+    def histograms(self, bins=10, kind: str = 'midpoint', salary_range: tuple = None) -> tuple:
+        """
+        Гистограммы зарплат по работодателям с общими для всех работодателей границами интервалов.
+        Значения за границами гистограммы не учитываются.
+        :param bins: Количество интервалов или границы интервалов.
+        :param kind: Вид зарплаты.
+        :param salary_range: Нижняя и верхняя граница гистограммы, по умолчанию - наименьшее и наибольшее значение.
+        :return: Кортеж из массива размером (количество работодателей, количество интервалов) и массива границ.
+        """
+        values = self.__get_values(kind)
+        edges = np.histogram_bin_edges(values[~np.isnan(values)], bins, salary_range)
+        bins_count = len(edges) - 1
+
+        with np.errstate(invalid='ignore'):
+            inside = (values >= edges[0]) & (values <= edges[-1])
+        inside_values = values[inside]
+
+        if np.ndim(bins) == 0:
+            # интервалы равной ширины: номер интервала вычисляется без поиска по границам,
+            # ошибки округления у границ интервалов исправляются сравнением с границами, как в numpy.histogram.
+            bin_index = ((inside_values - edges[0]) * (bins_count / (edges[-1] - edges[0]))).astype(np.int64)
+            np.clip(bin_index, 0, bins_count - 1, out=bin_index)
+            bin_index -= inside_values < edges[bin_index]
+            bin_index += (inside_values >= edges[bin_index + 1]) & (bin_index != bins_count - 1)
+        else:
+            # правая граница последнего интервала включается в него, как в numpy.histogram.
+            bin_index = np.clip(np.searchsorted(edges, inside_values, side='right') - 1, 0, bins_count - 1)
+
+        counts = np.bincount(self.__groups[inside] * bins_count + bin_index,
+                             minlength=len(self.__employer_ids) * bins_count)
+        return counts.reshape(len(self.__employer_ids), bins_count), edges
+
+    def above(self, threshold: float = None, kind: str = 'midpoint'):
+        """
+        Отбор вакансий с зарплатой не ниже порога. Вакансии без указанной зарплаты не отбираются.
+        Идентификаторы отобранных вакансий: analytics.vacancy_ids[analytics.above()].
+        :param threshold: Порог зарплаты, по умолчанию - средняя зарплата по всем вакансиям с указанной зарплатой.
+        :param kind: Вид зарплаты.
+        :return: Массив признаков отбора в порядке загрузки вакансий.
+        """
+        values = self.__get_values(kind)
+        if threshold is None:
+            present = values[~np.isnan(values)]
+            if len(present) == 0:
+                return np.zeros(len(values), dtype=bool)
+            threshold = present.mean()
+
+        with np.errstate(invalid='ignore'):
+            return values >= threshold
+
+    def employer_report(self, q: tuple = (25, 50, 75, 90), proportion: float = 0.1, kind: str = 'midpoint'):
+        """
+        Сводная статистика зарплат по работодателям.
+        :param q: Процентили, включаемые в отчёт.
+        :param proportion: Отбрасываемая доля значений с каждой стороны для усечённой средней.
+        :param kind: Вид зарплаты.
+        :return: Список кортежей (наименование работодателя, количество вакансий с указанной зарплатой,
+        средняя, усечённая средняя, процентили...) в порядке employer_ids.
+        """
+        columns = np.column_stack((self.counts(kind), self.means(kind), self.trimmed_means(proportion, kind),
+                                   self.percentiles(q, kind)))
+        # NaN - единственное значение, не равное самому себе.
+        return [(name, int(row[0]), *(None if value != value else value for value in row[1:]))
+                for name, row in zip(self.employer_names, columns.tolist())]
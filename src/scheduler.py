@@ -0,0 +1,224 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+
+class TokenBucket:
+    """
+    Класс ограничителя частоты запросов по алгоритму "ведро с токенами".
+    Токены пополняются с постоянной скоростью до ёмкости ведра, каждый запрос забирает один токен.
+    Ёмкость ведра определяет, сколько запросов можно выполнить подряд без ожидания.
+    """
+    __slots__ = ('__rate', '__capacity', '__tokens', '__updated', '__lock')
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Инициализация ограничителя.
+        :param rate: Количество запросов в секунду.
+        :param capacity: Ёмкость ведра (допустимая серия запросов без ожидания).
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError('Частота запросов и ёмкость ведра должны быть больше нуля.')
+
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__tokens = capacity
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return self.__rate
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({self.__rate}, {self.__capacity})"
+
+    def acquire(self) -> float:
+        """
+        Получить токен, при необходимости ожидая его пополнения.
+        Токен резервируется сразу, поэтому потоки получают токены в порядке обращения.
+        :return: Время ожидания в секундах.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+            self.__updated = now
+            self.__tokens -= 1
+            delay = -self.__tokens / self.__rate if self.__tokens < 0 else 0.0
+
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class RequestScheduler:
+    """
+    Класс планировщика запросов к веб-порталу с учётом ограничений частоты запросов.
+    Частота запросов ограничивается ведром с токенами, количество одновременных запросов к одному хосту
+    ограничивается семафором. Ответы 429 и 5xx, а также ошибки соединения повторяются с экспоненциально
+    растущей случайной задержкой; если веб-портал указал заголовок Retry-After, используется он.
+    После ответа 429 запросы к хосту из всех потоков приостанавливаются на время задержки.
+    Экземпляр класса можно использовать из нескольких потоков одновременно.
+    """
+    __slots__ = ('__bucket', '__max_retries', '__backoff_base', '__backoff_max', '__per_host_limit',
+                 '__host_slots', '__host_paused_until', '__lock', '__stats')
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, rate: float = 7.0, burst: int = 10, max_retries: int = 5, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, per_host_limit: int = 8):
+        """
+        Инициализация планировщика. Значения по умолчанию подобраны под ограничения API HeadHunter.
+        :param rate: Количество запросов в секунду.
+        :param burst: Допустимая серия запросов без ожидания.
+        :param max_retries: Максимальное количество повторов одного запроса.
+        :param backoff_base: Начальная задержка повтора в секундах.
+        :param backoff_max: Максимальная задержка повтора в секундах.
+        :param per_host_limit: Максимальное количество одновременных запросов к одному хосту.
+        """
+        if max_retries < 0 or per_host_limit < 1:
+            raise ValueError('Некорректные параметры планировщика запросов.')
+
+        self.__bucket = TokenBucket(rate, burst)
+        self.__max_retries = max_retries
+        self.__backoff_base = backoff_base
+        self.__backoff_max = backoff_max
+        self.__per_host_limit = per_host_limit
+        self.__host_slots = {}
+        self.__host_paused_until = {}
+        self.__lock = threading.Lock()
+        self.__stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'failures': 0, 'waited': 0.0}
+
+    @property
+    def bucket(self):
+        return self.__bucket
+
+    @property
+    def max_retries(self):
+        return self.__max_retries
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return dict(self.__stats)
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return (f"{self.__class__.__name__}({self.__bucket.rate}, {self.__bucket.capacity}, {self.__max_retries}, "
+                f"{self.__backoff_base}, {self.__backoff_max}, {self.__per_host_limit})")
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Задержка перед повтором: случайная величина от нуля до экспоненциально растущей границы.
+        :param attempt: Номер попытки, начиная с нуля.
+        :return: Задержка в секундах.
+        """
+        return random.uniform(0, min(self.__backoff_max, self.__backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response) -> float | None:
+        """
+        Задержка, указанная веб-порталом в заголовке Retry-After (в секундах или в виде даты).
+        :param response: Экземпляр requests.Response.
+        :return: Задержка в секундах или None, если заголовок отсутствует или некорректен.
+        """
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def __host_slot(self, host: str):
+        with self.__lock:
+            if host not in self.__host_slots:
+                self.__host_slots[host] = threading.BoundedSemaphore(self.__per_host_limit)
+            return self.__host_slots[host]
+
+    def __wait_host(self, host: str) -> float:
+        """
+        Ожидание окончания приостановки запросов к хосту после ответа 429.
+        :param host: Хост веб-портала.
+        :return: Время ожидания в секундах.
+        """
+        with self.__lock:
+            delay = self.__host_paused_until.get(host, 0.0) - time.monotonic()
+
+        if delay > 0:
+            time.sleep(delay)
+            return delay
+        return 0.0
+
+    def __pause_host(self, host: str, delay: float) -> None:
+        with self.__lock:
+            self.__host_paused_until[host] = max(self.__host_paused_until.get(host, 0.0), time.monotonic() + delay)
+
+    def __add_stats(self, **values) -> None:
+        with self.__lock:
+            for name, value in values.items():
+                self.__stats[name] += value
+
+    def send(self, url: str, request):
+        """
+        Выполнить запрос с учётом ограничений частоты и повторами при временных ошибках.
+        :param url: Адрес запроса (используется для определения хоста).
+        :param request: Функция без аргументов, выполняющая запрос и возвращающая requests.Response.
+        :return: Экземпляр requests.Response. Если повторы исчерпаны, возвращается последний ответ.
+        """
+        host = urlparse(url).netloc
+        host_slot = self.__host_slot(host)
+
+        for attempt in range(self.__max_retries + 1):
+            waited = self.__wait_host(host) + self.__bucket.acquire()
+
+            with host_slot:
+                try:
+                    response = request()
+                except (requests.ConnectionError, requests.Timeout):
+                    response = None
+                    if attempt == self.__max_retries:
+                        self.__add_stats(requests=1, failures=1, waited=waited)
+                        raise
+
+            self.__add_stats(requests=1, waited=waited)
+
+            if response is not None and response.status_code not in self.RETRY_STATUS_CODES:
+                return response
+
+            if attempt == self.__max_retries:
+                self.__add_stats(failures=1)
+                return response
+
+            delay = None if response is None else self.retry_after(response)
+            if delay is None:
+                delay = self.backoff(attempt)
+
+            # превышение частоты запросов касается всех потоков: приостанавливаем запросы к хосту целиком.
+            if response is not None and response.status_code == 429:
+                self.__add_stats(throttled=1)
+                self.__pause_host(host, delay)
+
+            self.__add_stats(retries=1)
+            time.sleep(delay)
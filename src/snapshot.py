@@ -0,0 +1,473 @@
+import json
+import mmap
+import os
+import shutil
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import psycopg2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.metrics import metrics
+from src.salary_analytics import SalaryAnalytics
+
+# Версия формата снимка, записываемая в описание снимка.
+SNAPSHOT_FORMAT = 1
+
+# Столбцы таблиц снимка: (столбец, вид хранения). Вид хранения - тип NumPy, 'text' - строки UTF-8
+# (общий буфер байтов и смещения начала строк), 'dictionary' - номер записи в таблице работодателей снимка.
+SNAPSHOT_TABLES = {
+    'employers': (
+        ('id', 'int64'),
+        ('id_employer', 'text'),
+        ('name', 'text'),
+        ('open_vacancies', 'int32'),
+        ('site_url', 'text'),
+        ('trusted', 'bool'),
+        ('accredited_it_employer', 'bool'),
+    ),
+    'vacancies': (
+        ('id', 'int64'),
+        ('id_vacancy', 'text'),
+        ('employer', 'dictionary'),
+        ('name', 'text'),
+        ('description', 'text'),
+        ('published_at', 'datetime64[D]'),
+        ('alternate_url', 'text'),
+        ('salary_from', 'int32'),
+        ('salary_to', 'int32'),
+        ('archived', 'bool'),
+    ),
+}
+
+# Запросы выгрузки таблиц, поля в порядке SNAPSHOT_TABLES. Отсутствующие числа и признаки заменяются нулём.
+_SNAPSHOT_REQUESTS = {
+    'employers': """
+        SELECT
+            employers.id,
+            employers.id_employer,
+            employers.name,
+            COALESCE(employers.open_vacancies, 0),
+            employers.site_url,
+            COALESCE(employers.trusted, false),
+            COALESCE(employers.accredited_it_employer, false)
+        FROM
+            employers
+        ORDER BY
+            employers.id
+    """,
+    'vacancies': """
+        SELECT
+            vacancies.id,
+            vacancies.id_vacancy,
+            vacancies.employer_id,
+            vacancies.name,
+            vacancies.description,
+            vacancies.published_at,
+            vacancies.alternate_url,
+            COALESCE(vacancies.salary_from, 0),
+            COALESCE(vacancies.salary_to, 0),
+            COALESCE(vacancies.archived, false)
+        FROM
+            vacancies
+        ORDER BY
+            vacancies.id
+    """,
+}
+
+
+class _TableWriter:
+    """
+    Класс записи таблицы снимка: каждый столбец дописывается в свой файл пакетами записей.
+    """
+    __slots__ = ('__columns', '__files', '__text_sizes', '__rows', '__employer_codes')
+
+    def __init__(self, directory: str, table: str, employer_codes: dict = None):
+        """
+        Инициализация записи таблицы.
+        :param directory: Каталог снимка.
+        :param table: Имя таблицы снимка.
+        :param employer_codes: Словарь {идентификатор записи работодателя: номер записи в таблице работодателей}.
+        """
+        self.__columns = SNAPSHOT_TABLES[table]
+        self.__employer_codes = employer_codes or {}
+        self.__files = {}
+        self.__text_sizes = {}
+        self.__rows = 0
+
+        for column, kind in self.__columns:
+            if kind == 'text':
+                for part in ('offsets', 'valid', 'data'):
+                    self.__files[column, part] = open(os.path.join(directory, f'{table}.{column}.{part}'), 'wb')
+                # смещение начала первой строки.
+                self.__files[column, 'offsets'].write(np.zeros(1, dtype=np.int64).tobytes())
+                self.__text_sizes[column] = 0
+            else:
+                self.__files[column, 'data'] = open(os.path.join(directory, f'{table}.{column}.data'), 'wb')
+
+    @property
+    def rows(self):
+        return self.__rows
+
+    def append(self, rows: list) -> None:
+        """
+        Дописать пакет записей в файлы столбцов.
+        :param rows: Список записей в порядке столбцов SNAPSHOT_TABLES.
+        :return:
+        """
+        if not rows:
+            return
+
+        for (column, kind), values in zip(self.__columns, zip(*rows)):
+            if kind == 'text':
+                encoded = [b'' if value is None else value.encode('utf-8') for value in values]
+                offsets = np.cumsum([len(value) for value in encoded], dtype=np.int64) + self.__text_sizes[column]
+                self.__text_sizes[column] = int(offsets[-1])
+
+                self.__files[column, 'offsets'].write(offsets.tobytes())
+                self.__files[column, 'valid'].write(np.array([value is not None for value in values]).tobytes())
+                self.__files[column, 'data'].write(b''.join(encoded))
+            elif kind == 'dictionary':
+                codes = np.fromiter((self.__employer_codes.get(value, -1) for value in values), dtype=np.int32,
+                                    count=len(values))
+                self.__files[column, 'data'].write(codes.tobytes())
+            else:
+                self.__files[column, 'data'].write(np.array(values, dtype=kind).tobytes())
+
+        self.__rows += len(rows)
+
+    def close(self) -> dict:
+        """
+        Закрыть файлы столбцов.
+        :return: Описание таблицы снимка для файла описания снимка.
+        """
+        for file in self.__files.values():
+            file.close()
+        return {'rows': self.__rows, 'columns': dict(self.__columns)}
+
+
+def export_snapshot(database_name: str, params: dict, path: str, batch_size: int = 10000) -> dict | None:
+    """
+    Функция выгружает таблицы "Работодатель" и "Вакансии" в снимок - каталог с файлами столбцов,
+    которые читаются классом Snapshot через отображение файлов в память без обращения к СУБД.
+    Вакансии читаются через именованный (серверный) курсор пакетами, поэтому вся таблица не загружается в память.
+    Обе таблицы читаются в одной транзакции с повторяемым чтением, поэтому снимок согласован.
+    Снимок записывается во временный каталог и заменяет существующий только после успешной выгрузки.
+    :param database_name: Имя базы данных из которой выгружаются данные.
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param path: Каталог снимка.
+    :param batch_size: Количество записей, передаваемых с сервера и записываемых в файлы за одно обращение.
+    :return: Описание снимка или None при ошибке выгрузки.
+    """
+    if np is None:
+        raise ImportError('Для выгрузки снимка необходим пакет numpy: poetry install -E analytics')
+
+    if batch_size < 1:
+        raise ValueError('Размер пакета записей должен быть больше нуля.')
+
+    temporary_path = f'{path}.tmp'
+
+    # первоначальное подключение к системе управления базами данных.
+    connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='snapshot')
+
+    # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+    try:
+        connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+
+        shutil.rmtree(temporary_path, ignore_errors=True)
+        os.makedirs(temporary_path)
+
+        # работодателей немного, они читаются целиком: их номера в снимке нужны для кодирования вакансий.
+        with connection.cursor() as cursor:
+            cursor.execute(_SNAPSHOT_REQUESTS['employers'])
+            employer_rows = cursor.fetchall()
+
+        writer = _TableWriter(temporary_path, 'employers')
+        writer.append(employer_rows)
+        tables = {'employers': writer.close()}
+
+        writer = _TableWriter(temporary_path, 'vacancies',
+                              {employer_row[0]: code for code, employer_row in enumerate(employer_rows)})
+        try:
+            # именованный курсор создаётся на стороне сервера и существует до конца транзакции.
+            with connection.cursor(name=f'snapshot_{uuid4().hex}') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(_SNAPSHOT_REQUESTS['vacancies'])
+
+                while rows := cursor.fetchmany(batch_size):
+                    writer.append(rows)
+        finally:
+            tables['vacancies'] = writer.close()
+
+        manifest = {'format': SNAPSHOT_FORMAT,
+                    'database_name': database_name,
+                    'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'tables': tables}
+
+        # описание записывается последним: каталог без описания не считается снимком.
+        with open(os.path.join(temporary_path, 'manifest.json'), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temporary_path, path)
+
+        return manifest
+
+    except(Exception, psycopg2.DatabaseError) as error:
+        print(error)
+        shutil.rmtree(temporary_path, ignore_errors=True)
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+
+def _map_buffer(file_path: str):
+    """
+    Отобразить файл столбца в память только для чтения.
+    :param file_path: Путь к файлу столбца.
+    :return: Экземпляр mmap.mmap, для пустого файла - пустая строка байтов (пустой файл нельзя отобразить в память).
+    """
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _map_file(file_path: str, dtype: str, count: int):
+    """
+    Отобразить файл столбца в память как массив NumPy только для чтения (без копирования данных).
+    :param file_path: Путь к файлу столбца.
+    :param dtype: Тип значений.
+    :param count: Количество значений.
+    :return: Массив значений.
+    """
+    return np.frombuffer(_map_buffer(file_path), dtype=dtype, count=count)
+
+
+class TextColumn:
+    """
+    Класс текстового столбца снимка: строки в общем буфере байтов UTF-8, отображённом в память.
+    Строка декодируется только при обращении к ней.
+    """
+    __slots__ = ('__offsets', '__valid', '__data')
+
+    def __init__(self, offsets, valid, data):
+        """
+        Инициализация текстового столбца.
+        :param offsets: Смещения начала строк в буфере (на одно больше количества строк).
+        :param valid: Признаки заполненности строк, незаполненная строка - None.
+        :param data: Буфер байтов строк: mmap.mmap или bytes.
+        """
+        self.__offsets = offsets
+        self.__valid = valid
+        self.__data = data
+
+    @property
+    def offsets(self):
+        return self.__offsets
+
+    @property
+    def valid(self):
+        return self.__valid
+
+    def __len__(self):
+        return len(self.__valid)
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}({len(self.__valid)})"
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+
+        if index < 0:
+            index += len(self)
+        if not self.__valid[index]:
+            return None
+        return self.__data[self.__offsets[index]:self.__offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, indices) -> list:
+        """
+        Строки с указанными номерами.
+        :param indices: Номера строк или массив признаков отбора.
+        :return: Список строк.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return [self[int(index)] for index in indices]
+
+    def find(self, word: str):
+        """
+        Поиск строк, содержащих слово (с учётом регистра). Поиск выполняется по буферу байтов без декодирования строк.
+        :param word: Искомое слово.
+        :return: Массив номеров строк по возрастанию.
+        """
+        pattern = word.encode('utf-8')
+        if not pattern:
+            return np.flatnonzero(self.__valid)
+
+        positions = []
+        position = self.__data.find(pattern)
+        while position != -1:
+            positions.append(position)
+            # следующий поиск начинается со следующей строки: одной находки в строке достаточно.
+            row = np.searchsorted(self.__offsets, position, side='right') - 1
+            position = self.__data.find(pattern, max(int(self.__offsets[row + 1]), position + 1))
+
+        if not positions:
+            return np.empty(0, dtype=np.int64)
+
+        positions = np.array(positions, dtype=np.int64)
+        rows = np.searchsorted(self.__offsets, positions, side='right') - 1
+        # находка на стыке двух строк не считается.
+        return rows[positions + len(pattern) <= self.__offsets[rows + 1]]
+
+
+class Snapshot:
+    """
+    Класс чтения снимка базы данных, выгруженного функцией export_snapshot.
+    Файлы столбцов отображаются в память: данные не копируются и читаются с диска по мере обращения,
+    поэтому снимок может быть больше оперативной памяти. Работодатель вакансии хранится номером записи
+    в таблице работодателей снимка (-1 - работодатель не указан).
+    Требуется необязательная зависимость numpy (poetry install -E analytics).
+    """
+    __slots__ = ('__path', '__manifest', '__columns')
+
+    def __init__(self, path: str):
+        """
+        Инициализация экземпляра класса.
+        :param path: Каталог снимка.
+        """
+        if np is None:
+            raise ImportError('Для чтения снимка необходим пакет numpy: poetry install -E analytics')
+
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as file:
+            self.__manifest = json.load(file)
+
+        if self.__manifest.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Неподдерживаемая версия формата снимка: {self.__manifest.get('format')}.")
+
+        self.__path = path
+        self.__columns = {}
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def manifest(self):
+        return self.__manifest
+
+    def __len__(self):
+        return self.rows()
+
+    def __repr__(self):
+        """
+        Служебное (внутренне) представление строкового значения экземпляра класса.
+        :return: Строка с данными экземпляра класса.
+        """
+        return f"{self.__class__.__name__}('{self.__path}')"
+
+    def rows(self, table: str = 'vacancies') -> int:
+        """
+        Количество записей таблицы снимка.
+        :param table: Имя таблицы снимка.
+        :return: Количество записей.
+        """
+        return self.__table(table)['rows']
+
+    def __table(self, table: str) -> dict:
+        if table not in self.__manifest['tables']:
+            raise KeyError(f'Таблица {table} отсутствует в снимке.')
+        return self.__manifest['tables'][table]
+
+    def column(self, name: str, table: str = 'vacancies'):
+        """
+        Столбец таблицы снимка, отображённый в память.
+        :param name: Имя столбца.
+        :param table: Имя таблицы снимка.
+        :return: Массив NumPy только для чтения или TextColumn для текстового столбца.
+        """
+        if (table, name) not in self.__columns:
+            description = self.__table(table)
+            if name not in description['columns']:
+                raise KeyError(f'Столбец {name} отсутствует в таблице {table} снимка.')
+
+            kind = description['columns'][name]
+            rows = description['rows']
+            file_path = os.path.join(self.__path, f'{table}.{name}')
+
+            if kind == 'text':
+                offsets = _map_file(f'{file_path}.offsets', 'int64', rows + 1)
+                column = TextColumn(offsets, _map_file(f'{file_path}.valid', 'bool', rows),
+                                    _map_buffer(f'{file_path}.data'))
+            else:
+                column = _map_file(f'{file_path}.data', 'int32' if kind == 'dictionary' else kind, rows)
+
+            self.__columns[table, name] = column
+        return self.__columns[table, name]
+
+    def employer_column(self, name: str):
+        """
+        Значения столбца таблицы работодателей для каждой вакансии (раскодирование столбца работодателя).
+        :param name: Имя числового столбца таблицы работодателей, например 'id'.
+        :return: Массив значений; для вакансий без работодателя - 0 (False для признаков).
+        """
+        values = self.column(name, 'employers')
+        if isinstance(values, TextColumn):
+            raise ValueError('Раскодирование текстового столбца выполняется методом employer_values.')
+
+        codes = self.column('employer')
+        # к значениям столбца добавляется значение для вакансий без работодателя (номер -1 - последний элемент).
+        return np.append(values, np.zeros(1, dtype=values.dtype))[codes]
+
+    def employer_values(self, name: str, indices) -> list:
+        """
+        Значения текстового столбца таблицы работодателей для вакансий с указанными номерами.
+        :param name: Имя столбца таблицы работодателей, например 'name'.
+        :param indices: Номера вакансий или массив признаков отбора.
+        :return: Список значений; для вакансий без работодателя - None.
+        """
+        codes = np.asarray(self.column('employer'))[np.asarray(indices)]
+        values = self.column(name, 'employers')
+        return [None if code < 0 else values[int(code)] for code in codes]
+
+    def iter_batches(self, columns: list, batch_size: int = 100000, table: str = 'vacancies'):
+        """
+        Обход таблицы снимка пакетами записей для обработки данных, не помещающихся в память.
+        :param columns: Имена числовых столбцов.
+        :param batch_size: Количество записей в пакете.
+        :param table: Имя таблицы снимка.
+        :return: Генератор словарей {имя столбца: массив значений пакета}.
+        """
+        if batch_size < 1:
+            raise ValueError('Размер пакета записей должен быть больше нуля.')
+
+        arrays = {name: self.column(name, table) for name in columns}
+        for start in range(0, self.rows(table), batch_size):
+            yield {name: array[start:start + batch_size] for name, array in arrays.items()}
+
+    def salary_analytics(self):
+        """
+        Статистика по зарплатам вакансий снимка.
+        :return: Экземпляр класса SalaryAnalytics.
+        """
+        employer_names = self.column('name', 'employers')
+        return SalaryAnalytics(self.column('id'), self.employer_column('id'), self.column('salary_from'),
+                               self.column('salary_to'),
+                               dict(zip(self.column('id', 'employers').tolist(), employer_names)))
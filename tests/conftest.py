@@ -0,0 +1,43 @@
+import pytest
+from uteils.func import read_config, create_database, create_tables, save_data_to_database
+
+
+@pytest.fixture
+def call_test_db():
+    params = read_config("database.ini")
+    # Создаём тестовую базу данных.
+    create_database('test_db', params)
+
+    # Создаём таблицы для базы данных.
+    create_tables('test_db', params)
+
+    # Создаём наборы данных о Работодателе и Вакансиях для базы данных.
+    employer = [
+        {'id': '123',
+         'name': 'ООО "Супер предприятие"',
+         'open_vacancies': 22,
+         'site_url': 'https://my.emp.pro/',
+         'trusted': True,
+         'accredited_it_employer': True}
+    ]
+
+    vacancy = [
+        {'id': '404',
+         'name': 'Продавец',
+         'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+         'published_at': '2023-05-18',
+         'alternate_url': 'https://hh.ru/vacancy/404',
+         'salary': {'from': 25000, 'to': 30000},
+         'archived': False},
+
+        {'id': '405',
+         'name': 'Продавец-консультант',
+         'snippet': {'responsibility': 'Вставать не каждый день по утрам и ходить на работу'},
+         'published_at': '2023-06-18',
+         'alternate_url': 'https://hh.ru/vacancy/405',
+         'salary': {'from': 35000, 'to': 40000},
+         'archived': False}
+    ]
+
+    # Сохранение данных о Работодателе и Вакансиях в базу данных.
+    save_data_to_database(employer, vacancy, 'test_db', params)
@@ -0,0 +1,201 @@
+import json
+from hashlib import md5
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class HHStubServer:
+    """
+    Локальный сервер-заглушка, имитирующий API веб-портала HeadHunter.
+    Отдаёт синтетические данные о Работодателях и Вакансиях, ведёт учёт запросов.
+    """
+
+    def __init__(self, vacancies_per_employer: int = 10, latency: float = 0.0, throttle_every: int = 0,
+                 retry_after: str = None, max_depth: int = 2000, failing_pages: tuple = (),
+                 employer_latency: dict = None):
+        """
+        Инициализация сервера-заглушки.
+        :param vacancies_per_employer: Количество вакансий у каждого работодателя.
+        :param latency: Искусственная задержка ответа в секундах.
+        :param throttle_every: Отвечать 429 Too Many Requests на каждый throttle_every-й запрос (0 - не отвечать).
+        :param retry_after: Значение заголовка Retry-After в ответе 429.
+        :param max_depth: Максимальное количество вакансий, выдаваемое по одному запросу, как у веб-портала.
+        :param failing_pages: Номера страниц вакансий, на запрос которых отвечать 500 Internal Server Error.
+        :param employer_latency: Дополнительная задержка ответа о работодателе в секундах по его идентификатору.
+        """
+        self.vacancies_per_employer = vacancies_per_employer
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.max_depth = max_depth
+        self.failing_pages = set(failing_pages)
+        self.employer_latency = employer_latency or {}
+        self.throttled_count = 0
+        self.request_count = 0
+        self.connection_count = 0
+        self.not_modified_count = 0
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self._lock = threading.Lock()
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), self.__make_handler())
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.__server.server_address[1]}'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    @staticmethod
+    def make_employer(employer_id: str) -> dict:
+        """
+        Синтетическая запись о Работодателе.
+        :param employer_id: Идентификатор работодателя.
+        :return: Словарь в формате ответа API.
+        """
+        return {
+            'id': employer_id,
+            'name': f'Работодатель {employer_id}',
+            'open_vacancies': 10,
+            'site_url': f'https://employer{employer_id}.ru/',
+            'trusted': True,
+            'accredited_it_employer': False
+        }
+
+    @staticmethod
+    def make_vacancy(employer_id: str, number: int) -> dict:
+        """
+        Синтетическая запись о Вакансии.
+        :param employer_id: Идентификатор работодателя.
+        :param number: Порядковый номер вакансии у работодателя.
+        :return: Словарь в формате ответа API.
+        """
+        vacancy_id = f'{employer_id}{number:06d}'
+        return {
+            'id': vacancy_id,
+            'name': f'Вакансия {number}',
+            'employer': {'id': employer_id},
+            'snippet': {'responsibility': f'Обязанности по вакансии {number}'},
+            'published_at': '2023-10-01T10:00:00+0300',
+            'alternate_url': f'https://hh.ru/vacancy/{vacancy_id}',
+            'salary': {'from': 50000 + number * 1000, 'to': None if number % 3 == 0 else 80000 + number * 1000},
+            'archived': False
+        }
+
+    def handle(self, path: str, query: dict) -> tuple:
+        """
+        Формирование ответа на запрос.
+        :param path: Путь запроса.
+        :param query: Разобранные параметры запроса.
+        :return: Кортеж из кода ответа, заголовков и тела ответа.
+        """
+        if path.startswith('/employers/'):
+            employer_id = path.rsplit('/', 1)[1]
+            if not employer_id.isdigit() or employer_id == '0':
+                return 404, {}, {'errors': [{'type': 'not_found'}]}
+            if employer_id in self.employer_latency:
+                time.sleep(self.employer_latency[employer_id])
+            return 200, {}, self.make_employer(employer_id)
+
+        if path == '/vacancies':
+            employer_ids = query.get('employer_id', [])
+            if not all(employer_id.isdigit() for employer_id in employer_ids):
+                return 400, {}, {'errors': [{'type': 'bad_argument'}]}
+
+            per_page = int(query.get('per_page', ['20'])[0])
+            page = int(query.get('page', ['0'])[0])
+            if page in self.failing_pages:
+                return 500, {}, {'errors': [{'type': 'internal_error'}]}
+
+            found = self.vacancies_per_employer * len(employer_ids)
+            # как и веб-портал, выдаём не более max_depth вакансий, хотя сообщаем полное количество найденных.
+            available = min(found, self.max_depth)
+            start = page * per_page
+            if start >= available > 0:
+                return 400, {}, {'errors': [{'type': 'bad_argument', 'value': 'page'}]}
+
+            items = [
+                self.make_vacancy(employer_ids[number // self.vacancies_per_employer],
+                                  number % self.vacancies_per_employer)
+                for number in range(start, min(start + per_page, available))
+            ]
+            pages = (available + per_page - 1) // per_page
+            return 200, {}, {'items': items, 'found': found, 'pages': pages, 'page': page, 'per_page': per_page}
+
+        return 404, {}, {'errors': [{'type': 'not_found'}]}
+
+    def __make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connection_count += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.active_requests += 1
+                    stub.max_active_requests = max(stub.max_active_requests, stub.active_requests)
+                    throttled = stub.throttle_every and stub.request_count % stub.throttle_every == 0
+                    if throttled:
+                        stub.throttled_count += 1
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+
+                    if throttled:
+                        headers = {} if stub.retry_after is None else {'Retry-After': stub.retry_after}
+                        self.send_body(429, headers, b'{"errors": [{"type": "too_many_requests"}]}')
+                        return
+
+                    url = urlparse(self.path)
+                    status, headers, body = stub.handle(url.path, parse_qs(url.query))
+                    payload = json.dumps(body).encode('utf-8')
+
+                    # Успешные ответы помечаются ETag, на условный запрос с тем же ETag отвечаем 304.
+                    if status == 200:
+                        headers = {'ETag': f'"{md5(payload).hexdigest()}"', **headers}
+                        if self.headers.get('If-None-Match') == headers['ETag']:
+                            with stub._lock:
+                                stub.not_modified_count += 1
+                            status, payload = 304, b''
+
+                    self.send_body(status, headers, payload)
+                finally:
+                    with stub._lock:
+                        stub.active_requests -= 1
+
+            def send_body(self, status, headers, payload):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -1,6 +1,7 @@
 import pytest
 from os import getenv
-from src.api import JobSearchPortalAPI, HeadHunterEmployerAPI, HeadHunterVacancyAPI
+from src.api import JobSearchPortalAPI, HeadHunterEmployerAPI, HeadHunterVacancyAPI, HeadHunterBatchVacancyAPI
+from tests.hh_stub import HHStubServer
 
 
 @pytest.fixture
@@ -140,4 +141,102 @@ def test_hh_api_vacancy_init():
     hh_api = HeadHunterVacancyAPI("80")
     assert hh_api.url_api == "https://api.hh.ru/vacancies"
     assert hh_api.params["employer_id"] == "80"
-    assert hh_api.result_list == []
\ No newline at end of file
+    assert hh_api.result_list == []
+
+
+def test_hh_api_vacancy_iter_vacancies():
+    with HHStubServer(vacancies_per_employer=1000) as server:
+        hh_api = HeadHunterVacancyAPI("80", number_records=100, url_base=server.url)
+
+        vacancies = hh_api.iter_vacancies(prefetch=2)
+        assert next(vacancies)['id'] == '80000000'
+        assert server.request_count <= 3
+
+        assert sum(1 for _ in vacancies) == 999
+        assert server.request_count == 10
+        assert hh_api.result_list == []
+
+
+def test_hh_api_vacancy_iter_vacancies_err():
+    with HHStubServer() as server:
+        hh_api = HeadHunterVacancyAPI("test", url_base=server.url)
+
+        # ошибка первой страницы не выдаётся за отсутствие вакансий.
+        with pytest.raises(Exception):
+            list(hh_api.iter_vacancies())
+
+
+def test_hh_api_vacancy_iter_vacancies_page_err():
+    with HHStubServer(vacancies_per_employer=10, failing_pages=(0,)) as server:
+        hh_api = HeadHunterVacancyAPI("80", number_records=4, url_base=server.url)
+
+        with pytest.raises(Exception):
+            list(hh_api.iter_vacancies())
+
+
+def test_hh_api_batch_vacancy_init_err():
+    with pytest.raises(ValueError):
+        HeadHunterBatchVacancyAPI(['80'], batch_size=0)
+
+
+def test_hh_api_batch_vacancy_page_err():
+    with HHStubServer(vacancies_per_employer=10, failing_pages=(1,)) as server:
+        hh_api = HeadHunterBatchVacancyAPI(['1', '2'], batch_size=2, number_records=4, url_base=server.url)
+
+        with pytest.raises(Exception):
+            hh_api.fetch_batch(['1', '2'])
+
+        # группа с неполученной страницей пропускается целиком.
+        assert hh_api.get_vacancies() == {}
+
+
+def test_hh_api_batch_vacancy_iter_batches():
+    hh_api = HeadHunterBatchVacancyAPI([str(employer_id) for employer_id in range(1, 6)], batch_size=2)
+    assert list(hh_api.iter_batches()) == [['1', '2'], ['3', '4'], ['5']]
+
+
+def test_hh_api_batch_vacancy_get_vacancies():
+    with HHStubServer(vacancies_per_employer=30) as server:
+        employer_ids = [str(employer_id) for employer_id in range(1, 11)]
+        hh_api = HeadHunterBatchVacancyAPI(employer_ids, batch_size=10, number_records=100, url_base=server.url)
+
+        vacancies = hh_api.get_vacancies()
+
+        # 300 вакансий 10 работодателей получены за 3 запроса вместо 10.
+        assert server.request_count == 3
+        assert list(vacancies) == employer_ids
+        assert all(len(items) == 30 for items in vacancies.values())
+        assert all(item['employer']['id'] == employer_id
+                   for employer_id, items in vacancies.items() for item in items)
+
+
+def test_hh_api_batch_vacancy_max_depth():
+    with HHStubServer(vacancies_per_employer=30, max_depth=50) as server:
+        employer_ids = [str(employer_id) for employer_id in range(1, 5)]
+        hh_api = HeadHunterBatchVacancyAPI(employer_ids, batch_size=4, number_records=20, url_base=server.url,
+                                           max_depth=50)
+
+        # вакансий группы больше, чем выдаётся по одному запросу: группа делится, списки вакансий полные.
+        assert {employer_id: len(items) for employer_id, items in hh_api.get_vacancies().items()} == \
+            {employer_id: 30 for employer_id in employer_ids}
+
+
+def test_hh_api_batch_vacancy_max_depth_single_employer():
+    with HHStubServer(vacancies_per_employer=60, max_depth=50) as server:
+        hh_api = HeadHunterBatchVacancyAPI(['1', '2', '3'], batch_size=3, number_records=20, url_base=server.url,
+                                           max_depth=50)
+
+        # у одного работодателя вакансий больше, чем выдаётся по одному запросу: список не усекается.
+        with pytest.raises(Exception):
+            hh_api.fetch_batch(['1'])
+
+        # работодатели с неполным списком пропускаются, а не записываются с первыми max_depth вакансиями.
+        assert hh_api.get_vacancies() == {}
+        assert hh_api.fetch_batch(['1', '2', '3']) == {}
+
+
+def test_hh_api_batch_vacancy_err():
+    with HHStubServer() as server:
+        hh_api = HeadHunterBatchVacancyAPI(['test', '80', '81'], batch_size=1, url_base=server.url)
+
+        assert [employer_id for employer_id, _ in hh_api.iter_vacancies_by_employer()] == ['80', '81']
@@ -0,0 +1,152 @@
+import gzip
+import psycopg2
+import pytest
+from src.archive import ResponseArchive, iter_archive_sessions, replay_archive
+from src.api import HeadHunterEmployerAPI
+from src.cache import ResponseCache
+from src.http_client import HTTPClient
+from src.pipeline import FetchLoadPipeline
+from tests.hh_stub import HHStubServer
+from uteils.func import read_config, create_database, create_tables, sync_data_to_database
+
+
+@pytest.fixture
+def call_test_stub_server():
+    with HHStubServer(vacancies_per_employer=10) as server:
+        yield server
+
+
+def collect_writer(results):
+    return [(result_list_employer[0].id_employer, [vacancy.id_vacancy for vacancy in result_list_vacancy])
+            for result_list_employer, result_list_vacancy in results if result_list_employer]
+
+
+def test_archive_init_err(tmp_path):
+    with pytest.raises(ValueError):
+        ResponseArchive(str(tmp_path / 'responses.ndjson.gz'), flush_every=0)
+
+
+def test_archive_record(tmp_path):
+    path = str(tmp_path / 'archive' / 'responses.ndjson.gz')
+
+    with ResponseArchive(path) as archive:
+        archive.record('url', {'page': 1}, {'items': ['Продавец']})
+        archive.record('url', None, {'items': []})
+        assert archive.records == 2
+        assert repr(archive) == f"ResponseArchive('{path}')"
+
+    # повторное открытие дописывает записи в конец архива.
+    with ResponseArchive(path) as archive:
+        archive.record('url', {'page': 2}, {'items': ['Кассир']})
+
+    records = list(ResponseArchive.iter_records(path))
+    assert [record['body']['items'] for record in records] == [['Продавец'], [], ['Кассир']]
+    assert [record['params'] for record in records] == [{'page': 1}, {}, {'page': 2}]
+    assert records[0]['session'] == records[1]['session']
+
+
+def test_archive_truncated(tmp_path):
+    path = str(tmp_path / 'responses.ndjson.gz')
+
+    archive = ResponseArchive(path, flush_every=2)
+    for page in range(5):
+        archive.record('url', {'page': page}, {})
+
+    # архив не закрыт: читаются записи, сброшенные на диск.
+    assert [record['params']['page'] for record in ResponseArchive.iter_records(path)] == [0, 1, 2, 3]
+    archive.close()
+
+    with open(path, 'rb') as file:
+        content = file.read()
+    with open(path, 'wb') as file:
+        file.write(content[:-10])
+
+    assert [record['params']['page'] for record in ResponseArchive.iter_records(path)] == [0, 1, 2, 3]
+
+
+def test_replay_archive(tmp_path):
+    path = str(tmp_path / 'responses.ndjson.gz')
+
+    with ResponseArchive(path) as archive:
+        archive.record('https://api.hh.ru/employers/1', {}, HHStubServer.make_employer('1'))
+        archive.record('https://api.hh.ru/employers/2', {}, HHStubServer.make_employer('2'))
+        archive.record('https://api.hh.ru/employers/3', {}, HHStubServer.make_employer('3'))
+        archive.record('https://api.hh.ru/vacancies', {'employer_id': ['1', '2'], 'page': 0},
+                       {'items': [HHStubServer.make_vacancy('1', 0), HHStubServer.make_vacancy('2', 0),
+                                  HHStubServer.make_vacancy('2', 1)]})
+
+    # вакансия 2000001 закрыта ко второй загрузке, вакансии работодателя 3 не запрашивались.
+    with ResponseArchive(path) as archive:
+        employer = dict(HHStubServer.make_employer('2'), open_vacancies=1)
+        archive.record('https://api.hh.ru/employers/2', {}, employer)
+        archive.record('https://api.hh.ru/vacancies', {'employer_id': '2', 'page': 1},
+                       {'items': [HHStubServer.make_vacancy('2', 2)]})
+        archive.record('https://api.hh.ru/vacancies', {'employer_id': '2', 'page': 0},
+                       {'items': [HHStubServer.make_vacancy('2', 0)]})
+
+    sessions = list(iter_archive_sessions(path))
+    assert len(sessions) == 2
+    assert collect_writer(sessions[0][1]) == [('1', ['1000000']), ('2', ['2000000', '2000001'])]
+    # вакансии упорядочиваются по страницам, а не по порядку получения страниц.
+    assert collect_writer(sessions[1][1]) == [('2', ['2000000', '2000002'])]
+    assert sessions[1][1][0][0][0].open_vacancies == 1
+
+    assert collect_writer(replay_archive(path)) == collect_writer(sessions[0][1]) + collect_writer(sessions[1][1])
+
+
+def test_replay_archive_pipeline(tmp_path, call_test_stub_server):
+    path = str(tmp_path / 'responses.ndjson.gz')
+
+    with ResponseArchive(path) as archive, HTTPClient(archive=archive) as client:
+        pipeline = FetchLoadPipeline(collect_writer, fetch_workers=2, number_records=4, vacancy_batch_size=2,
+                                     url_base=call_test_stub_server.url, client=client)
+        written = pipeline.run([str(employer_id) for employer_id in range(1, 6)])
+        assert archive.records == call_test_stub_server.request_count
+
+    # архив - сжатый файл NDJSON.
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        assert sum(1 for _ in file) == call_test_stub_server.request_count
+
+    request_count = call_test_stub_server.request_count
+    assert sorted(collect_writer(replay_archive(path))) == sorted(written)
+    assert call_test_stub_server.request_count == request_count
+
+
+def test_archive_http_client_cache(tmp_path, call_test_stub_server):
+    path = str(tmp_path / 'responses.ndjson.gz')
+
+    # в архив попадает только ответ, полученный с веб-портала, ответы из кэша не дописываются.
+    with ResponseArchive(path) as archive, \
+            HTTPClient(cache=ResponseCache(str(tmp_path / 'cache')), archive=archive) as client:
+        for _ in range(3):
+            HeadHunterEmployerAPI('80', url_base=call_test_stub_server.url, client=client).get_requests()
+
+        assert call_test_stub_server.request_count == 1
+        assert archive.records == 1
+
+
+def test_archive_sessions_sync(tmp_path):
+    path = str(tmp_path / 'responses.ndjson.gz')
+
+    for numbers in ([0, 1], [0]):
+        with ResponseArchive(path) as archive:
+            archive.record('https://api.hh.ru/employers/1', {}, HHStubServer.make_employer('1'))
+            archive.record('https://api.hh.ru/vacancies', {'employer_id': '1', 'page': 0},
+                           {'items': [HHStubServer.make_vacancy('1', number) for number in numbers]})
+
+    params = read_config("database.ini")
+    create_database('test_db', params)
+    create_tables('test_db', params)
+
+    # загрузки синхронизируются по очереди: вакансия, закрытая ко второй загрузке, помечается архивной.
+    assert [sync_data_to_database(results, 'test_db', params) for _, results in iter_archive_sessions(path)] == [
+        {'inserted': 2, 'updated': 0, 'unchanged': 0, 'archived': 0},
+        {'inserted': 0, 'updated': 0, 'unchanged': 1, 'archived': 1}]
+
+    connection = psycopg2.connect(dbname='test_db', **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT vacancies.id_vacancy FROM vacancies WHERE vacancies.archived")
+        assert cursor.fetchall() == [('1000001',)]
+
+    connection.close()
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import date
+import pytest
+from src.db import DBManager
+from uteils.func import read_config
+
+asyncpg = pytest.importorskip('asyncpg')
+
+from src.async_db import AsyncDBManager
+
+
+def normalized(rows):
+    # ранг real psycopg2 получает текстом, а asyncpg - в двоичном виде: значения сравниваются с точностью real.
+    return [tuple(round(value, 6) if isinstance(value, float) else value for value in row) for row in rows]
+
+
+@pytest.fixture
+def call_test_async_db_manager():
+    return AsyncDBManager('test_db', read_config("database.ini"), max_connections=4)
+
+
+def test_async_db_manager_init_err():
+    with pytest.raises(ValueError):
+        AsyncDBManager('test_db', {}, min_connections=3, max_connections=2)
+
+
+def test_async_db_manager_repr(call_test_async_db_manager):
+    assert repr(call_test_async_db_manager) == "AsyncDBManager('test_db')"
+    assert str(call_test_async_db_manager) == "database_name = test_db"
+
+
+@pytest.mark.parametrize('method, args', [
+    ('get_companies_and_vacancies_count', ()),
+    ('get_companies_and_vacancies_count', (True,)),
+    ('get_all_vacancies', ()),
+    ('get_avg_salary', ()),
+    ('get_avg_salary', (True,)),
+    ('get_vacancies_with_higher_salary', ()),
+    ('get_vacancies_with_higher_salary', ('123',)),
+    ('get_vacancies_with_higher_salary', (None, None, date(2023, 5, 31))),
+    ('get_vacancies_with_keyword', ('продавец',)),
+    ('get_vacancies_with_keyword', ("%' OR '1'='1",)),
+    ('get_employers_salary_stats', ()),
+    ('search_vacancies', (['продавец'],)),
+    ('search_vacancies', (['продавец', 'менеджер'], False, 1, 1)),
+    ('search_vacancies', ([' '],)),
+])
+def test_async_db_manager_matches_sync(call_test_db, call_test_async_db_manager, method, args):
+    async def fetch():
+        async with call_test_async_db_manager as db_manager:
+            return await getattr(db_manager, method)(*args)
+
+    with DBManager('test_db', read_config("database.ini")) as db_manager:
+        expected = getattr(db_manager, method)(*args)
+
+    assert normalized(asyncio.run(fetch())) == normalized(expected)
+
+
+@pytest.mark.parametrize('method, kwargs', [
+    ('get_companies_and_vacancies_count_page', {}),
+    ('get_all_vacancies_page', {}),
+    ('get_avg_salary_page', {}),
+    ('get_vacancies_with_higher_salary_page', {}),
+    ('get_vacancies_with_higher_salary_page', {'employer_id': '123'}),
+    ('get_vacancies_with_higher_salary_page', {'date_to': date(2023, 5, 31)}),
+    ('get_vacancies_with_keyword_page', {'key_word': 'а'}),
+    ('search_vacancies_page', {'key_words': ['продавец', 'менеджер'], 'match_all': False}),
+])
+def test_async_db_manager_pages_match_sync(call_test_db, call_test_async_db_manager, method, kwargs):
+    async def fetch_all():
+        pages = []
+        async with call_test_async_db_manager as db_manager:
+            cursor = None
+            while True:
+                page = await getattr(db_manager, method)(page_size=1, cursor=cursor, **kwargs)
+                pages.append((normalized(page.rows), page.has_next))
+                if not page.has_next:
+                    return pages
+                cursor = page.next_cursor
+
+    expected = []
+    with DBManager('test_db', read_config("database.ini")) as db_manager:
+        cursor = None
+        while True:
+            page = getattr(db_manager, method)(page_size=1, cursor=cursor, **kwargs)
+            expected.append((normalized(page.rows), page.has_next))
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+    assert asyncio.run(fetch_all()) == expected
+
+
+def test_async_db_manager_page_size_err(call_test_async_db_manager):
+    with pytest.raises(ValueError):
+        asyncio.run(call_test_async_db_manager.get_all_vacancies_page(page_size=0))
+
+
+def test_async_db_manager_lock_outside_loop(call_test_db):
+    # экземпляр класса создаётся вне цикла событий, а используется в нескольких циклах событий подряд.
+    db_manager = AsyncDBManager('test_db', read_config("database.ini"))
+    asyncio.run(db_manager.close())
+
+    async def fetch():
+        async with db_manager:
+            return await db_manager.get_vacancies_with_higher_salary(live=True)
+
+    assert asyncio.run(fetch()) == asyncio.run(fetch()) == [('Продавец-консультант', 37500)]
+
+
+def test_async_db_manager_concurrent(call_test_db, call_test_async_db_manager):
+    async def fetch():
+        async with call_test_async_db_manager as db_manager:
+            return await asyncio.gather(*(db_manager.get_vacancies_with_higher_salary(live=True) for _ in range(50)))
+
+    assert asyncio.run(fetch()) == [[('Продавец-консультант', 37500)]] * 50
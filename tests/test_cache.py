@@ -0,0 +1,84 @@
+import os
+import time
+import pytest
+from src.cache import ResponseCache
+from src.http_client import HTTPClient
+from src.api import HeadHunterEmployerAPI
+from tests.hh_stub import HHStubServer
+
+
+@pytest.fixture
+def call_test_stub_server():
+    with HHStubServer() as server:
+        yield server
+
+
+def test_cache_init(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000)
+    assert cache.directory == str(tmp_path)
+    assert cache.size == 0
+    assert cache.hit_ratio == 0.0
+    assert repr(cache) == f"ResponseCache('{tmp_path}', 1000)"
+
+
+def test_cache_init_err(tmp_path):
+    with pytest.raises(ValueError):
+        ResponseCache(str(tmp_path), max_bytes=0)
+
+
+def test_cache_key():
+    assert ResponseCache.make_key('url', {'a': 1, 'b': 2}) == ResponseCache.make_key('url', {'b': 2, 'a': 1})
+    assert ResponseCache.make_key('url', {'page': 1}) != ResponseCache.make_key('url', {'page': 2})
+
+
+def test_cache_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), default_ttl=10, ttl_by_path={'/employers/': 100, '/employers/80': 1000})
+    assert cache.ttl('https://api.hh.ru/vacancies') == 10
+    assert cache.ttl('https://api.hh.ru/employers/1') == 100
+    assert cache.ttl('https://api.hh.ru/employers/80') == 1000
+
+
+def test_cache_put_get(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('url', {'page': 0}, {'items': [1, 2]}, etag='"abc"')
+
+    entry = cache.get('url', {'page': 0})
+    assert entry['body'] == {'items': [1, 2]}
+    assert entry['etag'] == '"abc"'
+    assert cache.is_fresh('url', entry)
+    assert cache.get('url', {'page': 1}) is None
+
+
+def test_cache_evict(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=500)
+    for number in range(10):
+        cache.put('url', {'page': number}, {'items': 'x' * 100})
+        os.utime(os.path.join(str(tmp_path), ResponseCache.make_key('url', {'page': number}) + '.json'),
+                 (number, number))
+
+    assert cache.size <= 500
+    assert cache.get('url', {'page': 9}) is not None
+    assert cache.get('url', {'page': 0}) is None
+    assert cache.stats['evictions'] > 0
+
+
+def test_cache_http_client_hit(tmp_path, call_test_stub_server):
+    with HTTPClient(cache=ResponseCache(str(tmp_path))) as client:
+        for _ in range(5):
+            HeadHunterEmployerAPI('80', url_base=call_test_stub_server.url, client=client).get_requests()
+
+        assert call_test_stub_server.request_count == 1
+        assert client.cache.stats['hits'] == 4
+        assert client.cache.hit_ratio == 0.8
+
+
+def test_cache_http_client_revalidate(tmp_path, call_test_stub_server):
+    with HTTPClient(cache=ResponseCache(str(tmp_path), default_ttl=0.05)) as client:
+        employer_api = HeadHunterEmployerAPI('80', url_base=call_test_stub_server.url, client=client)
+        employer_api.get_requests()
+        time.sleep(0.1)
+
+        assert employer_api.get_requests()['id'] == '80'
+        assert call_test_stub_server.request_count == 2
+        assert call_test_stub_server.not_modified_count == 1
+        assert client.cache.stats['revalidated'] == 1
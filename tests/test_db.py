@@ -1,47 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+import psycopg2
 import pytest
 from src.db import DBManager
-from uteils.func import read_config, create_database, create_tables, save_data_to_database
-
-
-@pytest.fixture
-def call_test_db():
-    params = read_config("database.ini")
-    # Создаём тестовую базу данных.
-    create_database('test_db', params)
-
-    # Создаём таблицы для базы данных.
-    create_tables('test_db', params)
-
-    # Создаём наборы данных о Работодателе и Вакансиях для базы данных.
-    employer = [
-        {'id': '123',
-         'name': 'ООО "Супер предприятие"',
-         'open_vacancies': 22,
-         'site_url': 'https://my.emp.pro/',
-         'trusted': True,
-         'accredited_it_employer': True}
-    ]
-
-    vacancy = [
-        {'id': '404',
-         'name': 'Продавец',
-         'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
-         'published_at': '2023-05-18',
-         'alternate_url': 'https://hh.ru/vacancy/404',
-         'salary': {'from': 25000, 'to': 30000},
-         'archived': False},
-
-        {'id': '405',
-         'name': 'Продавец-консультант',
-         'snippet': {'responsibility': 'Вставать не каждый день по утрам и ходить на работу'},
-         'published_at': '2023-06-18',
-         'alternate_url': 'https://hh.ru/vacancy/405',
-         'salary': {'from': 35000, 'to': 40000},
-         'archived': False}
-    ]
-
-    # Сохранение данных о Работодателе и Вакансиях в базу данных.
-    save_data_to_database(employer, vacancy, 'test_db', params)
+from src.query_cache import bump_data_version
+from uteils.func import read_config, save_data_to_database, refresh_materialized_views
 
 
 @pytest.fixture
@@ -110,3 +74,236 @@ def test_db_manager_get_vacancies_with_higher_salary(call_test_db, call_test_db_
 
 def test_db_manager_get_vacancies_with_keyword(call_test_db, call_test_db_manager):
     assert call_test_db_manager.get_vacancies_with_keyword('Продавец') == [('Продавец',), ('Продавец-консультант',)]
+
+
+def test_db_manager_init_err():
+    with pytest.raises(ValueError):
+        DBManager('test_db', {}, min_connections=3, max_connections=2)
+
+
+def test_db_manager_pool(call_test_db):
+    with DBManager('test_db', read_config("database.ini"), max_connections=2) as db_manager:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            answers = list(executor.map(lambda _: db_manager.get_companies_and_vacancies_count(), range(20)))
+
+        stats = db_manager.pool_stats()
+
+    assert all(answer == [('ООО "Супер предприятие"', 22)] for answer in answers)
+    assert stats['max_connections'] == 2
+    assert stats['checkouts'] == 20
+    assert stats['in_use'] == 0
+    assert 1 <= stats['peak_in_use'] <= 2
+
+
+def test_db_manager_iter_all_vacancies(call_test_db, call_test_db_manager):
+    vacancies = call_test_db_manager.iter_all_vacancies(itersize=1)
+
+    assert next(vacancies) == ('ООО "Супер предприятие"', 'Продавец', 25000, 30000, 'https://hh.ru/vacancy/404')
+    assert call_test_db_manager.pool_stats()['in_use'] == 1
+
+    assert list(vacancies) == [
+        ('ООО "Супер предприятие"', 'Продавец-консультант', 35000, 40000, 'https://hh.ru/vacancy/405')
+    ]
+    assert call_test_db_manager.pool_stats()['in_use'] == 0
+
+
+def test_db_manager_get_vacancies_with_higher_salary_filters(call_test_db, call_test_db_manager):
+    assert call_test_db_manager.get_vacancies_with_higher_salary(employer_id='123') == [('Продавец-консультант', 37500)]
+    assert call_test_db_manager.get_vacancies_with_higher_salary(employer_id='0') == []
+    assert call_test_db_manager.get_vacancies_with_higher_salary(date_to=date(2023, 5, 31)) == [('Продавец', 27500)]
+
+    # повторный вызов использует уже подготовленный запрос.
+    assert call_test_db_manager.get_vacancies_with_higher_salary() == [('Продавец-консультант', 37500)]
+
+
+def test_db_manager_get_vacancies_with_keyword_case(call_test_db, call_test_db_manager):
+    assert call_test_db_manager.get_vacancies_with_keyword('консультант') == [('Продавец-консультант',)]
+    assert call_test_db_manager.get_vacancies_with_keyword('ПРОДАВЕЦ-') == [('Продавец-консультант',)]
+    assert call_test_db_manager.get_vacancies_with_keyword("%' OR '1'='1") == []
+
+
+def test_db_manager_search_vacancies(call_test_db, call_test_db_manager):
+    assert [row[0] for row in call_test_db_manager.search_vacancies(['продавец'])] == ['Продавец',
+                                                                                       'Продавец-консультант']
+    assert [row[0] for row in call_test_db_manager.search_vacancies(['продавец', 'консультант'])] == \
+        ['Продавец-консультант']
+    assert len(call_test_db_manager.search_vacancies(['консультант', 'утрам'], match_all=False)) == 2
+    assert len(call_test_db_manager.search_vacancies(['продавец'], limit=1, offset=1)) == 1
+    assert call_test_db_manager.search_vacancies([]) == []
+
+
+def test_db_manager_reports_from_views(call_test_db, call_test_db_manager):
+    assert call_test_db_manager.get_companies_and_vacancies_count() == \
+        call_test_db_manager.get_companies_and_vacancies_count(live=True)
+    assert call_test_db_manager.get_avg_salary() == call_test_db_manager.get_avg_salary(live=True)
+    assert call_test_db_manager.get_vacancies_with_higher_salary() == \
+        call_test_db_manager.get_vacancies_with_higher_salary(live=True)
+    assert call_test_db_manager.get_employers_salary_stats() == [('ООО "Супер предприятие"', 2, Decimal(32500),
+                                                                  27500, 37500)]
+
+
+def test_db_manager_reports_views_refresh(call_test_db, call_test_db_manager):
+    params = read_config("database.ini")
+
+    employer = [{'id': '124',
+                 'name': 'ООО "Другое предприятие"',
+                 'open_vacancies': 1,
+                 'site_url': 'https://other.emp.pro/',
+                 'trusted': True,
+                 'accredited_it_employer': False}]
+
+    vacancy = [{'id': '406',
+                'name': 'Кассир',
+                'snippet': {'responsibility': 'Работать на кассе'},
+                'published_at': '2023-07-18',
+                'alternate_url': 'https://hh.ru/vacancy/406',
+                'salary': {'from': 90000, 'to': 100000},
+                'archived': False}]
+
+    # без обновления представлений отчёт показывает данные на момент последнего обновления.
+    save_data_to_database(employer, vacancy, 'test_db', params, refresh_views=False)
+    assert call_test_db_manager.get_vacancies_with_higher_salary() == [('Продавец-консультант', 37500)]
+    assert call_test_db_manager.get_vacancies_with_higher_salary(live=True) == [('Кассир', 95000)]
+
+    refresh_materialized_views('test_db', params)
+    assert call_test_db_manager.get_vacancies_with_higher_salary() == [('Кассир', 95000)]
+    assert len(call_test_db_manager.get_companies_and_vacancies_count()) == 2
+
+
+def test_db_manager_query_cache(call_test_db):
+    params = read_config("database.ini")
+
+    with DBManager('test_db', params, cache_size=8, version_check_interval=None) as db_manager:
+        assert db_manager.get_employers_salary_stats() == db_manager.get_employers_salary_stats()
+        assert db_manager.query_cache.stats['hits'] == 1
+
+        # списки вакансий не кэшируются и каждый раз запрашиваются в СУБД.
+        checkouts = db_manager.pool_stats()['checkouts']
+        assert db_manager.get_all_vacancies() == db_manager.get_all_vacancies()
+        assert db_manager.get_avg_salary() == db_manager.get_avg_salary()
+        assert db_manager.pool_stats()['checkouts'] == checkouts + 4
+        assert db_manager.query_cache.stats['hits'] == 1
+
+        # повторная выборка не обращается к СУБД.
+        checkouts = db_manager.pool_stats()['checkouts']
+        assert db_manager.get_companies_and_vacancies_count() == [('ООО "Супер предприятие"', 22)]
+        assert db_manager.get_companies_and_vacancies_count(live=False) == [('ООО "Супер предприятие"', 22)]
+        assert db_manager.pool_stats()['checkouts'] == checkouts + 1
+
+        # запись данных в текущем процессе сбрасывает кэш.
+        save_data_to_database([{'id': '124',
+                                'name': 'ООО "Другое предприятие"',
+                                'open_vacancies': 1,
+                                'site_url': 'https://other.emp.pro/',
+                                'trusted': True,
+                                'accredited_it_employer': False}], [], 'test_db', params)
+        assert len(db_manager.get_companies_and_vacancies_count()) == 2
+
+
+def test_db_manager_query_cache_write_during_query(call_test_db, monkeypatch):
+    params = read_config("database.ini")
+
+    with DBManager('test_db', params, cache_size=8, version_check_interval=None) as db_manager:
+        execute_request = DBManager._DBManager__execute_request
+
+        def execute_request_with_write(self, *args, **kwargs):
+            # данные изменяются, пока выполняется запрос.
+            rows = execute_request(self, *args, **kwargs)
+            bump_data_version('test_db')
+            return rows
+
+        monkeypatch.setattr(DBManager, '_DBManager__execute_request', execute_request_with_write)
+        db_manager.get_employers_salary_stats()
+        monkeypatch.undo()
+
+        # выборка, полученная до изменения данных, в кэш не сохранена.
+        assert len(db_manager.query_cache) == 0
+        db_manager.get_employers_salary_stats()
+        assert len(db_manager.query_cache) == 1
+
+
+def test_db_manager_query_cache_data_version(call_test_db):
+    params = read_config("database.ini")
+
+    with DBManager('test_db', params, cache_size=8, version_check_interval=0) as db_manager:
+        assert db_manager.get_companies_and_vacancies_count(live=True) == [('ООО "Супер предприятие"', 22)]
+
+        # изменение данных другим подключением (процессом) отслеживается по счётчику версии данных.
+        connection = psycopg2.connect(dbname='test_db', **params)
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE employers SET open_vacancies = 5 WHERE id_employer = '123'")
+        connection.commit()
+        connection.close()
+
+        assert db_manager.get_companies_and_vacancies_count(live=True) == [('ООО "Супер предприятие"', 5)]
+
+
+def test_db_manager_pages(call_test_db, call_test_db_manager):
+    page = call_test_db_manager.get_all_vacancies_page(page_size=1)
+    assert page.rows == [('ООО "Супер предприятие"', 'Продавец', 25000, 30000, 'https://hh.ru/vacancy/404')]
+    assert page.has_next
+
+    page = call_test_db_manager.get_all_vacancies_page(page_size=1, cursor=page.next_cursor)
+    assert page.rows == [('ООО "Супер предприятие"', 'Продавец-консультант', 35000, 40000,
+                          'https://hh.ru/vacancy/405')]
+    assert not page.has_next
+
+    assert call_test_db_manager.get_companies_and_vacancies_count_page().rows == [('ООО "Супер предприятие"', 22)]
+    assert call_test_db_manager.get_avg_salary_page(page_size=2).rows == call_test_db_manager.get_avg_salary()
+    assert call_test_db_manager.get_vacancies_with_higher_salary_page().rows == [('Продавец-консультант', 37500)]
+    assert call_test_db_manager.get_vacancies_with_higher_salary_page(employer_id='123').rows == \
+        [('Продавец-консультант', 37500)]
+    assert call_test_db_manager.get_vacancies_with_keyword_page('продавец', page_size=1).has_next
+
+    with pytest.raises(ValueError):
+        call_test_db_manager.get_all_vacancies_page(page_size=0)
+
+
+def test_db_manager_higher_salary_page_threshold(call_test_db, call_test_db_manager):
+    params = read_config("database.ini")
+
+    def employer_vacancy(employer_id: str, vacancy_id: str, salary: int) -> tuple:
+        employer = [{'id': employer_id,
+                     'name': f'ООО "Предприятие {employer_id}"',
+                     'open_vacancies': 1,
+                     'site_url': f'https://{employer_id}.emp.pro/',
+                     'trusted': True,
+                     'accredited_it_employer': False}]
+        vacancy = [{'id': vacancy_id,
+                    'name': 'Кассир',
+                    'snippet': {'responsibility': 'Работать на кассе'},
+                    'published_at': '2023-07-18',
+                    'alternate_url': f'https://hh.ru/vacancy/{vacancy_id}',
+                    'salary': {'from': salary, 'to': salary},
+                    'archived': False}]
+        return employer, vacancy
+
+    save_data_to_database(*employer_vacancy('124', '406', 38000), 'test_db', params)
+    page = call_test_db_manager.get_vacancies_with_higher_salary_page(page_size=1, date_from=date(2023, 5, 1))
+    assert page.rows == [('Продавец-консультант', 37500)]
+    assert page.has_next
+
+    # средняя зарплата вычислена на первой странице и передаётся в курсоре: следующие страницы
+    # отбираются по той же средней зарплате, даже если данные изменились.
+    save_data_to_database(*employer_vacancy('125', '407', 200000), 'test_db', params)
+    page = call_test_db_manager.get_vacancies_with_higher_salary_page(page_size=1, cursor=page.next_cursor,
+                                                                      date_from=date(2023, 5, 1))
+    assert page.rows == [('Кассир', 38000)]
+    assert call_test_db_manager.get_vacancies_with_higher_salary(date_from=date(2023, 5, 1)) == [('Кассир', 200000)]
+
+    with pytest.raises(ValueError):
+        call_test_db_manager.get_vacancies_with_higher_salary_page(cursor=page.next_cursor)
+
+
+def test_db_manager_search_vacancies_page(call_test_db, call_test_db_manager):
+    rows = []
+    cursor = None
+    while True:
+        page = call_test_db_manager.search_vacancies_page(['консультант', 'утрам'], match_all=False, page_size=1,
+                                                          cursor=cursor)
+        rows.extend(page.rows)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    assert rows == call_test_db_manager.search_vacancies(['консультант', 'утрам'], match_all=False)
@@ -130,4 +130,323 @@ def test_save_data_to_database():
         assert cursor.fetchall() == [('ООО "Супер предприятие"', 22)]
 
         if connection is not None:
-            connection.close()
\ No newline at end of file
+            connection.close()
+
+def test_save_data_to_database_bulk():
+
+    database_name = "test_db"
+    params = func.read_config("database.ini")
+
+    func.create_database(database_name, params)
+    func.create_tables(database_name, params)
+
+    results = [
+        ([{'id': str(employer_id),
+           'name': f'Работодатель {employer_id}',
+           'open_vacancies': 5,
+           'site_url': 'https://my.emp.pro/',
+           'trusted': True,
+           'accredited_it_employer': False}],
+         [{'id': f'{employer_id}{number}',
+           'name': 'Продавец',
+           'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+           'published_at': '2023-05-18',
+           'alternate_url': f'https://hh.ru/vacancy/{employer_id}{number}',
+           'salary': {'from': 25000, 'to': None},
+           'archived': False} for number in range(5)])
+        for employer_id in range(1, 4)
+    ]
+
+    assert func.save_data_to_database_bulk(results, database_name, params, batch_size=4) == 15
+
+    connection = psycopg2.connect(dbname=database_name, **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                employers.id_employer AS id_employer,
+                COUNT(vacancies.id) AS vacancies_count,
+                SUM(vacancies.salary_to) AS salary_to
+            FROM
+                employers
+                    LEFT JOIN vacancies
+                        ON vacancies.employer_id = employers.id
+            GROUP BY
+                employers.id_employer
+            ORDER BY
+                employers.id_employer
+        """)
+
+        assert cursor.fetchall() == [('1', 5, 0), ('2', 5, 0), ('3', 5, 0)]
+
+        if connection is not None:
+            connection.close()
+
+
+def test_sync_data_to_database():
+
+    database_name = "test_db"
+    params = func.read_config("database.ini")
+
+    func.create_database(database_name, params)
+    func.create_tables(database_name, params)
+
+    employer = [
+        {'id': '123',
+         'name': 'ООО "Супер предприятие"',
+         'open_vacancies': 22,
+         'site_url': 'https://my.emp.pro/',
+         'trusted': True,
+         'accredited_it_employer': True}
+    ]
+
+    vacancy = [
+        {'id': str(vacancy_id),
+         'name': 'Продавец',
+         'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+         'published_at': '2023-05-18',
+         'alternate_url': f'https://hh.ru/vacancy/{vacancy_id}',
+         'salary': {'from': 25000, 'to': 30000},
+         'archived': False} for vacancy_id in range(400, 404)
+    ]
+
+    assert func.sync_data_to_database([(employer, vacancy)], database_name, params) == \
+        {'inserted': 4, 'updated': 0, 'unchanged': 0, 'archived': 0}
+
+    # вакансия 400 изменилась, вакансия 403 исчезла.
+    vacancy[0]['salary'] = {'from': 35000, 'to': 40000}
+    assert func.sync_data_to_database([(employer, vacancy[:3])], database_name, params) == \
+        {'inserted': 0, 'updated': 1, 'unchanged': 2, 'archived': 1}
+
+    # данные существующей базы сохраняются при повторном создании без пересоздания.
+    func.create_database(database_name, params, recreate=False)
+    func.create_tables(database_name, params, recreate=False)
+
+    connection = psycopg2.connect(dbname=database_name, **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                vacancies.id_vacancy AS id_vacancy,
+                vacancies.salary_from AS salary_from,
+                vacancies.archived AS archived
+            FROM
+                vacancies
+            ORDER BY
+                vacancies.id_vacancy
+        """)
+
+        assert cursor.fetchall() == [('400', 35000, False), ('401', 25000, False),
+                                     ('402', 25000, False), ('403', 25000, True)]
+
+        if connection is not None:
+            connection.close()
+
+
+def test_sync_data_to_database_published_at_changed():
+
+    database_name = "test_db"
+    params = func.read_config("database.ini")
+
+    func.create_database(database_name, params)
+    func.create_tables(database_name, params)
+
+    employer = [
+        {'id': '123',
+         'name': 'ООО "Супер предприятие"',
+         'open_vacancies': 22,
+         'site_url': 'https://my.emp.pro/',
+         'trusted': True,
+         'accredited_it_employer': True}
+    ]
+
+    vacancy = [
+        {'id': '400',
+         'name': 'Продавец',
+         'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+         'published_at': '2023-05-18',
+         'alternate_url': 'https://hh.ru/vacancy/400',
+         'salary': {'from': 25000, 'to': 30000},
+         'archived': False}
+    ]
+
+    assert func.sync_data_to_database([(employer, vacancy)], database_name, params)['inserted'] == 1
+
+    # вакансия опубликована повторно: запись переносится в раздел нового месяца, а не дублируется.
+    vacancy[0]['published_at'] = '2023-06-18'
+    assert func.sync_data_to_database([(employer, vacancy)], database_name, params) == \
+        {'inserted': 0, 'updated': 1, 'unchanged': 0, 'archived': 0}
+
+    connection = psycopg2.connect(dbname=database_name, **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                vacancies.tableoid::regclass::text AS partition_name,
+                vacancies.id_vacancy AS id_vacancy
+            FROM
+                vacancies
+        """)
+
+        assert cursor.fetchall() == [('vacancies_p2023_06', '400')]
+
+        if connection is not None:
+            connection.close()
+
+
+def test_save_data_to_database_published_at_changed():
+
+    database_name = "test_db"
+    params = func.read_config("database.ini")
+
+    func.create_database(database_name, params)
+    func.create_tables(database_name, params)
+
+    employer = [
+        {'id': '123',
+         'name': 'ООО "Супер предприятие"',
+         'open_vacancies': 22,
+         'site_url': 'https://my.emp.pro/',
+         'trusted': True,
+         'accredited_it_employer': True}
+    ]
+
+    vacancy = {'id': '400',
+               'name': 'Продавец',
+               'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+               'published_at': '2023-05-18',
+               'alternate_url': 'https://hh.ru/vacancy/400',
+               'salary': {'from': 25000, 'to': 30000},
+               'archived': False}
+
+    func.save_data_to_database(employer, [vacancy], database_name, params)
+    # вакансия опубликована повторно: и пакетная, и построчная запись не вносят её второй раз.
+    func.save_data_to_database_bulk([(employer, [dict(vacancy, published_at='2023-06-18')])], database_name, params)
+    func.save_data_to_database_bulk([(employer, [dict(vacancy, published_at='2023-07-18')])], database_name, params)
+
+    connection = psycopg2.connect(dbname=database_name, **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                vacancies.tableoid::regclass::text AS partition_name,
+                vacancies.id_vacancy AS id_vacancy
+            FROM
+                vacancies
+        """)
+
+        assert cursor.fetchall() == [('vacancies_p2023_07', '400')]
+
+        if connection is not None:
+            connection.close()
+
+
+def test_vacancy_partitions():
+
+    database_name = "test_db"
+    params = func.read_config("database.ini")
+
+    func.create_database(database_name, params)
+    func.create_tables(database_name, params)
+
+    # разделы на ближайшие месяцы созданы вместе с таблицами.
+    assert func.create_vacancy_partitions(database_name, params) == 0
+    assert func.create_vacancy_partitions(database_name, params, months_back=3) == 2
+
+    employer = [
+        {'id': '123',
+         'name': 'ООО "Супер предприятие"',
+         'open_vacancies': 22,
+         'site_url': 'https://my.emp.pro/',
+         'trusted': True,
+         'accredited_it_employer': True}
+    ]
+
+    vacancy = [
+        {'id': str(400 + index),
+         'name': 'Продавец',
+         'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+         'published_at': published_at,
+         'alternate_url': f'https://hh.ru/vacancy/{400 + index}',
+         'salary': {'from': 25000, 'to': 30000},
+         'archived': False} for index, published_at in enumerate(['2023-05-18', '2023-06-18', '2099-01-01'])
+    ]
+
+    func.save_data_to_database_bulk([(employer, vacancy)], database_name, params)
+
+    with pytest.raises(ValueError):
+        func.drop_old_vacancy_partitions(database_name, params, keep_months=-1)
+
+    assert func.drop_old_vacancy_partitions(database_name, params, keep_months=12, detach=True,
+                                            refresh_views=False) == ['vacancies_p2023_05', 'vacancies_p2023_06']
+    assert func.drop_old_vacancy_partitions(database_name, params) == []
+
+    connection = psycopg2.connect(dbname=database_name, **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT vacancies.id_vacancy FROM vacancies")
+        assert cursor.fetchall() == [('402',)]
+
+        # отсоединённые разделы сохраняются отдельными таблицами.
+        cursor.execute("SELECT vacancies_archive_2023_05.id_vacancy FROM vacancies_archive_2023_05")
+        assert cursor.fetchall() == [('400',)]
+
+        cursor.execute("SELECT mv_salary_summary.vacancies_count FROM mv_salary_summary")
+        assert cursor.fetchone() == (1,)
+
+        if connection is not None:
+            connection.close()
+
+
+def test_save_data_to_database_create_partitions():
+
+    database_name = "test_db"
+    params = func.read_config("database.ini")
+
+    func.create_database(database_name, params)
+    func.create_tables(database_name, params)
+
+    vacancy = {'id': '400',
+               'name': 'Продавец',
+               'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу'},
+               'published_at': '2023-05-18',
+               'alternate_url': 'https://hh.ru/vacancy/400',
+               'salary': {'from': 25000, 'to': 30000},
+               'archived': False}
+
+    # данные по работодателям записываются в цикле, разделы создаются один раз после цикла.
+    for employer_id in ('123', '124'):
+        employer = [{'id': employer_id,
+                     'name': f'Работодатель {employer_id}',
+                     'open_vacancies': 1,
+                     'site_url': 'https://my.emp.pro/',
+                     'trusted': True,
+                     'accredited_it_employer': False}]
+        func.save_data_to_database(employer, [dict(vacancy, id=f'{employer_id}0')], database_name, params,
+                                   refresh_views=False, create_partitions=False)
+
+    connection = psycopg2.connect(dbname=database_name, **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT vacancies.tableoid::regclass::text FROM vacancies")
+        assert cursor.fetchall() == [('vacancies_default',), ('vacancies_default',)]
+
+    assert func.create_vacancy_partitions(database_name, params) == 1
+    assert func.drop_old_vacancy_partitions(database_name, params, refresh_views=False) == ['vacancies_p2023_05']
+
+    # идентификаторы удалённых вместе с разделом вакансий удалены: вакансия может быть внесена снова.
+    func.save_data_to_database_bulk([(employer, [dict(vacancy, id='1240', published_at='2099-01-01')])],
+                                    database_name, params, refresh_views=False)
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                vacancy_ids.id_vacancy AS id_vacancy,
+                vacancy_ids.published_at::text AS published_at
+            FROM
+                vacancy_ids
+        """)
+        assert cursor.fetchall() == [('1240', '2099-01-01')]
+
+        if connection is not None:
+            connection.close()
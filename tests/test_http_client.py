@@ -0,0 +1,53 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.http_client import HTTPClient, get_default_client
+from src.api import HeadHunterEmployerAPI
+from tests.hh_stub import HHStubServer
+
+
+@pytest.fixture
+def call_test_stub_server():
+    with HHStubServer() as server:
+        yield server
+
+
+def test_http_client_init():
+    client = HTTPClient(pool_size=4)
+    assert client.pool_size == 4
+    assert str(client) == "pool_size = 4"
+    assert repr(client) == "HTTPClient(4)"
+
+
+def test_http_client_init_err():
+    with pytest.raises(ValueError):
+        HTTPClient(pool_size=0)
+
+
+def test_http_client_default():
+    assert get_default_client() is get_default_client()
+    assert HeadHunterEmployerAPI('80').client is get_default_client()
+
+
+def test_http_client_session_headers():
+    with HTTPClient() as client:
+        assert 'gzip' in client.session.headers['Accept-Encoding']
+        assert client.session.headers['Connection'] == 'keep-alive'
+
+
+def test_http_client_keep_alive(call_test_stub_server):
+    with HTTPClient(pool_size=2) as client:
+        for _ in range(10):
+            HeadHunterEmployerAPI('80', url_base=call_test_stub_server.url, client=client).get_requests()
+
+    assert call_test_stub_server.request_count == 10
+    assert call_test_stub_server.connection_count == 1
+
+
+def test_http_client_threads(call_test_stub_server):
+    with HTTPClient(pool_size=3) as client:
+        employer_api = HeadHunterEmployerAPI('80', url_base=call_test_stub_server.url, client=client)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            answers = list(executor.map(lambda _: employer_api.get_requests(), range(30)))
+
+    assert all(answer['id'] == '80' for answer in answers)
+    assert call_test_stub_server.connection_count <= 3
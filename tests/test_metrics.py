@@ -0,0 +1,102 @@
+import json
+import pytest
+from src.http_client import HTTPClient
+from src.metrics import MetricsRegistry, endpoint_name, metrics
+from tests.hh_stub import HHStubServer
+
+
+@pytest.fixture
+def call_test_metrics():
+    return MetricsRegistry(enabled=True, buckets=(0.1, 1.0))
+
+
+@pytest.fixture
+def call_test_global_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def test_metrics_disabled():
+    registry = MetricsRegistry()
+    registry.inc('ingest_rows_total', 10, table='vacancies')
+    registry.observe('db_query_seconds', 0.5, method='get_avg_salary')
+    with registry.timer('db_query_seconds', method='get_avg_salary'):
+        pass
+
+    assert registry.get_counter('ingest_rows_total', table='vacancies') == 0
+    assert registry.get_histogram('db_query_seconds', method='get_avg_salary') is None
+    assert registry.to_prometheus() == ''
+
+
+def test_metrics_counter(call_test_metrics):
+    call_test_metrics.inc('ingest_rows_total', 10, table='vacancies')
+    call_test_metrics.inc('ingest_rows_total', 5, table='vacancies')
+    call_test_metrics.inc('ingest_rows_total', table='employers')
+
+    assert call_test_metrics.get_counter('ingest_rows_total', table='vacancies') == 15
+    assert call_test_metrics.get_counter('ingest_rows_total', table='employers') == 1
+
+
+def test_metrics_histogram(call_test_metrics):
+    for value in (0.05, 0.1, 0.5, 2.0):
+        call_test_metrics.observe('db_query_seconds', value, method='get_avg_salary')
+
+    assert call_test_metrics.get_histogram('db_query_seconds', method='get_avg_salary') == \
+        {'buckets': {'0.1': 2, '1.0': 1, '+Inf': 1}, 'sum': 2.65, 'count': 4}
+
+
+def test_metrics_timed(call_test_metrics):
+    @call_test_metrics.timed('ingest_seconds')
+    def save():
+        return 42
+
+    assert save() == 42
+    assert save.__name__ == 'save'
+    assert call_test_metrics.get_histogram('ingest_seconds', function='save')['count'] == 1
+
+
+def test_metrics_to_prometheus(call_test_metrics):
+    call_test_metrics.inc('http_requests_total', endpoint='/vacancies', status='200')
+    call_test_metrics.observe('http_request_seconds', 0.5, endpoint='/vacancies')
+
+    assert call_test_metrics.to_prometheus().splitlines() == [
+        '# HELP http_requests_total Количество HTTP-запросов к веб-порталу по адресам API и кодам ответа.',
+        '# TYPE http_requests_total counter',
+        'http_requests_total{endpoint="/vacancies",status="200"} 1',
+        '# HELP http_request_seconds Длительность HTTP-запросов к веб-порталу по адресам API.',
+        '# TYPE http_request_seconds histogram',
+        'http_request_seconds_bucket{endpoint="/vacancies",le="0.1"} 0',
+        'http_request_seconds_bucket{endpoint="/vacancies",le="1.0"} 1',
+        'http_request_seconds_bucket{endpoint="/vacancies",le="+Inf"} 1',
+        'http_request_seconds_sum{endpoint="/vacancies"} 0.5',
+        'http_request_seconds_count{endpoint="/vacancies"} 1',
+    ]
+
+
+def test_metrics_to_json(call_test_metrics):
+    call_test_metrics.inc('ingest_rows_total', 3, table='vacancies')
+    assert json.loads(call_test_metrics.to_json()) == {
+        'counters': [{'name': 'ingest_rows_total', 'labels': {'table': 'vacancies'}, 'value': 3}],
+        'histograms': []}
+
+
+def test_endpoint_name():
+    assert endpoint_name('https://api.hh.ru/employers/1122462') == '/employers/:id'
+    assert endpoint_name('https://api.hh.ru/vacancies?employer_id=80') == '/vacancies'
+
+
+def test_metrics_http_client(call_test_global_metrics):
+    with HHStubServer() as server, HTTPClient() as client:
+        client.get_json(server.url + '/employers/80')
+        client.get_json(server.url + '/employers/81')
+
+        with pytest.raises(Exception):
+            client.get_json(server.url + '/employers/0')
+
+    assert call_test_global_metrics.get_counter('http_requests_total', endpoint='/employers/:id', status='200') == 2
+    assert call_test_global_metrics.get_counter('http_errors_total', endpoint='/employers/:id', status='404') == 1
+    assert call_test_global_metrics.get_counter('http_response_bytes_total', endpoint='/employers/:id') > 0
+    assert call_test_global_metrics.get_histogram('http_request_seconds', endpoint='/employers/:id')['count'] == 3
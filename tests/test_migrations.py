@@ -0,0 +1,215 @@
+from datetime import date
+import pytest
+import psycopg2
+from src import queries
+from uteils.func import read_config, create_database, create_tables
+from uteils.migrations import MIGRATIONS, apply_migrations, get_schema_version
+
+
+@pytest.fixture
+def call_test_connection():
+    params = read_config("database.ini")
+    create_database('test_db', params)
+    create_tables('test_db', params)
+
+    connection = psycopg2.connect(dbname='test_db', **params)
+    yield connection
+    connection.close()
+
+
+def explain(connection, text_request: str, query_params: tuple = None) -> str:
+    """
+    Получить план выполнения запроса. Последовательное сканирование отключается,
+    чтобы на небольшой тестовой таблице планировщик выбирал индекс, если он подходит для запроса.
+    План сканирует индексы разделов, поэтому к плану дописываются имена индексов секционированных таблиц.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {text_request}", query_params)
+        plan = '\n'.join(row[0] for row in cursor.fetchall())
+
+        cursor.execute("""
+            SELECT
+                pg_index.indexrelid::regclass::text AS index_name,
+                pg_partition_root(pg_index.indexrelid)::regclass::text AS root_index_name
+            FROM
+                pg_index
+            WHERE
+                pg_partition_root(pg_index.indexrelid) <> pg_index.indexrelid
+        """)
+        plan += ''.join(f'\n{root_index_name}' for index_name, root_index_name in cursor.fetchall()
+                        if index_name in plan)
+
+    connection.rollback()
+    return plan
+
+
+def test_migrations_versions():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(versions)
+    assert len(versions) == len(set(versions))
+
+
+def test_migrations_applied(call_test_connection):
+    assert get_schema_version(call_test_connection) == MIGRATIONS[-1][0]
+    assert apply_migrations(call_test_connection) == []
+
+
+def test_migrations_column_types(call_test_connection):
+    with call_test_connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                table_name,
+                column_name,
+                data_type
+            FROM
+                information_schema.columns
+            WHERE
+                table_schema = 'public'
+                AND table_name IN ('employers', 'vacancies')
+                AND column_name IN ('name', 'site_url', 'alternate_url')
+            ORDER BY
+                table_name,
+                column_name
+        """)
+
+        assert cursor.fetchall() == [('employers', 'name', 'text'),
+                                     ('employers', 'site_url', 'text'),
+                                     ('vacancies', 'alternate_url', 'text'),
+                                     ('vacancies', 'name', 'text')]
+
+
+def higher_salary_page(after_key: bool = False, **filters) -> tuple:
+    text_conditions, filter_params = queries.vacancy_filters(**filters)
+    # следующие страницы получают среднюю зарплату из курсора и не вычисляют её заново.
+    query_params = (30000, *filter_params, 1000, 51) if after_key else (*filter_params, *filter_params, 51)
+    return queries.vacancies_with_higher_salary_page_request(after_key, text_conditions), query_params
+
+
+# запросы выборок DBManager (src.queries) с параметрами и индекс, который должен использовать их план.
+@pytest.mark.parametrize('text_request, query_params, index_name', [
+    (*higher_salary_page(employer_id='123'), 'ix_vacancies_employer_id'),
+    (*higher_salary_page(date_from=date(2023, 1, 1)), 'ix_vacancies_published_at'),
+    (*higher_salary_page(True, employer_id='123'), 'ix_vacancies_employer_id'),
+    (queries.VACANCIES_WITH_KEYWORD_REQUEST, (queries.like_pattern('продавец'),), 'ix_vacancies_name_trgm'),
+    (queries.search_vacancies_request(1, True), ('продавец', 20, 0), 'ix_vacancies_search_vector'),
+    (queries.VACANCIES_WITH_HIGHER_SALARY_REQUEST, None, 'ix_mv_vacancy_salaries_avg_salary'),
+    (queries.all_vacancies_page_request(True), (1000, 51), 'pk_vacancies_id'),
+    (queries.avg_salary_page_request(True), (1000, 51), 'uq_mv_vacancy_salaries_vacancy_id'),
+    (queries.companies_and_vacancies_count_page_request(True), (1000, 51), 'uq_mv_employer_vacancies_employer_id'),
+])
+def test_migrations_explain_uses_index(call_test_connection, text_request, query_params, index_name):
+    if index_name == 'ix_vacancies_name_trgm':
+        with call_test_connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE pg_extension.extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                pytest.skip('Расширение pg_trgm не установлено на сервере.')
+
+    assert index_name in explain(call_test_connection, text_request, query_params)
+
+
+def test_migrations_explain_prepared_uses_index(call_test_connection):
+    # запрос с отборами DBManager подготавливает (PREPARE), поэтому план получаем для EXECUTE.
+    # границы дат без отбора (-infinity, infinity) планировщик оценивает по статистике, поэтому таблицы
+    # заполняются и анализируются.
+    with call_test_connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO employers (id_employer, name)
+                SELECT number::text, 'Работодатель ' || number FROM generate_series(1, 100) AS number
+        """)
+        cursor.execute("""
+            INSERT INTO vacancies (id_vacancy, employer_id, name, published_at, salary_from, salary_to)
+                SELECT
+                    number::text,
+                    (SELECT employers.id FROM employers WHERE employers.id_employer = (number % 100 + 1)::text),
+                    'Вакансия ' || number,
+                    DATE '2023-01-01' + number % 300,
+                    number,
+                    number
+                FROM
+                    generate_series(1, 20000) AS number
+        """)
+        cursor.execute("ANALYZE employers, vacancies")
+        cursor.execute(f"PREPARE vacancies_with_higher_salary (varchar, date, date) AS "
+                       f"{queries.VACANCIES_WITH_HIGHER_SALARY_FILTERED_REQUEST}")
+
+    plan = explain(call_test_connection, "EXECUTE vacancies_with_higher_salary (%s, %s, %s)", ('12', None, None))
+    assert 'ix_vacancies_employer_id' in plan
+
+
+def test_migrations_unique_indexes(call_test_connection):
+    # уникальные индексы - ключи ON CONFLICT при записи данных, а не индексы выборок.
+    with call_test_connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                pg_indexes.indexname
+            FROM
+                pg_indexes
+            WHERE
+                pg_indexes.tablename IN ('employers', 'vacancies')
+                AND pg_indexes.indexname IN ('uq_employers_id_employer', 'uq_vacancies_id_vacancy')
+            ORDER BY
+                pg_indexes.indexname
+        """)
+        assert cursor.fetchall() == [('uq_employers_id_employer',), ('uq_vacancies_id_vacancy',)]
+
+
+def test_migrations_partition_pruning(call_test_connection):
+    with call_test_connection.cursor() as cursor:
+        cursor.execute("SELECT create_vacancy_partition('2023-05-01'), create_vacancy_partition('2023-06-01')")
+        assert cursor.fetchone() == (True, True)
+        # повторное создание раздела не выполняется.
+        cursor.execute("SELECT create_vacancy_partition('2023-05-17')")
+        assert cursor.fetchone() == (False,)
+
+    text_request, query_params = higher_salary_page(date_from=date(2023, 5, 1), date_to=date(2023, 5, 31))
+    plan = explain(call_test_connection, text_request, query_params)
+    assert 'vacancies_p2023_05' in plan
+    assert 'vacancies_p2023_06' not in plan
+    assert 'vacancies_default' not in plan
+
+
+def test_migrations_vacancy_ids():
+    params = read_config("database.ini")
+    create_database('test_db', params)
+
+    connection = psycopg2.connect(dbname='test_db', **params)
+    assert apply_migrations(connection, target_version=6)[-1] == 6
+
+    # до появления таблицы идентификаторов вакансия с новой датой публикации могла быть внесена второй записью.
+    with connection.cursor() as cursor:
+        cursor.execute("INSERT INTO employers (id_employer, name) VALUES ('123', 'ООО \"Супер предприятие\"')")
+        cursor.execute("""
+            INSERT INTO vacancies (id_vacancy, employer_id, name, published_at)
+            VALUES ('400', 1, 'Продавец', '2023-05-18'), ('400', 1, 'Продавец', '2023-06-18'),
+                   ('401', 1, 'Кассир', '2023-05-18')
+        """)
+    connection.commit()
+
+    assert apply_migrations(connection) == [7]
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT vacancies.id_vacancy, vacancies.published_at FROM vacancies ORDER BY 1")
+        assert cursor.fetchall() == [('400', date(2023, 6, 18)), ('401', date(2023, 5, 18))]
+        cursor.execute("SELECT vacancy_ids.id_vacancy, vacancy_ids.published_at FROM vacancy_ids ORDER BY 1")
+        assert cursor.fetchall() == [('400', date(2023, 6, 18)), ('401', date(2023, 5, 18))]
+
+        # вакансия уже внесена с другой датой публикации: запись нарушает первичный ключ vacancy_ids.
+        with pytest.raises(psycopg2.errors.UniqueViolation):
+            cursor.execute("INSERT INTO vacancies (id_vacancy, employer_id, published_at) "
+                           "VALUES ('401', 1, '2023-07-18')")
+    connection.rollback()
+
+    with connection.cursor() as cursor:
+        # перенос вакансий из раздела по умолчанию в раздел месяца не изменяет идентификаторы.
+        cursor.execute("SELECT create_vacancy_partition('2023-05-01')")
+        cursor.execute("UPDATE vacancies SET published_at = '2023-07-01' WHERE vacancies.id_vacancy = '401'")
+        cursor.execute("DELETE FROM vacancies WHERE vacancies.id_vacancy = '400'")
+        cursor.execute("SELECT vacancy_ids.id_vacancy, vacancy_ids.published_at FROM vacancy_ids ORDER BY 1")
+        assert cursor.fetchall() == [('401', date(2023, 7, 1))]
+
+        cursor.execute("TRUNCATE TABLE vacancies")
+        cursor.execute("SELECT COUNT(*) FROM vacancy_ids")
+        assert cursor.fetchone() == (0,)
+    connection.rollback()
+    connection.close()
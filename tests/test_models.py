@@ -0,0 +1,62 @@
+import json
+import tracemalloc
+import pytest
+from src.models import Employer, Vacancy
+from tests.hh_stub import HHStubServer
+
+
+@pytest.fixture
+def call_test_vacancy_json():
+    return {'id': '404',
+            'name': 'Продавец',
+            'employer': {'id': '123', 'name': 'ООО "Супер предприятие"'},
+            'address': {'city': 'Москва', 'street': 'Тверская'},
+            'snippet': {'responsibility': 'Вставать каждый день по утрам и ходить на работу',
+                        'requirement': 'Желание работать'},
+            'published_at': '2023-05-18',
+            'alternate_url': 'https://hh.ru/vacancy/404',
+            'salary': {'from': 25000, 'to': None, 'currency': 'RUR', 'gross': False},
+            'archived': False}
+
+
+def test_employer_from_json():
+    employer = Employer.from_json(HHStubServer.make_employer('80'))
+    assert employer.id_employer == '80'
+    assert employer.as_tuple() == ('80', 'Работодатель 80', 10, 'https://employer80.ru/', True, False)
+    assert repr(employer) == "Employer('80', 'Работодатель 80')"
+    assert Employer.coerce(employer) is employer
+
+
+def test_vacancy_from_json(call_test_vacancy_json):
+    vacancy = Vacancy.from_json(call_test_vacancy_json)
+    assert vacancy.id_employer == '123'
+    assert vacancy.as_tuple() == ('404', 'Продавец', 'Вставать каждый день по утрам и ходить на работу', '2023-05-18',
+                                  'https://hh.ru/vacancy/404', 25000, 0, False)
+    assert Vacancy.coerce(vacancy) is vacancy
+
+    with pytest.raises(AttributeError):
+        vacancy.currency = 'RUR'
+
+
+def test_vacancy_normalize_salary():
+    assert Vacancy.normalize_salary(None) == (0, 0)
+    assert Vacancy.normalize_salary({'from': None, 'to': 100}) == (0, 100)
+    assert Vacancy.normalize_salary({'from': 50, 'to': 100}) == (50, 100)
+
+
+def test_vacancy_memory(call_test_vacancy_json):
+    content = json.dumps({'items': [call_test_vacancy_json] * 1000}).encode('utf-8')
+
+    tracemalloc.start()
+    items = json.loads(content)['items']
+    size_json = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+
+    tracemalloc.start()
+    records = [Vacancy.from_json(item) for item in json.loads(content)['items']]
+    size_records = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(records) == 1000
+    assert size_records * 3 < size_json
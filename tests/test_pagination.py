@@ -0,0 +1,30 @@
+import pytest
+from datetime import date
+from src.pagination import Page, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor((42,)), 1) == (42,)
+    assert decode_cursor(encode_cursor((0.0607927, 'вакансия')), 2) == (0.0607927, 'вакансия')
+    assert decode_cursor(encode_cursor((date(2023, 5, 18), 7)), 2) == ('2023-05-18', 7)
+
+
+def test_cursor_url_safe():
+    cursor = encode_cursor((123456789, '???>>>'))
+    assert cursor.replace('-', '').replace('_', '').isalnum()
+
+
+@pytest.mark.parametrize('cursor, key_size', [('zzz', 1), (encode_cursor((1, 2)), 1), ('', 1)])
+def test_cursor_invalid(cursor, key_size):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, key_size)
+
+
+def test_page():
+    page = Page([('Продавец',), ('Кассир',)], 'WzJd')
+    assert len(page) == 2
+    assert list(page) == [('Продавец',), ('Кассир',)]
+    assert page.has_next
+    assert repr(page) == "Page(2, 'WzJd')"
+
+    assert not Page([], None).has_next
@@ -0,0 +1,140 @@
+import time
+from functools import partial
+import psycopg2
+import pytest
+from src.pipeline import FetchLoadPipeline
+from tests.hh_stub import HHStubServer
+from uteils.func import read_config, create_database, create_tables, sync_data_to_database
+
+
+@pytest.fixture
+def call_test_stub_server():
+    with HHStubServer(vacancies_per_employer=10, latency=0.02) as server:
+        yield server
+
+
+def collect_writer(results):
+    return [(result_list_employer[0].id_employer, len(result_list_vacancy))
+            for result_list_employer, result_list_vacancy in results]
+
+
+def test_pipeline_init_err():
+    with pytest.raises(ValueError):
+        FetchLoadPipeline(collect_writer, fetch_workers=0)
+
+
+def test_pipeline_run(call_test_stub_server):
+    pipeline = FetchLoadPipeline(collect_writer, fetch_workers=3, number_records=4, url_base=call_test_stub_server.url)
+
+    written = pipeline.run([str(employer_id) for employer_id in range(1, 8)])
+
+    assert sorted(written) == [(str(employer_id), 10) for employer_id in range(1, 8)]
+    assert pipeline.stats.employers == 7
+    assert pipeline.stats.vacancies == 70
+    assert not pipeline.stopped
+
+
+def test_pipeline_order():
+    employer_ids = ['5', '1', '4', '2', '3', '7', '6']
+
+    # первые по порядку работодатели отвечают дольше остальных.
+    with HHStubServer(vacancies_per_employer=3, employer_latency={'5': 0.3, '1': 0.2}) as server:
+        pipeline = FetchLoadPipeline(collect_writer, fetch_workers=4, queue_size=2, url_base=server.url)
+        written = pipeline.run(employer_ids)
+
+    assert [employer_id for employer_id, _ in written] == employer_ids
+
+
+def test_pipeline_order_skips_missing(call_test_stub_server):
+    pipeline = FetchLoadPipeline(collect_writer, fetch_workers=2, url_base=call_test_stub_server.url)
+
+    # работодатель '0' не найден и не передаётся на запись, порядок остальных сохраняется.
+    written = pipeline.run(['3', '0', '1', '2'])
+
+    assert written == [('3', 10), ('1', 10), ('2', 10)]
+    assert pipeline.stats.employers == 3
+
+
+def test_pipeline_throughput(call_test_stub_server):
+    pipeline = FetchLoadPipeline(collect_writer, fetch_workers=3, url_base=call_test_stub_server.url)
+    pipeline.run([str(employer_id) for employer_id in range(1, 7)])
+
+    assert pipeline.stats.employers_per_second == pytest.approx(6 / pipeline.stats.elapsed)
+    assert pipeline.stats.vacancies_per_second == pytest.approx(60 / pipeline.stats.elapsed)
+    assert 'работодателей/с' in str(pipeline.stats)
+    assert 'вакансий/с' in str(pipeline.stats)
+
+
+def test_pipeline_overlap(call_test_stub_server):
+    def slow_writer(results):
+        for _ in results:
+            time.sleep(0.1)
+
+    pipeline = FetchLoadPipeline(slow_writer, fetch_workers=1, number_records=10, url_base=call_test_stub_server.url)
+    pipeline.run([str(employer_id) for employer_id in range(1, 9)])
+
+    # стадии работают одновременно: общее время меньше суммы времени стадий.
+    assert pipeline.stats.elapsed < 0.85 * (pipeline.stats.fetch_time + pipeline.stats.write_time)
+
+
+def test_pipeline_backpressure(call_test_stub_server):
+    def slow_writer(results):
+        for _ in results:
+            time.sleep(0.05)
+
+    pipeline = FetchLoadPipeline(slow_writer, fetch_workers=4, queue_size=1, url_base=call_test_stub_server.url)
+    pipeline.run([str(employer_id) for employer_id in range(1, 13)])
+
+    assert pipeline.stats.employers == 12
+    assert pipeline.stats.fetch_blocked > 0
+
+
+def test_pipeline_writer_stops_early(call_test_stub_server):
+    def failing_writer(results):
+        for _ in results:
+            return 'stopped'
+
+    pipeline = FetchLoadPipeline(failing_writer, fetch_workers=2, queue_size=1, url_base=call_test_stub_server.url)
+
+    assert pipeline.run([str(employer_id) for employer_id in range(1, 20)]) == 'stopped'
+    assert pipeline.stopped
+    assert call_test_stub_server.request_count < 19 * 2
+
+
+def test_pipeline_vacancy_batches(call_test_stub_server):
+    def skip_empty_writer(results):
+        return collect_writer((employers, vacancies) for employers, vacancies in results if employers)
+
+    pipeline = FetchLoadPipeline(skip_empty_writer, fetch_workers=2, number_records=100, vacancy_batch_size=4,
+                                 url_base=call_test_stub_server.url)
+
+    written = pipeline.run([str(employer_id) for employer_id in range(1, 9)] + ['0'])
+
+    assert sorted(written) == [(str(employer_id), 10) for employer_id in range(1, 9)]
+    # 9 запросов данных о работодателях и по одному запросу вакансий на каждую из двух групп,
+    # в группе из одного несуществующего работодателя запрос вакансий не выполняется.
+    assert call_test_stub_server.request_count == 11
+
+
+def test_pipeline_sync_page_error(call_test_stub_server):
+    params = read_config("database.ini")
+    create_database('test_db', params)
+    create_tables('test_db', params)
+
+    writer = partial(sync_data_to_database, database_name='test_db', params=params)
+    pipeline = FetchLoadPipeline(writer, fetch_workers=1, number_records=4, vacancy_batch_size=2,
+                                 url_base=call_test_stub_server.url)
+
+    assert pipeline.run(['1', '2'])['inserted'] == 20
+
+    # вторая страница общего запроса не получена: вакансии группы не синхронизируются и не архивируются.
+    call_test_stub_server.failing_pages = {1}
+    assert pipeline.run(['1', '2']) == {'inserted': 0, 'updated': 0, 'unchanged': 0, 'archived': 0}
+
+    connection = psycopg2.connect(dbname='test_db', **params)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM vacancies WHERE vacancies.archived")
+        assert cursor.fetchone() == (0,)
+
+    connection.close()
@@ -0,0 +1,84 @@
+import time
+import pytest
+from src.query_cache import QueryCache, bump_data_version, get_data_version
+
+
+@pytest.fixture
+def call_test_query_cache():
+    return QueryCache(max_entries=2)
+
+
+def test_query_cache_init_err():
+    with pytest.raises(ValueError):
+        QueryCache(max_entries=0)
+
+
+def test_query_cache_repr(call_test_query_cache):
+    assert repr(call_test_query_cache) == "QueryCache(2, None, 10000)"
+
+
+def test_query_cache_get_put(call_test_query_cache):
+    assert call_test_query_cache.get(('get_avg_salary',)) == (False, None)
+
+    call_test_query_cache.put(('get_avg_salary',), [])
+    assert call_test_query_cache.get(('get_avg_salary',)) == (True, [])
+    assert call_test_query_cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0, 'invalidations': 0, 'entries': 1}
+
+
+def test_query_cache_lru(call_test_query_cache):
+    call_test_query_cache.put('a', [1])
+    call_test_query_cache.put('b', [2])
+
+    # использование выборки 'a' продлевает её нахождение в кэше, вытесняется 'b'.
+    call_test_query_cache.get('a')
+    call_test_query_cache.put('c', [3])
+
+    assert call_test_query_cache.get('a') == (True, [1])
+    assert call_test_query_cache.get('b') == (False, None)
+    assert call_test_query_cache.stats['evictions'] == 1
+
+
+def test_query_cache_ttl():
+    query_cache = QueryCache(ttl=0.05)
+    query_cache.put('a', [1])
+    assert query_cache.get('a') == (True, [1])
+
+    time.sleep(0.06)
+    assert query_cache.get('a') == (False, None)
+    assert len(query_cache) == 0
+
+
+def test_query_cache_max_rows():
+    query_cache = QueryCache(max_rows=2)
+    assert not query_cache.put('a', [1, 2, 3])
+    assert query_cache.get('a') == (False, None)
+
+
+def test_query_cache_validate(call_test_query_cache):
+    assert not call_test_query_cache.validate((0, 1))
+    call_test_query_cache.put('a', [1])
+
+    assert call_test_query_cache.validate((0, 1))
+    assert call_test_query_cache.get('a') == (True, [1])
+
+    assert not call_test_query_cache.validate((1, 1))
+    assert call_test_query_cache.get('a') == (False, None)
+    assert call_test_query_cache.stats['invalidations'] == 1
+
+
+def test_query_cache_put_version(call_test_query_cache):
+    call_test_query_cache.validate((0, 1))
+    # выборка, полученная до смены версии данных, под новой версией не сохраняется.
+    call_test_query_cache.validate((1, 1))
+    assert not call_test_query_cache.put('a', [1], (0, 1))
+    assert call_test_query_cache.get('a') == (False, None)
+
+    assert call_test_query_cache.put('a', [1], (1, 1))
+    assert call_test_query_cache.get('a') == (True, [1])
+
+
+def test_data_version():
+    version = get_data_version('test_query_cache_db')
+    assert bump_data_version('test_query_cache_db') == version + 1
+    assert get_data_version('test_query_cache_db') == version + 1
+    assert get_data_version('test_query_cache_other_db') == 0
@@ -0,0 +1,132 @@
+import pytest
+from uteils.func import read_config
+
+np = pytest.importorskip('numpy')
+
+from src.salary_analytics import SalaryAnalytics
+
+
+@pytest.fixture
+def call_test_salary_analytics():
+    # работодатель 1 - зарплаты с выбросом, 2 - без указанной зарплаты, 3 - с одной границей вилки.
+    return SalaryAnalytics(vacancy_ids=[1, 2, 3, 4, 5, 6, 7, 8],
+                           employer_ids=[1, 3, 1, 2, 1, 1, 3, 1],
+                           salary_from=[10000, 0, 20000, 0, 30000, 40000, 50000, 1000000],
+                           salary_to=[20000, 60000, 30000, 0, 40000, 50000, 0, 1000000],
+                           employer_names={1: 'Первый', 2: 'Второй', 3: 'Третий'})
+
+
+def test_salary_analytics_init_err():
+    with pytest.raises(ValueError):
+        SalaryAnalytics([1, 2], [1], [0, 0], [0, 0])
+
+
+def test_salary_analytics_repr(call_test_salary_analytics):
+    assert repr(call_test_salary_analytics) == "SalaryAnalytics(8, 3)"
+    assert len(call_test_salary_analytics) == 8
+
+
+def test_salary_analytics_values(call_test_salary_analytics):
+    midpoint = call_test_salary_analytics.values()
+    # нулевая граница вилки не участвует в вычислении середины.
+    assert midpoint[1] == 60000
+    assert midpoint[6] == 50000
+    assert np.isnan(midpoint[3])
+    assert midpoint[0] == 15000
+
+    with pytest.raises(ValueError):
+        midpoint[0] = 1
+
+    with pytest.raises(ValueError):
+        call_test_salary_analytics.values('avg')
+
+
+def test_salary_analytics_counts_means(call_test_salary_analytics):
+    assert call_test_salary_analytics.employer_ids.tolist() == [1, 2, 3]
+    assert call_test_salary_analytics.employer_names == ['Первый', 'Второй', 'Третий']
+    assert call_test_salary_analytics.counts().tolist() == [5, 0, 2]
+    assert call_test_salary_analytics.counts('to').tolist() == [5, 0, 1]
+
+    means = call_test_salary_analytics.means()
+    assert means[0] == pytest.approx((15000 + 25000 + 35000 + 45000 + 1000000) / 5)
+    assert np.isnan(means[1])
+    assert means[2] == 55000
+
+
+def test_salary_analytics_trimmed_means(call_test_salary_analytics):
+    trimmed = call_test_salary_analytics.trimmed_means(0.2)
+    # из пяти значений с каждой стороны отбрасывается одно, выброс не влияет на среднюю.
+    assert trimmed[0] == 35000
+    assert np.isnan(trimmed[1])
+    assert trimmed[2] == 55000
+
+    with pytest.raises(ValueError):
+        call_test_salary_analytics.trimmed_means(0.5)
+
+
+@pytest.mark.parametrize('kind', ['midpoint', 'from', 'to'])
+def test_salary_analytics_percentiles(call_test_salary_analytics, kind):
+    q = [0, 10, 25, 50, 90, 100]
+    answer = call_test_salary_analytics.percentiles(q, kind)
+    values = call_test_salary_analytics.values(kind)
+    employers = np.array([1, 3, 1, 2, 1, 1, 3, 1])
+
+    assert answer.shape == (3, len(q))
+    for index, employer_id in enumerate(call_test_salary_analytics.employer_ids):
+        employer_values = values[employers == employer_id]
+        employer_values = employer_values[~np.isnan(employer_values)]
+        if len(employer_values):
+            assert answer[index] == pytest.approx(np.percentile(employer_values, q))
+        else:
+            assert np.isnan(answer[index]).all()
+
+    assert call_test_salary_analytics.medians()[0] == 35000
+
+    with pytest.raises(ValueError):
+        call_test_salary_analytics.percentiles(101)
+
+
+def test_salary_analytics_histograms(call_test_salary_analytics):
+    counts, edges = call_test_salary_analytics.histogram(bins=4, salary_range=(0, 100000))
+    assert edges.tolist() == [0, 25000, 50000, 75000, 100000]
+    assert counts.tolist() == [1, 3, 2, 0]
+
+    per_employer, per_employer_edges = call_test_salary_analytics.histograms(bins=4, salary_range=(0, 100000))
+    assert per_employer_edges.tolist() == edges.tolist()
+    assert per_employer.tolist() == [[1, 3, 0, 0], [0, 0, 0, 0], [0, 0, 2, 0]]
+    assert per_employer.sum(axis=0).tolist() == counts.tolist()
+
+    per_employer, _ = call_test_salary_analytics.histograms(bins=3)
+    assert per_employer.sum() == 7
+
+
+def test_salary_analytics_above(call_test_salary_analytics):
+    mask = call_test_salary_analytics.above(50000)
+    assert call_test_salary_analytics.vacancy_ids[mask].tolist() == [2, 7, 8]
+
+    # по умолчанию порог - средняя зарплата по вакансиям с указанной зарплатой.
+    mask = call_test_salary_analytics.above()
+    assert call_test_salary_analytics.vacancy_ids[mask].tolist() == [8]
+
+
+def test_salary_analytics_employer_report(call_test_salary_analytics):
+    report = call_test_salary_analytics.employer_report(q=(50,), proportion=0.2)
+    assert report[0] == ('Первый', 5, 224000.0, 35000.0, 35000.0)
+    assert report[1] == ('Второй', 0, None, None, None)
+    assert report[2] == ('Третий', 2, 55000.0, 55000.0, 55000.0)
+
+
+def test_salary_analytics_empty():
+    salary_analytics = SalaryAnalytics([], [], [], [])
+    assert len(salary_analytics) == 0
+    assert salary_analytics.percentiles([50]).shape == (0, 1)
+    assert salary_analytics.above().tolist() == []
+    assert salary_analytics.employer_report() == []
+
+
+def test_salary_analytics_load(call_test_db):
+    salary_analytics = SalaryAnalytics.load('test_db', read_config("database.ini"))
+    assert len(salary_analytics) == 2
+    assert salary_analytics.employer_names == ['ООО "Супер предприятие"']
+    assert sorted(salary_analytics.values().tolist()) == [27500, 37500]
+    assert salary_analytics.employer_report(q=(50,)) == [('ООО "Супер предприятие"', 2, 32500.0, 32500.0, 32500.0)]
@@ -0,0 +1,71 @@
+import json
+from datetime import date
+import pytest
+from uteils.func import read_config
+
+np = pytest.importorskip('numpy')
+
+from src.snapshot import Snapshot, TextColumn, export_snapshot
+
+
+@pytest.fixture
+def call_test_text_column():
+    values = ['Продавец', None, '', 'Продавец-консультант', 'кассир']
+    encoded = [(value or '').encode('utf-8') for value in values]
+    offsets = np.concatenate(([0], np.cumsum([len(value) for value in encoded])))
+    return TextColumn(offsets, np.array([value is not None for value in values]), b''.join(encoded))
+
+
+def test_text_column(call_test_text_column):
+    assert len(call_test_text_column) == 5
+    assert repr(call_test_text_column) == "TextColumn(5)"
+    assert call_test_text_column[0] == 'Продавец'
+    assert call_test_text_column[1] is None
+    assert call_test_text_column[2] == ''
+    assert call_test_text_column[-1] == 'кассир'
+    assert call_test_text_column[3:] == ['Продавец-консультант', 'кассир']
+    assert call_test_text_column.take(np.array([True, False, False, False, True])) == ['Продавец', 'кассир']
+
+
+def test_text_column_find(call_test_text_column):
+    assert call_test_text_column.find('Продавец').tolist() == [0, 3]
+    assert call_test_text_column.find('консультант').tolist() == [3]
+    # строки не продолжают друг друга: слово на стыке строк не находится.
+    assert call_test_text_column.find('ПродавецПродавец').tolist() == []
+    assert call_test_text_column.find('').tolist() == [0, 2, 3, 4]
+
+
+def test_snapshot_format_err(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Snapshot(str(tmp_path))
+
+    with open(tmp_path / 'manifest.json', 'w', encoding='utf-8') as file:
+        json.dump({'format': 0, 'tables': {}}, file)
+
+    with pytest.raises(ValueError):
+        Snapshot(str(tmp_path))
+
+
+def test_export_snapshot(call_test_db, tmp_path):
+    path = str(tmp_path / 'snapshot')
+    manifest = export_snapshot('test_db', read_config("database.ini"), path, batch_size=1)
+
+    assert manifest['tables']['employers']['rows'] == 1
+    assert manifest['tables']['vacancies']['rows'] == 2
+
+    snapshot = Snapshot(path)
+    assert len(snapshot) == 2
+    assert list(snapshot.column('id_vacancy')) == ['404', '405']
+    assert list(snapshot.column('name')) == ['Продавец', 'Продавец-консультант']
+    assert snapshot.column('salary_from').tolist() == [25000, 35000]
+    assert snapshot.column('published_at').astype(date).tolist() == [date(2023, 5, 18), date(2023, 6, 18)]
+    assert snapshot.column('employer').tolist() == [0, 0]
+    assert snapshot.employer_values('name', [0, 1]) == ['ООО "Супер предприятие"'] * 2
+    assert snapshot.employer_column('id').tolist() == snapshot.column('id', 'employers').tolist() * 2
+    assert snapshot.column('name').find('консультант').tolist() == [1]
+
+    with pytest.raises(KeyError):
+        snapshot.column('search_vector')
+
+    assert snapshot.salary_analytics().employer_report(q=(50,)) == [
+        ('ООО "Супер предприятие"', 2, 32500.0, 32500.0, 32500.0)]
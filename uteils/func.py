@@ -1,5 +1,14 @@
+import re
 from configparser import ConfigParser
+from datetime import date
+from hashlib import md5
 import psycopg2
+from psycopg2.extras import execute_values
+
+from src.metrics import metrics
+from src.models import Employer, Vacancy
+from src.query_cache import bump_data_version
+from uteils.migrations import MATERIALIZED_VIEWS, PARTITION_MONTHS_AHEAD, PARTITION_MONTHS_BACK, apply_migrations
 
 
 def read_config(filename: str = "database.ini", section: str = "postgresql") -> dict:
@@ -25,11 +34,12 @@ def read_config(filename: str = "database.ini", section: str = "postgresql") ->
     return return_dict
 
 
-def create_database(database_name: str, params: dict) -> None:
+def create_database(database_name: str, params: dict, recreate: bool = True) -> None:
     """
     Первоначальное создание базы данных и таблиц для заполнения информации вакансиями.
     :param database_name: Имя базы данных, которая будет создана.
     :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param recreate: Удалить базу данных, если она уже существует. Иначе существующая база данных сохраняется.
     :return:
     """
 
@@ -42,8 +52,14 @@ def create_database(database_name: str, params: dict) -> None:
     try:
         # инициализация курсора для написания запросов в СУБД.
         with connection.cursor() as cursor:
-            # перед созданием новой базы данных удаляем базу данных если она уже существует.
-            cursor.execute(f"DROP DATABASE IF EXISTS {database_name}")
+            if recreate:
+                # перед созданием новой базы данных удаляем базу данных если она уже существует.
+                cursor.execute(f"DROP DATABASE IF EXISTS {database_name}")
+            else:
+                # существующую базу данных оставляем без изменений.
+                cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (database_name,))
+                if cursor.fetchone() is not None:
+                    return
 
             # создаём новую базу данных.
             cursor.execute(f"CREATE DATABASE {database_name}")
@@ -56,11 +72,13 @@ def create_database(database_name: str, params: dict) -> None:
             connection.close()
 
 
-def create_tables(database_name: str, params: dict) -> None:
+def create_tables(database_name: str, params: dict, recreate: bool = True) -> None:
     """
     Первоначальное создание-инициализация таблиц, полей, связей базы данных.
+    Схема базы данных создаётся и обновляется версионированными миграциями из uteils.migrations.
     :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
     :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param recreate: Удалить таблицы, если они уже существуют. Иначе существующие таблицы и данные сохраняются.
     :return:
     """
 
@@ -71,72 +89,270 @@ def create_tables(database_name: str, params: dict) -> None:
     try:
         # инициализация курсора для написания запросов в СУБД.
         with connection.cursor() as cursor:
-            # перед созданием новых таблиц удаляем таблицы, если они уже существует.
-            cursor.execute("""
-                DROP TABLE IF EXISTS vacancies;
-                DROP TABLE IF EXISTS employers;
-            """)
-            connection.commit()
+            if recreate:
+                # перед созданием новых таблиц удаляем таблицы, если они уже существует.
+                # зависящие от таблиц материализованные представления удаляются вместе с ними.
+                cursor.execute("""
+                    DROP TABLE IF EXISTS vacancies CASCADE;
+                    DROP TABLE IF EXISTS vacancy_ids;
+                    DROP TABLE IF EXISTS employers CASCADE;
+                    DROP TABLE IF EXISTS data_version;
+                    DROP TABLE IF EXISTS schema_migrations;
+                """)
+                connection.commit()
+
+        # создаём таблицы, поля, связи и индексы, применяя ещё не применённые миграции схемы.
+        apply_migrations(connection)
+
+        # создаём разделы таблицы "Вакансии" для текущего и ближайших месяцев.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ensure_vacancy_partitions(%s, %s)", (PARTITION_MONTHS_BACK, PARTITION_MONTHS_AHEAD))
+        connection.commit()
+
+    except(Exception, psycopg2.DatabaseError) as error:
+        print(error)
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+
+@metrics.timed('ingest_seconds')
+def refresh_materialized_views(database_name: str, params: dict, concurrently: bool = True) -> None:
+    """
+    Функция обновляет материализованные представления для отчётов после изменения данных.
+    Обновление без блокировки (CONCURRENTLY) не мешает одновременному чтению представлений.
+    :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param concurrently: Обновлять представления без блокировки чтения.
+    :return:
+    """
+
+    # первоначальное подключение к системе управления базами данных.
+    connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='ingest')
+
+    # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+    try:
+        # инициализация курсора для написания запросов в СУБД.
+        with connection.cursor() as cursor:
+            for view_name in MATERIALIZED_VIEWS:
+                cursor.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{view_name}")
+                # каждое представление обновляется в своей транзакции, чтобы не удерживать блокировки всех сразу.
+                connection.commit()
+
+    except(Exception, psycopg2.DatabaseError) as error:
+        print(error)
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+        # выборки из представлений, сохранённые в кэшах DBManager до обновления, устарели.
+        bump_data_version(database_name)
+
+
+def create_vacancy_partitions(database_name: str, params: dict, months_back: int = PARTITION_MONTHS_BACK,
+                              months_ahead: int = PARTITION_MONTHS_AHEAD) -> int:
+    """
+    Функция создаёт разделы таблицы "Вакансии" для месяцев от months_back месяцев назад до months_ahead
+    месяцев вперёд, а также для месяцев вакансий, попавших в раздел по умолчанию, если разделов ещё нет.
+    Создание раздела блокирует таблицу "Вакансии", поэтому выполняется в отдельной короткой транзакции,
+    а не при записи данных: записанные вакансии месяца без раздела временно хранятся в разделе по умолчанию.
+    :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param months_back: Количество прошедших месяцев.
+    :param months_ahead: Количество будущих месяцев.
+    :return: Количество созданных разделов.
+    """
+    created = 0
+
+    # первоначальное подключение к системе управления базами данных.
+    connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='partitions')
+
+    # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+    try:
+        # инициализация курсора для написания запросов в СУБД.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ensure_vacancy_partitions(%s, %s)", (months_back, months_ahead))
+            created = cursor.fetchone()[0]
 
-            # создаём таблицу "Работодатель" и соответствующие поля.
+            # вакансии раздела по умолчанию переносятся в разделы своих месяцев, кроме вакансий без даты.
             cursor.execute("""
-                CREATE TABLE employers (
-                    id serial,
-                    id_employer varchar(25),
-                    name varchar(100),
-                    open_vacancies integer,
-                    site_url varchar(100),
-                    trusted boolean,
-                    accredited_it_employer boolean,
-                    
-                    CONSTRAINT pk_employer_id PRIMARY KEY (id)                    
-                );
+                SELECT
+                    COUNT(*) FILTER (WHERE create_vacancy_partition(months.partition_month))
+                FROM
+                    (
+                        SELECT DISTINCT
+                            date_trunc('month', vacancies_default.published_at)::date AS partition_month
+                        FROM
+                            vacancies_default
+                        WHERE
+                            vacancies_default.published_at > '-infinity'
+                    ) AS months
             """)
+            created += cursor.fetchone()[0]
+
+        connection.commit()
+
+    except(Exception, psycopg2.DatabaseError) as error:
+        print(error)
+        created = 0
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+    return created
+
+
+def drop_old_vacancy_partitions(database_name: str, params: dict, keep_months: int = 12, detach: bool = False,
+                                refresh_views: bool = True) -> list:
+    """
+    Функция удаляет вакансии, опубликованные раньше keep_months месяцев назад: разделы таблицы "Вакансии"
+    за прошедшие месяцы удаляются целиком, без построчного удаления и разрастания таблицы.
+    Отсоединённый раздел (detach=True) сохраняется отдельной таблицей vacancies_archive_ГГГГ_ММ.
+    :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param keep_months: Количество хранимых прошедших месяцев, не считая текущего.
+    :param detach: Отсоединить разделы вместо удаления.
+    :param refresh_views: Обновить материализованные представления для отчётов после удаления.
+    :return: Список имён удалённых или отсоединённых разделов.
+    """
+    if keep_months < 0:
+        raise ValueError('Количество хранимых месяцев не может быть отрицательным.')
+
+    removed = []
+    committed = False
+
+    # первоначальное подключение к системе управления базами данных.
+    connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='partitions')
+
+    # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+    try:
+        # инициализация курсора для написания запросов в СУБД.
+        with connection.cursor() as cursor:
+            # вакансии, опубликованные раньше начала этого месяца, удаляются.
+            cursor.execute("SELECT (date_trunc('month', CURRENT_DATE) - make_interval(months => %s))::date",
+                           (keep_months,))
+            keep_from = cursor.fetchone()[0]
 
-            # создаём таблицу "Вакансии" и соответствующие поля.
             cursor.execute("""
-                CREATE TABLE vacancies (
-                    id serial,
-                    id_vacancy varchar(25),
-                    employer_id integer,
-                    name varchar(100),
-                    description text,
-                    published_at date,
-                    alternate_url varchar(100),
-                    salary_from integer,
-                    salary_to integer,
-                    archived boolean,
-                    
-                    CONSTRAINT pk_vacancies_id PRIMARY KEY (id),
-                    CONSTRAINT fk_vacancies_employers FOREIGN KEY(employer_id) REFERENCES employers(id)
-                );
+                SELECT
+                    partitions.relname
+                FROM
+                    pg_inherits
+                        INNER JOIN pg_class AS partitions
+                            ON partitions.oid = pg_inherits.inhrelid
+                WHERE
+                    pg_inherits.inhparent = 'vacancies'::regclass
+                ORDER BY
+                    partitions.relname
             """)
+
+            for partition_name, in cursor.fetchall():
+                # месяц раздела определяется по его имени, раздел по умолчанию не удаляется.
+                month = re.fullmatch(r'vacancies_p(\d{4})_(\d{2})', partition_name)
+                if month is None or date(int(month[1]), int(month[2]), 1) >= keep_from:
+                    continue
+
+                if detach:
+                    cursor.execute(f"ALTER TABLE vacancies DETACH PARTITION {partition_name}")
+                    cursor.execute(f"ALTER TABLE {partition_name} "
+                                   f"RENAME TO vacancies_archive_{month[1]}_{month[2]}")
+                else:
+                    cursor.execute(f"DROP TABLE {partition_name}")
+                removed.append(partition_name)
+
+                # удаление и отсоединение раздела не вызывает триггеров: идентификаторы вакансий раздела
+                # удаляем явно, чтобы вакансия могла быть внесена снова.
+                cursor.execute("""
+                    DELETE FROM vacancy_ids
+                    WHERE
+                        vacancy_ids.published_at >= %s
+                        AND vacancy_ids.published_at < (%s::date + interval '1 month')
+                """, (date(int(month[1]), int(month[2]), 1),) * 2)
+
+            # старые вакансии, оказавшиеся в разделе по умолчанию, удаляются построчно. Старых разделов
+            # уже нет, поэтому запрос к таблице удаляет записи только раздела по умолчанию.
+            if not detach:
+                cursor.execute("DELETE FROM vacancies WHERE vacancies.published_at < %s", (keep_from,))
+
+            # удаление разделов и записей раздела не вызывает триггеров таблицы: версию данных увеличиваем явно.
+            cursor.execute("UPDATE data_version SET version = version + 1 WHERE data_version.id = 1")
+
             connection.commit()
+            committed = True
 
     except(Exception, psycopg2.DatabaseError) as error:
         print(error)
+        removed = []
 
     finally:
         if connection is not None:
             connection.close()
 
+    if committed:
+        # сбрасываем кэши выборок DBManager текущего процесса.
+        bump_data_version(database_name)
+        if refresh_views:
+            refresh_materialized_views(database_name, params)
+
+    return removed
+
+
+def make_employer_row(item) -> tuple:
+    """
+    Функция формирует запись для таблицы "Работодатель" из данных, полученных по API.
+    :param item: Словарь с данными по Работодателю или экземпляр класса Employer.
+    :return: Кортеж значений полей в порядке их перечисления в запросе.
+    """
+    return Employer.coerce(item).as_tuple()
 
+
+def make_vacancy_row(item, employer_id: int) -> tuple:
+    """
+    Функция формирует запись для таблицы "Вакансии" из данных, полученных по API.
+    Отсутствующие значения зарплаты заменяются нулём. Последним полем записи идёт хеш содержимого вакансии,
+    по которому при синхронизации определяется, изменилась ли вакансия.
+    :param item: Словарь с данными по Вакансии или экземпляр класса Vacancy.
+    :param employer_id: Идентификатор записи работодателя в базе данных.
+    :return: Кортеж значений полей в порядке их перечисления в запросе.
+    """
+    values = Vacancy.coerce(item).as_tuple()
+
+    # идентификатор записи работодателя в хеш не включаем: он зависит от порядка внесения данных.
+    content_hash = md5('\x1f'.join(str(value) for value in values).encode('utf-8')).hexdigest()
+    return values[:1] + (employer_id,) + values[1:] + (content_hash,)
+
+
+@metrics.timed('ingest_seconds')
 def save_data_to_database(result_list_employer,
                           result_list_vacancy,
                           database_name: str,
-                          params: dict) -> None:
+                          params: dict,
+                          refresh_views: bool = True,
+                          create_partitions: bool = True) -> None:
     """
     Функция производит внесение данных полученных из запроса API с сайта вакансий, представленных в виде словарей
     класса в СУБД (запись).
+    При записи данных по работодателям в цикле разделы и представления достаточно обновить один раз после цикла:
+    create_partitions=False и refresh_views=False, затем create_vacancy_partitions и refresh_materialized_views.
     :param result_list_employer: Словарь с данными по Работодателю.
     :param result_list_vacancy: Словарь с данными по Вакансиям.
     :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
     :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param refresh_views: Обновить материализованные представления для отчётов после записи.
+    :param create_partitions: Создать разделы для месяцев записанных вакансий после записи.
     :return:
     """
+    committed = False
 
     # первоначальное подключение к системе управления базами данных.
     connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='ingest')
 
     # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
     try:
@@ -155,19 +371,18 @@ def save_data_to_database(result_list_employer,
                 VALUES (%s, %s, %s, %s, %s, %s)
                 RETURNING id
                 """,
-                (result_list_employer[0]['id'],
-                 result_list_employer[0]['name'],
-                 result_list_employer[0]['open_vacancies'],
-                 result_list_employer[0]['site_url'],
-                 result_list_employer[0]['trusted'],
-                 result_list_employer[0]['accredited_it_employer'])
+                make_employer_row(result_list_employer[0])
             )
 
             # после запроса получаем идентификатор добавленной записи, чтобы организовать связь с таблицей Вакансии.
             employer_id = cursor.fetchone()[0]
 
+            vacancy_rows = _unique_vacancy_rows([make_vacancy_row(item, employer_id)
+                                                 for item in result_list_vacancy])
+            _delete_moved_vacancies(cursor, vacancy_rows, max(len(vacancy_rows), 1))
+
             # вносим запись в таблицу "Вакансии" обходя весь список с данными.
-            for item in result_list_vacancy:
+            for vacancy_row in vacancy_rows:
                 cursor.execute("""
                     INSERT INTO vacancies (
                         id_vacancy,
@@ -178,22 +393,19 @@ def save_data_to_database(result_list_employer,
                         alternate_url,
                         salary_from,
                         salary_to,
-                        archived
+                        archived,
+                        content_hash
                     )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (id_vacancy, published_at) DO NOTHING;
                     """,
-                    (item['id'],
-                     employer_id,
-                     item['name'],
-                     item['snippet']['responsibility'],
-                     item['published_at'],
-                     item['alternate_url'],
-                     item["salary"]['from'] if item["salary"] is not None and item["salary"]['from'] is not None else 0,
-                     item["salary"]['to'] if item["salary"] is not None and item["salary"]['to'] is not None else 0,
-                     item['archived'])
+                    vacancy_row
                 )
 
             connection.commit()
+            committed = True
+            metrics.inc('ingest_rows_total', table='employers')
+            metrics.inc('ingest_rows_total', len(result_list_vacancy), table='vacancies')
 
     except(Exception, psycopg2.DatabaseError) as error:
         print(error)
@@ -201,3 +413,408 @@ def save_data_to_database(result_list_employer,
     finally:
         if connection is not None:
             connection.close()
+
+    if committed:
+        # вакансии месяцев без раздела переносим из раздела по умолчанию в отдельной короткой транзакции.
+        if create_partitions:
+            create_vacancy_partitions(database_name, params)
+        # сбрасываем кэши выборок DBManager текущего процесса.
+        bump_data_version(database_name)
+        if refresh_views:
+            refresh_materialized_views(database_name, params)
+
+
+def _upsert_employers(cursor, employer_rows: list) -> dict:
+    """
+    Функция вносит пакет записей в таблицу "Работодатель" одним запросом.
+    Если работодатель уже есть в таблице, его данные обновляются.
+    :param cursor: Курсор открытого подключения к СУБД.
+    :param employer_rows: Список записей, сформированных make_employer_row.
+    :return: Словарь соответствия идентификатора работодателя на веб-портале идентификатору записи в базе данных.
+    """
+    if not employer_rows:
+        return {}
+
+    # повторяющиеся записи одного работодателя в пакете недопустимы для ON CONFLICT, оставляем последнюю.
+    employer_rows = list({row[0]: row for row in employer_rows}.values())
+
+    inserted = execute_values(cursor, """
+        INSERT INTO employers (
+            id_employer,
+            name,
+            open_vacancies,
+            site_url,
+            trusted,
+            accredited_it_employer
+        )
+        VALUES %s
+        ON CONFLICT (id_employer) DO UPDATE SET
+            name = EXCLUDED.name,
+            open_vacancies = EXCLUDED.open_vacancies,
+            site_url = EXCLUDED.site_url,
+            trusted = EXCLUDED.trusted,
+            accredited_it_employer = EXCLUDED.accredited_it_employer
+        RETURNING id_employer, id
+        """,
+        employer_rows,
+        page_size=len(employer_rows),
+        fetch=True
+    )
+    return dict(inserted)
+
+
+def _unique_vacancy_rows(vacancy_rows: list) -> list:
+    """
+    Функция оставляет по одной (последней) записи каждой вакансии пакета.
+    :param vacancy_rows: Список записей, сформированных make_vacancy_row.
+    :return: Список записей без повторов вакансий.
+    """
+    return list({row[0]: row for row in vacancy_rows}.values())
+
+
+def _delete_moved_vacancies(cursor, vacancy_rows: list, batch_size: int) -> list:
+    """
+    Функция удаляет записи вакансий пакета, дата публикации которых изменилась (вакансия поднята на веб-портале).
+    Дата публикации входит в уникальный ключ вакансии (id_vacancy, published_at), поэтому вакансия с новой датой
+    публикации вносится заново в раздел нового месяца, а прежняя запись удаляется. Прежняя дата публикации
+    берётся из таблицы идентификаторов vacancy_ids, и удаление затрагивает только раздел этой даты.
+    Уникальность идентификатора вакансии обеспечивает первичный ключ vacancy_ids: если ту же вакансию
+    одновременно вносит другое подключение, одна из транзакций завершается ошибкой нарушения ключа.
+    :param cursor: Курсор открытого подключения к СУБД.
+    :param vacancy_rows: Список записей, сформированных make_vacancy_row, без повторов вакансий.
+    :param batch_size: Количество записей в одном запросе.
+    :return: Список идентификаторов удалённых вакансий на веб-портале.
+    """
+    if not vacancy_rows:
+        return []
+
+    return execute_values(cursor, """
+        DELETE FROM vacancies
+        USING vacancy_ids, (VALUES %s) AS batch (id_vacancy, published_at)
+        WHERE
+            vacancy_ids.id_vacancy = batch.id_vacancy
+            AND vacancy_ids.published_at <> batch.published_at::date
+            AND vacancies.id_vacancy = vacancy_ids.id_vacancy
+            AND vacancies.published_at = vacancy_ids.published_at
+        RETURNING vacancies.id_vacancy
+        """,
+        [(row[0], row[4]) for row in vacancy_rows],
+        page_size=batch_size,
+        fetch=True
+    )
+
+
+def _insert_vacancies(cursor, vacancy_rows: list, batch_size: int) -> None:
+    """
+    Функция вносит пакет записей в таблицу "Вакансии" многострочными запросами.
+    :param cursor: Курсор открытого подключения к СУБД.
+    :param vacancy_rows: Список записей, сформированных make_vacancy_row.
+    :param batch_size: Количество записей в одном запросе.
+    :return:
+    """
+    if not vacancy_rows:
+        return
+
+    vacancy_rows = _unique_vacancy_rows(vacancy_rows)
+    _delete_moved_vacancies(cursor, vacancy_rows, batch_size)
+
+    execute_values(cursor, """
+        INSERT INTO vacancies (
+            id_vacancy,
+            employer_id,
+            name,
+            description,
+            published_at,
+            alternate_url,
+            salary_from,
+            salary_to,
+            archived,
+            content_hash
+        )
+        VALUES %s
+        ON CONFLICT (id_vacancy, published_at) DO NOTHING
+        """,
+        vacancy_rows,
+        page_size=batch_size
+    )
+
+
+@metrics.timed('ingest_seconds')
+def save_data_to_database_bulk(results,
+                               database_name: str,
+                               params: dict,
+                               batch_size: int = 1000,
+                               refresh_views: bool = True) -> int:
+    """
+    Функция производит пакетное внесение данных о Работодателях и Вакансиях в СУБД (запись).
+    Все данные вносятся через одно подключение в одной транзакции, записи отправляются в СУБД пакетами
+    по batch_size штук. Вакансии могут передаваться генератором: в памяти держится не более одного пакета.
+    :param results: Итерируемый набор пар (список с данными по Работодателю, список с данными по Вакансиям).
+    :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param batch_size: Количество записей в одном пакете.
+    :param refresh_views: Обновить материализованные представления для отчётов после записи.
+    :return: Количество внесённых записей о Вакансиях.
+    """
+    if batch_size < 1:
+        raise ValueError('Размер пакета должен быть больше нуля.')
+
+    vacancies_count = 0
+    committed = False
+
+    # первоначальное подключение к системе управления базами данных.
+    connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='ingest')
+
+    # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+    try:
+        # инициализация курсора для написания запросов в СУБД.
+        with connection.cursor() as cursor:
+            employer_rows = []
+            employer_ids = {}
+            pending_vacancies = []
+
+            for result_list_employer, result_list_vacancy in results:
+                # по работодателю без данных (ошибка получения по API) вакансии не вносим.
+                if not result_list_employer:
+                    continue
+
+                employer_row = make_employer_row(result_list_employer[0])
+                employer_rows.append(employer_row)
+
+                # вакансии ожидают записи в виде компактных записей, а не словарей ответа API.
+                for item in result_list_vacancy:
+                    pending_vacancies.append((employer_row[0], Vacancy.coerce(item)))
+
+                    # пакет собран: сначала вносим накопленных работодателей, чтобы получить их идентификаторы,
+                    # затем вакансии.
+                    if len(pending_vacancies) >= batch_size:
+                        employer_ids.update(_upsert_employers(cursor, employer_rows))
+                        employer_rows = []
+
+                        _insert_vacancies(cursor,
+                                          [make_vacancy_row(item, employer_ids[id_employer])
+                                           for id_employer, item in pending_vacancies],
+                                          batch_size)
+                        vacancies_count += len(pending_vacancies)
+                        pending_vacancies = []
+
+            # вносим остаток записей, не составивший полного пакета.
+            employer_ids.update(_upsert_employers(cursor, employer_rows))
+            _insert_vacancies(cursor,
+                              [make_vacancy_row(item, employer_ids[id_employer])
+                               for id_employer, item in pending_vacancies],
+                              batch_size)
+            vacancies_count += len(pending_vacancies)
+
+            connection.commit()
+            committed = True
+            metrics.inc('ingest_rows_total', len(employer_ids), table='employers')
+            metrics.inc('ingest_rows_total', vacancies_count, table='vacancies')
+
+    except(Exception, psycopg2.DatabaseError) as error:
+        print(error)
+        vacancies_count = 0
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if committed:
+        # вакансии месяцев без раздела переносим из раздела по умолчанию в отдельной короткой транзакции.
+        create_vacancy_partitions(database_name, params)
+        # сбрасываем кэши выборок DBManager текущего процесса.
+        bump_data_version(database_name)
+        if refresh_views:
+            refresh_materialized_views(database_name, params)
+
+    return vacancies_count
+
+
+def _upsert_vacancies(cursor, vacancy_rows: list, batch_size: int, sync_stats: dict) -> None:
+    """
+    Функция вносит или обновляет пакет записей в таблице "Вакансии".
+    Запись обновляется только если хеш содержимого вакансии изменился, неизменные вакансии не перезаписываются.
+    Идентификаторы вакансий пакета запоминаются во временной таблице sync_seen_vacancies.
+    :param cursor: Курсор открытого подключения к СУБД.
+    :param vacancy_rows: Список записей, сформированных make_vacancy_row.
+    :param batch_size: Количество записей в одном запросе.
+    :param sync_stats: Словарь статистики синхронизации, который дополняется результатами пакета.
+    :return:
+    """
+    if not vacancy_rows:
+        return
+
+    # повторяющиеся записи одной вакансии в пакете недопустимы для ON CONFLICT, оставляем последнюю.
+    vacancy_rows = _unique_vacancy_rows(vacancy_rows)
+    moved = _delete_moved_vacancies(cursor, vacancy_rows, batch_size)
+
+    # системный столбец xmax недоступен в RETURNING секционированной таблицы:
+    # внесённые записи определяем по отсутствию вакансии в таблице идентификаторов до внесения.
+    cursor.execute("SELECT COUNT(*) FROM vacancy_ids WHERE vacancy_ids.id_vacancy = ANY(%s)",
+                   ([row[0] for row in vacancy_rows],))
+    existing_count = cursor.fetchone()[0]
+
+    execute_values(cursor, """
+        INSERT INTO sync_seen_vacancies (id_vacancy)
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        """,
+        [(row[0],) for row in vacancy_rows],
+        page_size=batch_size
+    )
+
+    changed = execute_values(cursor, """
+        INSERT INTO vacancies (
+            id_vacancy,
+            employer_id,
+            name,
+            description,
+            published_at,
+            alternate_url,
+            salary_from,
+            salary_to,
+            archived,
+            content_hash
+        )
+        VALUES %s
+        ON CONFLICT (id_vacancy, published_at) DO UPDATE SET
+            employer_id = EXCLUDED.employer_id,
+            name = EXCLUDED.name,
+            description = EXCLUDED.description,
+            alternate_url = EXCLUDED.alternate_url,
+            salary_from = EXCLUDED.salary_from,
+            salary_to = EXCLUDED.salary_to,
+            archived = EXCLUDED.archived,
+            content_hash = EXCLUDED.content_hash
+        WHERE
+            vacancies.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        RETURNING vacancies.id_vacancy
+        """,
+        vacancy_rows,
+        page_size=batch_size,
+        fetch=True
+    )
+
+    # вакансия, внесённая заново из-за изменения даты публикации, считается обновлённой.
+    inserted_count = len(vacancy_rows) - existing_count - len(moved)
+    sync_stats['inserted'] += inserted_count
+    sync_stats['updated'] += len(changed) - inserted_count
+    sync_stats['unchanged'] += len(vacancy_rows) - len(changed)
+
+
+@metrics.timed('ingest_seconds')
+def sync_data_to_database(results,
+                          database_name: str,
+                          params: dict,
+                          batch_size: int = 1000,
+                          refresh_views: bool = True) -> dict:
+    """
+    Функция производит инкрементальную синхронизацию данных о Работодателях и Вакансиях с СУБД.
+    Новые записи вносятся, изменившиеся обновляются, неизменные (по хешу содержимого) не перезаписываются.
+    Вакансии переданных работодателей, отсутствующие в новых данных, помечаются как архивные.
+    Все изменения выполняются в одной транзакции.
+    :param results: Итерируемый набор пар (список с данными по Работодателю, список с данными по Вакансиям).
+    Список вакансий должен быть полным: вакансии работодателя, не попавшие в него, будут помечены архивными.
+    :param database_name: Имя базы данных в которой будут производиться работы (выполняться запросы).
+    :param params: Набор передаваемых параметров для подключения к СУБД.
+    :param batch_size: Количество записей в одном пакете.
+    :param refresh_views: Обновить материализованные представления для отчётов после синхронизации.
+    :return: Словарь с количеством внесённых, обновлённых, неизменных и помеченных архивными вакансий.
+    """
+    if batch_size < 1:
+        raise ValueError('Размер пакета должен быть больше нуля.')
+
+    sync_stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'archived': 0}
+    committed = False
+
+    # первоначальное подключение к системе управления базами данных.
+    connection = psycopg2.connect(dbname=database_name, **params)
+    metrics.inc('db_connections_opened_total', source='ingest')
+
+    # помещаем подключение и работу с СУБД в исключение на случай возникновения не предвиденных ошибок.
+    try:
+        # инициализация курсора для написания запросов в СУБД.
+        with connection.cursor() as cursor:
+            # временная таблица с идентификаторами полученных вакансий, удаляется по окончании транзакции.
+            cursor.execute("""
+                CREATE TEMPORARY TABLE sync_seen_vacancies (
+                    id_vacancy varchar(25) PRIMARY KEY
+                ) ON COMMIT DROP
+            """)
+
+            employer_rows = []
+            employer_ids = {}
+            pending_vacancies = []
+
+            for result_list_employer, result_list_vacancy in results:
+                # по работодателю без данных (ошибка получения по API) синхронизацию не выполняем.
+                if not result_list_employer:
+                    continue
+
+                employer_row = make_employer_row(result_list_employer[0])
+                employer_rows.append(employer_row)
+
+                # вакансии ожидают записи в виде компактных записей, а не словарей ответа API.
+                for item in result_list_vacancy:
+                    pending_vacancies.append((employer_row[0], Vacancy.coerce(item)))
+
+                    if len(pending_vacancies) >= batch_size:
+                        employer_ids.update(_upsert_employers(cursor, employer_rows))
+                        employer_rows = []
+
+                        _upsert_vacancies(cursor,
+                                          [make_vacancy_row(item, employer_ids[id_employer])
+                                           for id_employer, item in pending_vacancies],
+                                          batch_size,
+                                          sync_stats)
+                        pending_vacancies = []
+
+            # синхронизируем остаток записей, не составивший полного пакета.
+            employer_ids.update(_upsert_employers(cursor, employer_rows))
+            _upsert_vacancies(cursor,
+                              [make_vacancy_row(item, employer_ids[id_employer])
+                               for id_employer, item in pending_vacancies],
+                              batch_size,
+                              sync_stats)
+
+            # вакансии синхронизированных работодателей, которых нет в новых данных, помечаем архивными.
+            # хеш содержимого сбрасываем, чтобы вакансия обновилась, если снова появится на веб-портале.
+            cursor.execute("""
+                UPDATE vacancies
+                SET
+                    archived = TRUE,
+                    content_hash = NULL
+                WHERE
+                    vacancies.employer_id = ANY(%s)
+                    AND vacancies.archived IS NOT TRUE
+                    AND NOT EXISTS (
+                        SELECT 1
+                        FROM sync_seen_vacancies
+                        WHERE sync_seen_vacancies.id_vacancy = vacancies.id_vacancy
+                    )
+            """, (list(employer_ids.values()),))
+            sync_stats['archived'] = cursor.rowcount
+
+            connection.commit()
+            committed = True
+            metrics.inc('ingest_rows_total', len(employer_ids), table='employers')
+            metrics.inc('ingest_rows_total', sync_stats['inserted'] + sync_stats['updated'], table='vacancies')
+
+    except(Exception, psycopg2.DatabaseError) as error:
+        print(error)
+        sync_stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'archived': 0}
+
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if committed:
+        # вакансии месяцев без раздела переносим из раздела по умолчанию в отдельной короткой транзакции.
+        create_vacancy_partitions(database_name, params)
+        # сбрасываем кэши выборок DBManager текущего процесса.
+        bump_data_version(database_name)
+        if refresh_views:
+            refresh_materialized_views(database_name, params)
+
+    return sync_stats
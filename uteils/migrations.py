@@ -0,0 +1,486 @@
+import psycopg2
+
+# Материализованные представления для отчётов и их индексы. Представления пересоздаются при пересоздании
+# таблицы "Вакансии", поэтому текст запроса используется несколькими миграциями.
+_REPORT_VIEWS_REQUEST = """
+        CREATE MATERIALIZED VIEW mv_employer_vacancies AS
+            SELECT
+                employers.id AS employer_id,
+                employers.name AS employers_name,
+                employers.open_vacancies AS open_vacancies,
+                COUNT(vacancies.id) AS vacancies_count,
+                AVG((vacancies.salary_to + vacancies.salary_from)/2) AS avg_salary,
+                MIN((vacancies.salary_to + vacancies.salary_from)/2) AS min_salary,
+                MAX((vacancies.salary_to + vacancies.salary_from)/2) AS max_salary
+            FROM
+                employers
+                    LEFT JOIN vacancies
+                        ON vacancies.employer_id = employers.id
+            GROUP BY
+                employers.id;
+
+        CREATE MATERIALIZED VIEW mv_vacancy_salaries AS
+            SELECT
+                vacancies.id AS vacancy_id,
+                employers.name AS employers_name,
+                vacancies.name AS vacancies_name,
+                (vacancies.salary_to + vacancies.salary_from)/2 AS avg_salary
+            FROM
+                vacancies
+                    LEFT JOIN employers
+                        ON vacancies.employer_id = employers.id;
+
+        CREATE MATERIALIZED VIEW mv_salary_summary AS
+            SELECT
+                1 AS id,
+                COUNT(vacancies.id) AS vacancies_count,
+                (AVG(vacancies.salary_to) + AVG(vacancies.salary_from))/2 AS avg_salary_all_vacancy
+            FROM
+                vacancies;
+
+        -- уникальные индексы нужны для обновления представлений без блокировки чтения (CONCURRENTLY).
+        CREATE UNIQUE INDEX uq_mv_employer_vacancies_employer_id ON mv_employer_vacancies (employer_id);
+        CREATE UNIQUE INDEX uq_mv_vacancy_salaries_vacancy_id ON mv_vacancy_salaries (vacancy_id);
+        CREATE UNIQUE INDEX uq_mv_salary_summary_id ON mv_salary_summary (id);
+        CREATE INDEX ix_mv_vacancy_salaries_avg_salary ON mv_vacancy_salaries (avg_salary);
+"""
+
+# Версионированные изменения схемы базы данных: (номер версии, описание, текст запроса).
+# Миграции применяются по возрастанию номера версии, каждая в своей транзакции, и только один раз:
+# применённые версии записываются в таблицу schema_migrations.
+# Ранние миграции написаны так, чтобы их можно было применить к базе данных, созданной до появления миграций.
+MIGRATIONS = [
+    (1, 'Таблицы "Работодатель" и "Вакансии", уникальные ключи идентификаторов веб-портала', """
+        CREATE TABLE IF NOT EXISTS employers (
+            id serial,
+            id_employer varchar(25),
+            name varchar(100),
+            open_vacancies integer,
+            site_url varchar(100),
+            trusted boolean,
+            accredited_it_employer boolean,
+
+            CONSTRAINT pk_employer_id PRIMARY KEY (id)
+        );
+
+        CREATE TABLE IF NOT EXISTS vacancies (
+            id serial,
+            id_vacancy varchar(25),
+            employer_id integer,
+            name varchar(100),
+            description text,
+            published_at date,
+            alternate_url varchar(100),
+            salary_from integer,
+            salary_to integer,
+            archived boolean,
+
+            CONSTRAINT pk_vacancies_id PRIMARY KEY (id),
+            CONSTRAINT fk_vacancies_employers FOREIGN KEY(employer_id) REFERENCES employers(id)
+        );
+
+        ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS content_hash varchar(32);
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_employers_id_employer ON employers (id_employer);
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_vacancies_id_vacancy ON vacancies (id_vacancy);
+    """),
+
+    (2, 'Триграммный и полнотекстовый индексы для поиска вакансий', """
+        ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('russian', coalesce(name, '') || ' ' || coalesce(description, ''))
+            ) STORED;
+
+        -- расширение pg_trgm входит в contrib и может быть не установлено на сервере:
+        -- без него поиск по ILIKE выполняется без индекса.
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE pg_available_extensions.name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX IF NOT EXISTS ix_vacancies_name_trgm ON vacancies USING gin (name gin_trgm_ops);
+            END IF;
+        END
+        $$;
+        CREATE INDEX IF NOT EXISTS ix_vacancies_search_vector ON vacancies USING gin (search_vector);
+    """),
+
+    (3, 'Типы полей названий и ссылок без ограничения длины, индексы связи, даты и зарплаты', """
+        -- поле названия используется в вычисляемом поле поиска, которое пересоздаётся после смены типа.
+        ALTER TABLE vacancies DROP COLUMN search_vector;
+
+        ALTER TABLE employers
+            ALTER COLUMN name TYPE text,
+            ALTER COLUMN site_url TYPE text;
+
+        ALTER TABLE vacancies
+            ALTER COLUMN name TYPE text,
+            ALTER COLUMN alternate_url TYPE text,
+            ALTER COLUMN content_hash TYPE char(32);
+
+        ALTER TABLE vacancies ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                to_tsvector('russian', coalesce(name, '') || ' ' || coalesce(description, ''))
+            ) STORED;
+        CREATE INDEX ix_vacancies_search_vector ON vacancies USING gin (search_vector);
+
+        CREATE INDEX ix_vacancies_employer_id ON vacancies (employer_id);
+        CREATE INDEX ix_vacancies_published_at ON vacancies (published_at);
+        CREATE INDEX ix_vacancies_salary_midpoint ON vacancies (((salary_to + salary_from)/2));
+    """),
+
+    (4, 'Материализованные представления для отчётов: вакансии и зарплаты по работодателям, средняя зарплата',
+     _REPORT_VIEWS_REQUEST),
+
+    (5, 'Счётчик версии данных, увеличиваемый при каждом изменении таблиц "Работодатель" и "Вакансии"', """
+        CREATE TABLE data_version (
+            id integer,
+            version bigint NOT NULL DEFAULT 0,
+
+            CONSTRAINT pk_data_version_id PRIMARY KEY (id)
+        );
+        INSERT INTO data_version (id, version) VALUES (1, 0);
+
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE data_version SET version = version + 1 WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- триггеры уровня оператора: счётчик увеличивается один раз на пакет записей, а не на каждую запись.
+        CREATE TRIGGER tr_employers_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON employers
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+        CREATE TRIGGER tr_vacancies_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON vacancies
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+    """),
+
+    (6, 'Разбиение таблицы "Вакансии" на разделы по месяцам даты публикации', """
+        -- последовательность идентификаторов переходит к новой таблице и не удаляется вместе со старой.
+        ALTER SEQUENCE vacancies_id_seq OWNED BY NONE;
+        ALTER TABLE vacancies RENAME TO vacancies_unpartitioned;
+
+        -- уникальные ключи разбитой на разделы таблицы должны включать поле разбиения - дату публикации.
+        CREATE TABLE vacancies (
+            id integer NOT NULL DEFAULT nextval('vacancies_id_seq'),
+            id_vacancy varchar(25),
+            employer_id integer,
+            name text,
+            description text,
+            published_at date NOT NULL,
+            alternate_url text,
+            salary_from integer,
+            salary_to integer,
+            archived boolean,
+            content_hash char(32),
+            search_vector tsvector
+                GENERATED ALWAYS AS (
+                    to_tsvector('russian', coalesce(name, '') || ' ' || coalesce(description, ''))
+                ) STORED,
+
+            CONSTRAINT fk_vacancies_employers FOREIGN KEY(employer_id) REFERENCES employers(id)
+        ) PARTITION BY RANGE (published_at);
+
+        -- раздел по умолчанию принимает вакансии, для месяца публикации которых ещё нет раздела.
+        CREATE TABLE vacancies_default PARTITION OF vacancies DEFAULT;
+
+        -- функция создаёт раздел месяца, если его ещё нет. Вакансии этого месяца из раздела по умолчанию
+        -- переносятся в новый раздел: пока они там, раздел создать нельзя.
+        CREATE OR REPLACE FUNCTION create_vacancy_partition(partition_month date) RETURNS boolean AS $$
+        DECLARE
+            partition_start date := date_trunc('month', partition_month)::date;
+            partition_end date := (date_trunc('month', partition_month) + interval '1 month')::date;
+            partition_name text := 'vacancies_p' || to_char(partition_month, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN FALSE;
+            END IF;
+
+            CREATE TEMPORARY TABLE vacancy_partition_rows ON COMMIT DROP AS
+                SELECT
+                    vacancies_default.id, vacancies_default.id_vacancy, vacancies_default.employer_id,
+                    vacancies_default.name, vacancies_default.description, vacancies_default.published_at,
+                    vacancies_default.alternate_url, vacancies_default.salary_from, vacancies_default.salary_to,
+                    vacancies_default.archived, vacancies_default.content_hash
+                FROM
+                    vacancies_default
+                WHERE
+                    vacancies_default.published_at >= partition_start
+                    AND vacancies_default.published_at < partition_end;
+
+            DELETE FROM vacancies_default
+            WHERE
+                vacancies_default.published_at >= partition_start
+                AND vacancies_default.published_at < partition_end;
+
+            EXECUTE format('CREATE TABLE %I PARTITION OF vacancies FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, partition_start, partition_end);
+
+            INSERT INTO vacancies (id, id_vacancy, employer_id, name, description, published_at, alternate_url,
+                                   salary_from, salary_to, archived, content_hash)
+            SELECT * FROM vacancy_partition_rows;
+
+            DROP TABLE vacancy_partition_rows;
+            RETURN TRUE;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- функция создаёт разделы месяцев от months_back месяцев назад до months_ahead месяцев вперёд.
+        CREATE OR REPLACE FUNCTION ensure_vacancy_partitions(months_back integer, months_ahead integer)
+            RETURNS integer AS $$
+        DECLARE
+            partition_month date;
+            created integer := 0;
+        BEGIN
+            FOR partition_month IN
+                SELECT generate_series(date_trunc('month', CURRENT_DATE) - make_interval(months => months_back),
+                                       date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead),
+                                       interval '1 month')::date
+            LOOP
+                IF create_vacancy_partition(partition_month) THEN
+                    created := created + 1;
+                END IF;
+            END LOOP;
+            RETURN created;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- разделы создаются для всех месяцев, за которые уже есть вакансии, затем вакансии переносятся.
+        -- вакансии без даты публикации попадают в раздел по умолчанию с датой -infinity.
+        SELECT create_vacancy_partition(months.partition_month)
+        FROM (
+            SELECT DISTINCT date_trunc('month', vacancies_unpartitioned.published_at)::date AS partition_month
+            FROM vacancies_unpartitioned
+            WHERE vacancies_unpartitioned.published_at IS NOT NULL
+        ) AS months;
+
+        INSERT INTO vacancies (id, id_vacancy, employer_id, name, description, published_at, alternate_url,
+                               salary_from, salary_to, archived, content_hash)
+        SELECT
+            vacancies_unpartitioned.id, vacancies_unpartitioned.id_vacancy, vacancies_unpartitioned.employer_id,
+            vacancies_unpartitioned.name, vacancies_unpartitioned.description,
+            COALESCE(vacancies_unpartitioned.published_at, '-infinity'), vacancies_unpartitioned.alternate_url,
+            vacancies_unpartitioned.salary_from, vacancies_unpartitioned.salary_to, vacancies_unpartitioned.archived,
+            vacancies_unpartitioned.content_hash
+        FROM
+            vacancies_unpartitioned;
+
+        -- вместе со старой таблицей удаляются зависящие от неё представления и триггер, они создаются заново.
+        DROP TABLE vacancies_unpartitioned CASCADE;
+        ALTER SEQUENCE vacancies_id_seq OWNED BY vacancies.id;
+
+        -- индексы разбитой на разделы таблицы создаются на каждом разделе, в том числе на будущих.
+        ALTER TABLE vacancies ADD CONSTRAINT pk_vacancies_id PRIMARY KEY (id, published_at);
+        CREATE UNIQUE INDEX uq_vacancies_id_vacancy ON vacancies (id_vacancy, published_at);
+        CREATE INDEX ix_vacancies_search_vector ON vacancies USING gin (search_vector);
+        CREATE INDEX ix_vacancies_employer_id ON vacancies (employer_id);
+        CREATE INDEX ix_vacancies_published_at ON vacancies (published_at);
+        CREATE INDEX ix_vacancies_salary_midpoint ON vacancies (((salary_to + salary_from)/2));
+
+        -- триграммный индекс создаётся, только если расширение pg_trgm установлено (миграция 2).
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE pg_extension.extname = 'pg_trgm') THEN
+                CREATE INDEX ix_vacancies_name_trgm ON vacancies USING gin (name gin_trgm_ops);
+            END IF;
+        END
+        $$;
+
+        CREATE TRIGGER tr_vacancies_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON vacancies
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+    """ + _REPORT_VIEWS_REQUEST),
+
+    (7, 'Таблица идентификаторов вакансий: идентификатор вакансии веб-портала уникален во всех разделах', """
+        -- уникальный ключ разбитой на разделы таблицы включает дату публикации, поэтому уникальность
+        -- идентификатора вакансии обеспечивает первичный ключ отдельной таблицы без разделов.
+        CREATE TABLE vacancy_ids (
+            id_vacancy varchar(25),
+            published_at date NOT NULL,
+
+            CONSTRAINT pk_vacancy_ids_id_vacancy PRIMARY KEY (id_vacancy)
+        );
+
+        -- повторы вакансий, внесённые раньше, удаляются: остаётся запись с последней датой публикации.
+        DELETE FROM vacancies
+        USING vacancies AS newer
+        WHERE
+            newer.id_vacancy = vacancies.id_vacancy
+            AND (newer.published_at, newer.id) > (vacancies.published_at, vacancies.id);
+
+        INSERT INTO vacancy_ids (id_vacancy, published_at)
+        SELECT vacancies.id_vacancy, vacancies.published_at
+        FROM vacancies
+        WHERE vacancies.id_vacancy IS NOT NULL;
+
+        -- таблица идентификаторов изменяется триггерами уровня оператора по таблицам переходов:
+        -- один запрос на пакет записей. Повтор идентификатора нарушает первичный ключ и отменяет запись.
+        CREATE OR REPLACE FUNCTION vacancy_ids_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO vacancy_ids (id_vacancy, published_at)
+            SELECT new_rows.id_vacancy, new_rows.published_at
+            FROM new_rows
+            WHERE new_rows.id_vacancy IS NOT NULL;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION vacancy_ids_delete() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM vacancy_ids
+            USING old_rows
+            WHERE
+                vacancy_ids.id_vacancy = old_rows.id_vacancy
+                AND vacancy_ids.published_at = old_rows.published_at;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- при обновлении изменяются только записи, у которых изменился идентификатор или дата публикации.
+        CREATE OR REPLACE FUNCTION vacancy_ids_update() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM vacancy_ids
+            USING old_rows
+            WHERE
+                vacancy_ids.id_vacancy = old_rows.id_vacancy
+                AND vacancy_ids.published_at = old_rows.published_at
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM new_rows
+                    WHERE new_rows.id_vacancy = old_rows.id_vacancy AND new_rows.published_at = old_rows.published_at
+                );
+
+            INSERT INTO vacancy_ids (id_vacancy, published_at)
+            SELECT new_rows.id_vacancy, new_rows.published_at
+            FROM new_rows
+            WHERE
+                new_rows.id_vacancy IS NOT NULL
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM old_rows
+                    WHERE old_rows.id_vacancy = new_rows.id_vacancy AND old_rows.published_at = new_rows.published_at
+                );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION vacancy_ids_truncate() RETURNS trigger AS $$
+        BEGIN
+            TRUNCATE TABLE vacancy_ids;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        -- таблицы переходов допускаются только в триггерах с одним событием.
+        CREATE TRIGGER tr_vacancies_vacancy_ids_insert
+            AFTER INSERT ON vacancies REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION vacancy_ids_insert();
+        CREATE TRIGGER tr_vacancies_vacancy_ids_delete
+            AFTER DELETE ON vacancies REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION vacancy_ids_delete();
+        CREATE TRIGGER tr_vacancies_vacancy_ids_update
+            AFTER UPDATE ON vacancies REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION vacancy_ids_update();
+        CREATE TRIGGER tr_vacancies_vacancy_ids_truncate
+            AFTER TRUNCATE ON vacancies
+            FOR EACH STATEMENT EXECUTE FUNCTION vacancy_ids_truncate();
+
+        -- триггеры уровня оператора срабатывают только на запросы к таблице "Вакансии", а не к её разделам:
+        -- вакансии из раздела по умолчанию удаляются запросом к таблице. Пока раздела месяца нет,
+        -- все вакансии месяца находятся в разделе по умолчанию.
+        CREATE OR REPLACE FUNCTION create_vacancy_partition(partition_month date) RETURNS boolean AS $$
+        DECLARE
+            partition_start date := date_trunc('month', partition_month)::date;
+            partition_end date := (date_trunc('month', partition_month) + interval '1 month')::date;
+            partition_name text := 'vacancies_p' || to_char(partition_month, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN FALSE;
+            END IF;
+
+            CREATE TEMPORARY TABLE vacancy_partition_rows ON COMMIT DROP AS
+                WITH moved AS (
+                    DELETE FROM vacancies
+                    WHERE
+                        vacancies.published_at >= partition_start
+                        AND vacancies.published_at < partition_end
+                    RETURNING
+                        vacancies.id, vacancies.id_vacancy, vacancies.employer_id, vacancies.name,
+                        vacancies.description, vacancies.published_at, vacancies.alternate_url,
+                        vacancies.salary_from, vacancies.salary_to, vacancies.archived, vacancies.content_hash
+                )
+                SELECT * FROM moved;
+
+            EXECUTE format('CREATE TABLE %I PARTITION OF vacancies FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, partition_start, partition_end);
+
+            INSERT INTO vacancies (id, id_vacancy, employer_id, name, description, published_at, alternate_url,
+                                   salary_from, salary_to, archived, content_hash)
+            SELECT * FROM vacancy_partition_rows;
+
+            DROP TABLE vacancy_partition_rows;
+            RETURN TRUE;
+        END;
+        $$ LANGUAGE plpgsql;
+    """),
+]
+
+# Материализованные представления для отчётов, обновляемые после каждой записи данных в базу данных.
+MATERIALIZED_VIEWS = ('mv_employer_vacancies', 'mv_vacancy_salaries', 'mv_salary_summary')
+
+# Разделы таблицы "Вакансии", создаваемые заранее: количество месяцев до и после текущего месяца.
+PARTITION_MONTHS_BACK = 1
+PARTITION_MONTHS_AHEAD = 3
+
+
+def get_schema_version(connection) -> int:
+    """
+    Функция возвращает номер последней применённой к базе данных миграции.
+    :param connection: Открытое подключение к СУБД.
+    :return: Номер версии схемы, 0 если миграции не применялись.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version integer,
+                description text,
+                applied_at timestamp with time zone DEFAULT now(),
+
+                CONSTRAINT pk_schema_migrations_version PRIMARY KEY (version)
+            );
+            SELECT COALESCE(MAX(version), 0) FROM schema_migrations;
+        """)
+        version = cursor.fetchone()[0]
+
+    connection.commit()
+    return version
+
+
+def apply_migrations(connection, target_version: int = None) -> list:
+    """
+    Функция применяет к базе данных все ещё не применённые миграции.
+    :param connection: Открытое подключение к СУБД.
+    :param target_version: Версия, до которой применяются миграции. Если не указана, применяются все.
+    :return: Список номеров применённых миграций.
+    """
+    current_version = get_schema_version(connection)
+    applied = []
+
+    for version, description, text_request in MIGRATIONS:
+        if version <= current_version or (target_version is not None and version > target_version):
+            continue
+
+        # миграция и запись о ней выполняются в одной транзакции: при ошибке схема остаётся в прежней версии.
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(text_request)
+                cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                               (version, description))
+            connection.commit()
+        except (Exception, psycopg2.DatabaseError):
+            connection.rollback()
+            raise
+
+        applied.append(version)
+
+    return applied